@@ -0,0 +1,153 @@
+import math
+import random
+import uuid
+from dataclasses import dataclass, asdict
+
+import numpy as np
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.guid
+
+
+@dataclass
+class ModelSize:
+    """
+    Number of elements of each kind in a synthetic model.
+    """
+    slabs: int = 100
+    walls: int = 100
+    columns: int = 100
+    mapped: int = 100
+    storeys: int = 3
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class SyntheticModelGenerator:
+    """
+    Builds IFC4 models of a given size with ifcopenshell's authoring API, shaped the way the server reads them:
+    - IfcSlab with a SweptSolid body extruded from an IfcPolyline profile (IfcGeometryUtil.parse_slab)
+    - IfcWallStandardCase with a Curve2D IfcPolyline axis, an extruded body and a material layer set usage
+      (IfcGeometryUtil.parse_wall_standard)
+    - IfcColumn with an extruded rectangle profile, each with its own representation
+    - IfcBuildingElementProxy occurrences of one type, whose bodies are IfcMappedItem of the type's representation map
+
+    Lengths are in metres. Elements are laid out on a grid over the storeys. GlobalIds are drawn from the seed,
+    so the same size and seed write the same file.
+    """
+    STOREY_HEIGHT = 3.0
+    SPACING = 6.0
+
+    def __init__(self, size: ModelSize, seed: int = 0):
+        self.size = size
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def create_entity(self, ifc_file: ifcopenshell.file, ifc_class: str, name: str) -> ifcopenshell.entity_instance:
+        return ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class=ifc_class, name=name)
+
+    def place(self, ifc_file: ifcopenshell.file, product: ifcopenshell.entity_instance, index: int, storey: int) -> None:
+        columns = max(int(math.ceil(math.sqrt(max(self.element_count(), 1)))), 1)
+        matrix = np.eye(4)
+        matrix[0, 3] = (index % columns) * SyntheticModelGenerator.SPACING
+        matrix[1, 3] = (index // columns) * SyntheticModelGenerator.SPACING
+        matrix[2, 3] = storey * SyntheticModelGenerator.STOREY_HEIGHT
+        ifcopenshell.api.run("geometry.edit_object_placement", ifc_file, product=product, matrix=matrix, is_si=True)
+
+    def element_count(self) -> int:
+        return self.size.slabs + self.size.walls + self.size.columns + self.size.mapped
+
+    @staticmethod
+    def slab_representation(ifc_file: ifcopenshell.file, body: ifcopenshell.entity_instance, width: float,
+                            depth: float, thickness: float) -> ifcopenshell.entity_instance:
+        points = [ifc_file.createIfcCartesianPoint(point) for point in ((0.0, 0.0), (width, 0.0), (width, depth), (0.0, depth), (0.0, 0.0))]
+        profile = ifc_file.createIfcArbitraryClosedProfileDef("AREA", None, ifc_file.createIfcPolyline(points))
+        position = ifc_file.createIfcAxis2Placement3D(ifc_file.createIfcCartesianPoint((0.0, 0.0, 0.0)))
+        solid = ifc_file.createIfcExtrudedAreaSolid(profile, position, ifc_file.createIfcDirection((0.0, 0.0, 1.0)), thickness)
+        return ifc_file.createIfcShapeRepresentation(body, "Body", "SweptSolid", [solid])
+
+    def generate(self) -> ifcopenshell.file:
+        ifc_file = ifcopenshell.file(schema="IFC4")
+        project = self.create_entity(ifc_file, "IfcProject", "Benchmark")
+        # Metres, so the raw coordinates written below and the values converted by the API share one unit.
+        ifcopenshell.api.run("unit.assign_unit", ifc_file, length={"is_metric": True, "raw": "METERS"},
+                             area={"is_metric": True, "raw": "SQUARE_METERS"}, volume={"is_metric": True, "raw": "CUBIC_METERS"})
+        model = ifcopenshell.api.run("context.add_context", ifc_file, context_type="Model")
+        body = ifcopenshell.api.run("context.add_context", ifc_file, context_type="Model", context_identifier="Body",
+                                    target_view="MODEL_VIEW", parent=model)
+        axis = ifcopenshell.api.run("context.add_context", ifc_file, context_type="Model", context_identifier="Axis",
+                                    target_view="GRAPH_VIEW", parent=model)
+
+        site = self.create_entity(ifc_file, "IfcSite", "Site")
+        building = self.create_entity(ifc_file, "IfcBuilding", "Building")
+        ifcopenshell.api.run("aggregate.assign_object", ifc_file, relating_object=project, products=[site])
+        ifcopenshell.api.run("aggregate.assign_object", ifc_file, relating_object=site, products=[building])
+        storeys = []
+        for index in range(max(self.size.storeys, 1)):
+            storey = self.create_entity(ifc_file, "IfcBuildingStorey", f"Level {index}")
+            storey.Elevation = index * SyntheticModelGenerator.STOREY_HEIGHT
+            ifcopenshell.api.run("aggregate.assign_object", ifc_file, relating_object=building, products=[storey])
+            storeys.append(storey)
+        contained = [[] for _ in storeys]
+
+        index = 0
+        for number in range(self.size.slabs):
+            slab = self.create_entity(ifc_file, "IfcSlab", f"Slab {number}")
+            representation = self.slab_representation(ifc_file, body, self.random.uniform(3.0, 5.5), self.random.uniform(3.0, 5.5), 0.2)
+            ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=slab, representation=representation)
+            self.place(ifc_file, slab, index, index % len(storeys))
+            contained[index % len(storeys)].append(slab)
+            index += 1
+
+        layer_set = ifcopenshell.api.run("material.add_material_set", ifc_file, name="Wall 200", set_type="IfcMaterialLayerSet")
+        for material_name, thickness in (("Concrete", 0.15), ("Insulation", 0.05)):
+            material = ifcopenshell.api.run("material.add_material", ifc_file, name=material_name)
+            layer = ifcopenshell.api.run("material.add_layer", ifc_file, layer_set=layer_set, material=material, name=material_name)
+            layer.LayerThickness = thickness
+        for number in range(self.size.walls):
+            wall = self.create_entity(ifc_file, "IfcWallStandardCase", f"Wall {number}")
+            length = self.random.uniform(2.0, 5.5)
+            body_representation = ifcopenshell.api.run("geometry.add_wall_representation", ifc_file, context=body, length=length,
+                                                       height=SyntheticModelGenerator.STOREY_HEIGHT, thickness=0.2)
+            axis_points = [ifc_file.createIfcCartesianPoint(point) for point in ((0.0, 0.0), (length, 0.0))]
+            axis_representation = ifc_file.createIfcShapeRepresentation(axis, "Axis", "Curve2D", [ifc_file.createIfcPolyline(axis_points)])
+            ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=wall, representation=axis_representation)
+            ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=wall, representation=body_representation)
+            ifcopenshell.api.run("material.assign_material", ifc_file, products=[wall], type="IfcMaterialLayerSetUsage", material=layer_set)
+            self.place(ifc_file, wall, index, index % len(storeys))
+            contained[index % len(storeys)].append(wall)
+            index += 1
+
+        for number in range(self.size.columns):
+            column = self.create_entity(ifc_file, "IfcColumn", f"Column {number}")
+            profile = ifc_file.createIfcRectangleProfileDef("AREA", None, None, self.random.uniform(0.3, 0.6), self.random.uniform(0.3, 0.6))
+            representation = ifcopenshell.api.run("geometry.add_profile_representation", ifc_file, context=body, profile=profile,
+                                                  depth=SyntheticModelGenerator.STOREY_HEIGHT)
+            ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=column, representation=representation)
+            self.place(ifc_file, column, index, index % len(storeys))
+            contained[index % len(storeys)].append(column)
+            index += 1
+
+        if self.size.mapped:
+            element_type = self.create_entity(ifc_file, "IfcBuildingElementProxyType", "Mapped Box")
+            representation = ifcopenshell.api.run("geometry.add_wall_representation", ifc_file, context=body, length=1.0, height=1.0, thickness=1.0)
+            ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=element_type, representation=representation)
+            for number in range(self.size.mapped):
+                proxy = self.create_entity(ifc_file, "IfcBuildingElementProxy", f"Mapped {number}")
+                ifcopenshell.api.run("type.assign_type", ifc_file, related_objects=[proxy], relating_type=element_type)
+                self.place(ifc_file, proxy, index, index % len(storeys))
+                contained[index % len(storeys)].append(proxy)
+                index += 1
+
+        for storey, products in zip(storeys, contained):
+            if products:
+                ifcopenshell.api.run("spatial.assign_container", ifc_file, relating_structure=storey, products=products)
+
+        for root in ifc_file.by_type("IfcRoot"):
+            root.GlobalId = ifcopenshell.guid.compress(uuid.UUID(int=self.random.getrandbits(128)).hex)
+        return ifc_file
+
+    def write(self, path: str) -> str:
+        self.generate().write(path)
+        return path
@@ -0,0 +1,230 @@
+"""
+Benchmarks of the hot paths of the server on a synthetic model.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --slabs 500 --walls 500 --columns 500 --mapped 500 --repeat 5
+    python -m benchmarks.run_benchmarks ... --baseline benchmarks/results/previous.json
+
+Every stage is timed separately, repeated, and measured once more for its peak memory.
+Results are written as JSON, and compared to a baseline result when one is given.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Union
+
+os.environ.setdefault("SERVER_PORT", "8000")
+
+import numpy as np
+import ifcopenshell
+
+from benchmarks.model_generator import ModelSize, SyntheticModelGenerator
+from src.config import GEOMETRY_WORKERS
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.ifc_utils.ifc_geometry_utils import IfcGeometryUtil
+from src.ifc_utils.ifc_stream_utils import IfcStepScanner
+from src.server_utils.geometry_encoders import GeometryBinaryEncoder
+
+
+class PeakMemory:
+    """
+    Peak memory of a block of code.
+    The resident set high-water mark is reset through /proc/self/clear_refs on Linux, so it covers the block only.
+    Elsewhere it is the high-water mark of the process so far. Python allocations are traced with tracemalloc.
+    """
+
+    @staticmethod
+    def reset_resident() -> bool:
+        try:
+            with open("/proc/self/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def resident_bytes(field: str = "VmHWM") -> int:
+        """
+        :param field: VmHWM for the high-water mark or VmRSS for the current resident set.
+        """
+        try:
+            with open("/proc/self/status") as status:
+                for line in status:
+                    if line.startswith(f"{field}:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    @staticmethod
+    def measure(func: Callable[[], object]) -> dict:
+        gc.collect()
+        resident = PeakMemory.resident_bytes("VmRSS")
+        isolated = PeakMemory.reset_resident()
+        tracemalloc.start()
+        try:
+            func()
+            _, python_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"rss_before_bytes": resident, "peak_rss_bytes": PeakMemory.resident_bytes(), "peak_rss_isolated": isolated,
+                "peak_python_bytes": python_peak}
+
+
+class BenchmarkRunner:
+    """
+    Times named stages and collects their results.
+    """
+
+    def __init__(self, repeat: int, warmup: int = 1):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.stages: List[dict] = []
+
+    def run(self, name: str, func: Callable[[], object], items: Union[int, None] = None) -> object:
+        """
+        Time a stage.
+
+        :param name: Name of the stage in the results.
+        :param func: The stage. Called warmup + repeat times, and once more for memory.
+        :param items: Number of elements the stage handles, to report a throughput.
+        :return: The value returned by the last call.
+        """
+        result = None
+        for _ in range(self.warmup):
+            result = func()
+        seconds = []
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            result = func()
+            seconds.append(time.perf_counter() - start)
+        stage = {
+            "name": name,
+            "seconds": seconds,
+            "median_seconds": statistics.median(seconds),
+            "min_seconds": min(seconds),
+            "stdev_seconds": statistics.stdev(seconds) if len(seconds) > 1 else 0.0,
+            "items": items,
+            "items_per_second": items / statistics.median(seconds) if items and statistics.median(seconds) > 0 else None,
+            **PeakMemory.measure(func),
+        }
+        self.stages.append(stage)
+        print(f"{name:<32} {stage['median_seconds'] * 1000:>10.2f} ms  (min {stage['min_seconds'] * 1000:.2f} ms)"
+              f"  RSS +{rss_growth(stage) / 1024 ** 2:>7.1f} MB  python {stage['peak_python_bytes'] / 1024 ** 2:>8.1f} MB")
+        return result
+
+
+def rss_growth(stage: dict) -> int:
+    """
+    Resident memory a stage needed on top of what the process held before it.
+    """
+    return stage["peak_rss_bytes"] - stage["rss_before_bytes"]
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "ifcopenshell": ifcopenshell.version,
+        "numpy": np.__version__,
+        "geometry_workers": GEOMETRY_WORKERS,
+    }
+
+
+def run(size: ModelSize, seed: int, repeat: int, warmup: int, workdir: str) -> dict:
+    runner = BenchmarkRunner(repeat, warmup)
+    path = os.path.join(workdir, f"benchmark-{seed}.ifc")
+    generator = SyntheticModelGenerator(size, seed)
+    runner.run("generate", lambda: SyntheticModelGenerator(size, seed).write(path), generator.element_count())
+    file_size = os.path.getsize(path)
+
+    ifc_file = runner.run("load", lambda: IfcUtilsFile.load(path))
+    runner.run("stream_category_summary", lambda: IfcStepScanner.summarize_by_category(path))
+    runner.run("summarize_by_category", lambda: IfcUtilsFile.summarize_by_category(ifc_file))
+    runner.run("seperate_by_category", lambda: IfcUtilsFile.seperate_by_category(ifc_file))
+    runner.run("seperate_by_category_json", lambda: IfcUtilsFile.seperate_by_category(ifc_file, to_json=True))
+
+    slabs = ifc_file.by_type("IfcSlab")
+    walls = ifc_file.by_type("IfcWallStandardCase")
+    runner.run("parse_slab", lambda: [IfcGeometryUtil.parse_slab(slab) for slab in slabs], len(slabs))
+    runner.run("parse_wall_standard", lambda: [IfcGeometryUtil.parse_wall_standard(wall) for wall in walls], len(walls))
+
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    meshes = runner.run("tessellate", lambda: IfcUtilsFile.get_element_meshes(ifc_file, type_filter), generator.element_count())
+    runner.run("serialize_geometry_json", lambda: IfcUtilsFile.serialize_geometry(meshes), len(meshes))
+    runner.run("encode_geometry_binary", lambda: GeometryBinaryEncoder.encode(meshes), len(meshes))
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "model": {**size.to_dict(), "seed": seed, "elements": generator.element_count(), "file_bytes": file_size,
+                  "instances": len(list(ifc_file))},
+        "settings": {"repeat": repeat, "warmup": warmup},
+        "stages": runner.stages,
+    }
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """
+    Print the median time and the resident memory growth of every stage relative to a baseline result.
+    """
+    if baseline.get("model") != results.get("model"):
+        print("Warning: the baseline was measured on a different model.")
+    baseline_stages = {stage["name"]: stage for stage in baseline.get("stages", [])}
+    print(f"\n{'stage':<32} {'time':>10} {'RSS growth':>10}")
+    for stage in results["stages"]:
+        previous = baseline_stages.get(stage["name"])
+        if previous is None:
+            continue
+        time_ratio = stage["median_seconds"] / previous["median_seconds"] if previous["median_seconds"] else float("nan")
+        memory_ratio = rss_growth(stage) / rss_growth(previous) if rss_growth(previous) > 0 else float("nan")
+        print(f"{stage['name']:<32} {time_ratio:>9.2f}x {memory_ratio:>9.2f}x")
+
+
+def main(argv: Union[List[str], None] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slabs", type=int, default=200)
+    parser.add_argument("--walls", type=int, default=200)
+    parser.add_argument("--columns", type=int, default=200)
+    parser.add_argument("--mapped", type=int, default=200)
+    parser.add_argument("--storeys", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="Path of the JSON result. Defaults to benchmarks/results/<time>.json")
+    parser.add_argument("--baseline", help="JSON result to compare with.")
+    arguments = parser.parse_args(argv)
+
+    logging.getLogger("src").setLevel(logging.WARNING)
+    size = ModelSize(arguments.slabs, arguments.walls, arguments.columns, arguments.mapped, arguments.storeys)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(size, arguments.seed, arguments.repeat, arguments.warmup, workdir)
+
+    output = arguments.output or os.path.join(os.path.dirname(__file__), "results", time.strftime("%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if arguments.baseline:
+        with open(arguments.baseline, "r", encoding="utf-8") as baseline_file:
+            compare(results, json.load(baseline_file))
+    return results
+
+
+if __name__ == "__main__":
+    main()
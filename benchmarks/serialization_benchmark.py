@@ -0,0 +1,97 @@
+"""
+Benchmark of the JSON geometry encoding on a synthetic model.
+
+Run from the repository root:
+    python -m benchmarks.serialization_benchmark --elements 2000 --repeat 5
+
+Compares the previous encoding (json.dumps with indent=4, then encoded again as a JSON string by JSONResponse)
+with the compact single pass encoders of JsonEncoder, with mesh arrays as lists and as NumPy arrays.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import List, Union
+
+os.environ.setdefault("SERVER_PORT", "8000")
+
+from fastapi.responses import JSONResponse
+
+from benchmarks.model_generator import ModelSize, SyntheticModelGenerator
+from benchmarks.run_benchmarks import BenchmarkRunner, environment
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.server_utils.json_encoder import JsonEncoder
+
+
+def legacy_encode(meshes) -> bytes:
+    geometry_json = json.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False), indent=4, default=str)
+    return JSONResponse(content=geometry_json).body
+
+
+def run(elements: int, seed: int, repeat: int, warmup: int, workdir: str) -> dict:
+    per_kind = max(elements // 4, 1)
+    size = ModelSize(slabs=per_kind, walls=per_kind, columns=per_kind, mapped=per_kind)
+    path = SyntheticModelGenerator(size, seed).write(os.path.join(workdir, f"serialization-{seed}.ifc"))
+    ifc_file = IfcUtilsFile.load(path)
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    meshes = IfcUtilsFile.get_element_meshes(ifc_file, type_filter)
+
+    variants = {
+        "legacy_indent_double_encoded": lambda: legacy_encode(meshes),
+        "json_compact_lists": lambda: JsonEncoder.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False), "json"),
+        "json_compact_arrays": lambda: JsonEncoder.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False, as_arrays=True), "json"),
+    }
+    if "orjson" in JsonEncoder.encoders():
+        variants["orjson_lists"] = lambda: JsonEncoder.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False), "orjson")
+        variants["orjson_arrays"] = lambda: JsonEncoder.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False, as_arrays=True), "orjson")
+
+    runner = BenchmarkRunner(repeat, warmup)
+    for name, encode in variants.items():
+        body = runner.run(name, encode, len(meshes))
+        stage = runner.stages[-1]
+        stage["body_bytes"] = len(body)
+        stage["gzip_bytes"] = len(gzip.compress(body, compresslevel=6, mtime=0))
+
+    legacy = runner.stages[0]
+    print(f"\n{'variant':<32} {'speedup':>8} {'body MB':>9} {'gzip MB':>9}")
+    for stage in runner.stages:
+        stage["speedup"] = legacy["median_seconds"] / stage["median_seconds"] if stage["median_seconds"] else None
+        print(f"{stage['name']:<32} {stage['speedup']:>7.2f}x {stage['body_bytes'] / 1024 ** 2:>9.2f} {stage['gzip_bytes'] / 1024 ** 2:>9.2f}")
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "model": {**size.to_dict(), "seed": seed, "meshes": len(meshes),
+                  "vertices": int(sum(len(mesh.vertices) for mesh in meshes))},
+        "settings": {"repeat": repeat, "warmup": warmup},
+        "stages": runner.stages,
+    }
+
+
+def main(argv: Union[List[str], None] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elements", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="Path of the JSON result. Defaults to benchmarks/results/serialization-<time>.json")
+    arguments = parser.parse_args(argv)
+
+    logging.getLogger("src").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(arguments.elements, arguments.seed, arguments.repeat, arguments.warmup, workdir)
+
+    output = arguments.output or os.path.join(os.path.dirname(__file__), "results", time.strftime("serialization-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"\nResults written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,18 @@ load_dotenv()
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
 SERVER_PORT = int(os.getenv("SERVER_PORT"))
-SERVER_HOST = os.getenv("SERVER_HOST")
\ No newline at end of file
+SERVER_HOST = os.getenv("SERVER_HOST")
+GEOMETRY_WORKERS = int(os.getenv("GEOMETRY_WORKERS", os.cpu_count() or 1))
+MODEL_CACHE_BUDGET_MB = int(os.getenv("MODEL_CACHE_BUDGET_MB", 2048))
+MODEL_MEMORY_FACTOR = float(os.getenv("MODEL_MEMORY_FACTOR", 8))
+IFC_EXECUTOR_WORKERS = int(os.getenv("IFC_EXECUTOR_WORKERS", 2))
+MODEL_IDLE_TTL_SECONDS = float(os.getenv("MODEL_IDLE_TTL_SECONDS", 1800))
+MAX_RESIDENT_MODELS = int(os.getenv("MAX_RESIDENT_MODELS", 8))
+GEOMETRY_STORE_DIR = os.getenv("GEOMETRY_STORE_DIR", "geometry_store")
+GEOMETRY_STORE_BUDGET_MB = int(os.getenv("GEOMETRY_STORE_BUDGET_MB", 10240))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", 16))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", 3600))
+JOB_EVENT_INTERVAL_SECONDS = float(os.getenv("JOB_EVENT_INTERVAL_SECONDS", 0.5))
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+STREAM_CACHE_LIMIT_MB = int(os.getenv("STREAM_CACHE_LIMIT_MB", 512))
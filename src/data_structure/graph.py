@@ -1,5 +1,7 @@
 from collections import defaultdict
-from typing import Dict, Set
+from typing import Dict, List, Set, Union
+
+import numpy as np
 
 class Graph:
     """
@@ -16,8 +18,203 @@ class Graph:
     def get_connections(self) -> Dict[str, Set[str]]:
         return self.graph
 
+    def freeze(self) -> 'CompactGraph':
+        """
+        Convert to the immutable CSR form.
+        """
+        nodes = np.array(sorted(self.graph))
+        sources = []
+        targets = []
+        for node, edges in self.graph.items():
+            for edge in edges:
+                sources.append(node)
+                targets.append(edge)
+        return CompactGraph.from_edges(nodes, np.searchsorted(nodes, sources), np.searchsorted(nodes, targets))
+
     def __str__(self):
         result = ""
         for node, edges in self.graph.items():
             result += f"{node}: {', '.join(edges)}\n"
         return result
+
+
+class CompactGraph:
+    """
+    Immutable undirected graph in CSR form.
+    The neighbours of node i are indices[indptr[i]:indptr[i + 1]], and edge_kinds holds an integer tag per entry.
+    Nodes are addressed by position; `nodes` maps positions to ids and is sorted, so ids are found by binary search.
+    """
+
+    def __init__(self, nodes: np.ndarray, indptr: np.ndarray, indices: np.ndarray, edge_kinds: np.ndarray):
+        """
+        Initialize a new CompactGraph object. Use from_edges to build one.
+
+        :param nodes: (N,) sorted node ids.
+        :param indptr: (N + 1,) offsets of each node in indices.
+        :param indices: (E,) neighbour positions.
+        :param edge_kinds: (E,) tag of each entry of indices.
+        """
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_kinds = edge_kinds
+
+    @classmethod
+    def from_edges(cls, nodes: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                   kinds: Union[np.ndarray, None] = None) -> 'CompactGraph':
+        """
+        Build from edge lists. Edges are made symmetric, self loops are dropped and duplicates are merged,
+        keeping the largest kind.
+
+        :param nodes: (N,) sorted node ids.
+        :param sources: (E,) positions of edge sources.
+        :param targets: (E,) positions of edge targets.
+        :param kinds: (E,) tag of each edge. Defaults to 0.
+        :return: A new CompactGraph object.
+        """
+        count = len(nodes)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        kinds = np.zeros(len(sources), dtype=np.int8) if kinds is None else np.asarray(kinds, dtype=np.int8)
+
+        keep = sources != targets
+        sources, targets, kinds = sources[keep], targets[keep], kinds[keep]
+        sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        kinds = np.concatenate([kinds, kinds])
+
+        # Sort by (source, target, kind) so the last entry of every duplicate run has the largest kind.
+        order = np.lexsort((kinds, targets, sources))
+        sources, targets, kinds = sources[order], targets[order], kinds[order]
+        last = np.ones(len(sources), dtype=bool)
+        last[:-1] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        sources, targets, kinds = sources[last], targets[last], kinds[last]
+
+        indptr = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=count), out=indptr[1:])
+        return cls(np.asarray(nodes), indptr, targets, kinds)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def index_of(self, node) -> Union[int, None]:
+        """
+        Position of a node id, or None if it is not in the graph.
+        """
+        index = int(np.searchsorted(self.nodes, node))
+        if index < len(self.nodes) and self.nodes[index] == node:
+            return index
+        return None
+
+    def neighbours(self, node) -> List[tuple]:
+        """
+        Neighbours of a node id.
+
+        :return: [(neighbour id, edge kind)]
+        """
+        index = self.index_of(node)
+        if index is None:
+            return []
+        start, end = self.indptr[index], self.indptr[index + 1]
+        return list(zip(self.nodes[self.indices[start:end]].tolist(), self.edge_kinds[start:end].tolist()))
+
+    def edge_sources(self) -> np.ndarray:
+        """
+        Source position of every entry of indices.
+        """
+        return np.repeat(np.arange(len(self.nodes)), self.degrees())
+
+    def subgraph(self, edge_mask: np.ndarray) -> 'CompactGraph':
+        """
+        The same nodes with only the entries of indices selected by edge_mask.
+        """
+        sources = self.edge_sources()[edge_mask]
+        indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(self.nodes)), out=indptr[1:])
+        return CompactGraph(self.nodes, indptr, self.indices[edge_mask], self.edge_kinds[edge_mask])
+
+    def component_labels(self) -> np.ndarray:
+        """
+        Connected component of every node, numbered from 0 in order of the smallest node of each component.
+        Hooks every tree root onto the smallest neighbouring root and compresses paths until the edges agree,
+        so the number of vectorized rounds grows with log N rather than with the length of a chain.
+        """
+        labels = np.arange(len(self.nodes))
+        sources = self.edge_sources()
+        targets = self.indices
+        while True:
+            source_labels = labels[sources]
+            target_labels = labels[targets]
+            differ = source_labels != target_labels
+            if not np.any(differ):
+                break
+            np.minimum.at(labels, np.maximum(source_labels[differ], target_labels[differ]),
+                          np.minimum(source_labels[differ], target_labels[differ]))
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+        return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+    def components(self) -> List[List]:
+        """
+        Node ids of every connected component, largest component first.
+        """
+        labels = self.component_labels()
+        return self.group(labels)
+
+    def group(self, labels: np.ndarray) -> List[List]:
+        """
+        Node ids grouped by label, largest group first.
+        """
+        if len(labels) == 0:
+            return []
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels)
+        groups = np.split(self.nodes[order], np.cumsum(counts)[:-1])
+        groups.sort(key=len, reverse=True)
+        return [group.tolist() for group in groups]
+
+    def chains(self, edge_mask: Union[np.ndarray, None] = None) -> List[List]:
+        """
+        Maximal runs of nodes linked one after another, in walking order.
+        Only the selected edges are followed, and nodes with more than two of them end runs, as they start branches.
+        A closed loop is returned starting from its smallest node.
+
+        :param edge_mask: Entries of indices to follow. Defaults to every edge.
+        :return: Node ids of every run, longest first.
+        """
+        graph = self if edge_mask is None else self.subgraph(edge_mask)
+        degrees = graph.degrees()
+        sources = graph.edge_sources()
+        linear = (degrees[sources] <= 2) & (degrees[graph.indices] <= 2)
+        runs = graph.subgraph(linear)
+        run_degrees = runs.degrees()
+
+        visited = np.zeros(len(self.nodes), dtype=bool)
+        chains = []
+        # Open runs start at an end, then whatever is left are closed loops.
+        starts = np.concatenate([np.flatnonzero(run_degrees <= 1), np.flatnonzero(run_degrees == 2)])
+        for start in starts.tolist():
+            if visited[start]:
+                continue
+            chain = [start]
+            visited[start] = True
+            current = start
+            while True:
+                following = [node for node in runs.indices[runs.indptr[current]:runs.indptr[current + 1]].tolist() if not visited[node]]
+                if not following:
+                    break
+                current = following[0]
+                visited[current] = True
+                chain.append(current)
+            chains.append(self.nodes[chain].tolist())
+        chains.sort(key=len, reverse=True)
+        return chains
@@ -0,0 +1,161 @@
+import heapq
+from typing import List, Tuple
+
+import numpy as np
+
+
+class SpatialIndex:
+    """
+    Packed AABB tree over element bounding boxes, bulk built once and queried with NumPy.
+
+    Leaves are sorted along a Morton curve of their centers and grouped `node_size` at a time, level after level,
+    until a single root remains. Queries walk the tree one level at a time and test every candidate node of a level
+    in one vectorized step.
+    """
+
+    def __init__(self, ids: np.ndarray, box_min: np.ndarray, box_max: np.ndarray, node_size=16):
+        """
+        Initialize a new SpatialIndex object.
+
+        :param ids: (N,) ids of the boxes. (element ids)
+        :param box_min: (N, 3) minimum corners.
+        :param box_max: (N, 3) maximum corners.
+        :param node_size: Number of children per node.
+        """
+        self.node_size = node_size
+        box_min = np.asarray(box_min, dtype=np.float64).reshape(-1, 3)
+        box_max = np.asarray(box_max, dtype=np.float64).reshape(-1, 3)
+
+        order = np.argsort(SpatialIndex.morton_codes((box_min + box_max) / 2), kind="stable")
+        self.ids = np.asarray(ids)[order]
+        # levels[0] are the leaves, levels[-1] is the root.
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = [(box_min[order], box_max[order])]
+        while len(self.levels[-1][0]) > 1:
+            level_min, level_max = self.levels[-1]
+            starts = np.arange(0, len(level_min), node_size)
+            self.levels.append((np.minimum.reduceat(level_min, starts, axis=0), np.maximum.reduceat(level_max, starts, axis=0)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def morton_codes(points: np.ndarray, bits=10) -> np.ndarray:
+        """
+        Interleave the bits of quantized coordinates into one sort key per point.
+        """
+        if len(points) == 0:
+            return np.empty(0, dtype=np.int64)
+        low = points.min(axis=0)
+        extent = np.maximum(points.max(axis=0) - low, 1e-12)
+        quantized = ((points - low) / extent * ((1 << bits) - 1)).astype(np.int64)
+        codes = np.zeros(len(points), dtype=np.int64)
+        for bit in range(bits):
+            for axis in range(3):
+                codes |= ((quantized[:, axis] >> bit) & 1) << (3 * bit + axis)
+        return codes
+
+    def children(self, nodes: np.ndarray, level: int) -> np.ndarray:
+        """
+        Indices in level - 1 of the children of nodes in level.
+        """
+        children = (nodes[:, None] * self.node_size + np.arange(self.node_size)).ravel()
+        return children[children < len(self.levels[level - 1][0])]
+
+    def traverse(self, test) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Walk the tree keeping only nodes that pass `test(level_min, level_max) -> (mask, values)`.
+
+        :return: (leaf indices, test values of those leaves)
+        """
+        if len(self.ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        level = len(self.levels) - 1
+        nodes = np.arange(len(self.levels[level][0]))
+        while True:
+            level_min, level_max = self.levels[level]
+            mask, values = test(level_min[nodes], level_max[nodes])
+            nodes = nodes[mask]
+            if level == 0:
+                return nodes, values[mask]
+            nodes = self.children(nodes, level)
+            level -= 1
+
+    def query_box(self, query_min, query_max) -> np.ndarray:
+        """
+        Ids of the boxes overlapping a query box.
+
+        :param query_min: Minimum corner of the query box.
+        :param query_max: Maximum corner of the query box.
+        :return: Array of ids.
+        """
+        query_min = np.asarray(query_min, dtype=np.float64)
+        query_max = np.asarray(query_max, dtype=np.float64)
+
+        def test(node_min, node_max):
+            mask = np.all((node_min <= query_max) & (node_max >= query_min), axis=1)
+            return mask, mask
+
+        leaves, _ = self.traverse(test)
+        return self.ids[np.sort(leaves)]
+
+    def query_ray(self, origin, direction, max_distance=np.inf) -> List[Tuple[object, float]]:
+        """
+        Boxes hit by a ray, nearest first.
+
+        :param origin: Origin of the ray.
+        :param direction: Direction of the ray. Distances are in multiples of its length.
+        :param max_distance: Ignore hits further than this.
+        :return: [(id, entry distance)]
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        # Slabs parallel to the ray only restrict it by containing the origin.
+        parallel = direction == 0
+        inverse = np.divide(1.0, direction, out=np.zeros(3), where=~parallel)
+
+        def test(node_min, node_max):
+            t1 = (node_min - origin) * inverse
+            t2 = (node_max - origin) * inverse
+            t_near = np.where(parallel, -np.inf, np.minimum(t1, t2)).max(axis=1)
+            t_far = np.where(parallel, np.inf, np.maximum(t1, t2)).min(axis=1)
+            inside = np.all(~parallel | ((node_min <= origin) & (origin <= node_max)), axis=1)
+            t_enter = np.maximum(t_near, 0.0)
+            return inside & (t_enter <= t_far) & (t_enter <= max_distance), t_enter
+
+        leaves, distances = self.traverse(test)
+        order = np.argsort(distances, kind="stable")
+        return [(self.ids[leaf].item(), float(distance)) for leaf, distance in zip(leaves[order], distances[order])]
+
+    def nearest(self, point, k=1) -> List[Tuple[object, float]]:
+        """
+        The k boxes closest to a point, by distance from the point to the box. (0 inside the box)
+
+        :param point: The query point.
+        :param k: Number of boxes to return.
+        :return: [(id, distance)] nearest first.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        if len(self.ids) == 0 or k <= 0:
+            return []
+
+        def distances(level: int, nodes: np.ndarray) -> np.ndarray:
+            level_min, level_max = self.levels[level]
+            gap = np.maximum(np.maximum(level_min[nodes] - point, point - level_max[nodes]), 0.0)
+            return np.linalg.norm(gap, axis=1)
+
+        top = len(self.levels) - 1
+        top_nodes = np.arange(len(self.levels[top][0]))
+        heap = [(distance, top, node) for distance, node in zip(distances(top, top_nodes).tolist(), top_nodes.tolist())]
+        heapq.heapify(heap)
+
+        result = []
+        while heap and len(result) < k:
+            distance, level, node = heapq.heappop(heap)
+            if level == 0:
+                result.append((self.ids[node].item(), distance))
+                continue
+            children = self.children(np.array([node]), level)
+            for child_distance, child in zip(distances(level - 1, children).tolist(), children.tolist()):
+                heapq.heappush(heap, (child_distance, level - 1, child))
+        return result
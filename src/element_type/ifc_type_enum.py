@@ -1,4 +1,5 @@
-from enum import Enum
+from enum import Enum, IntEnum
+from typing import List, Union
 import ifcopenshell
 import ifcopenshell.util.element
 
@@ -38,3 +39,100 @@ class ElementType(Enum):
     def has_geometry_type(element: ifcopenshell.entity_instance) -> bool:
         return element.is_a() in { gt.value for gt in ElementType }
 
+
+
+class ConnectionKind(IntEnum):
+    """
+    How two elements are joined, from IfcRelConnectsElements and its subtype IfcRelConnectsPathElements.
+    Higher values are kept when two elements are joined more than once.
+    """
+    ELEMENT = 0
+    # Path connection where at least one side joins along its path. (T junction)
+    PATH = 1
+    # Path connection where both sides join at their start or end. (L or straight junction)
+    END = 2
+
+    @staticmethod
+    def of_relation(relation: ifcopenshell.entity_instance) -> 'ConnectionKind':
+        if not relation.is_a("IfcRelConnectsPathElements"):
+            return ConnectionKind.ELEMENT
+        ends = ("ATSTART", "ATEND")
+        if relation.RelatingConnectionType in ends and relation.RelatedConnectionType in ends:
+            return ConnectionKind.END
+        return ConnectionKind.PATH
+
+
+class ElementTypeFilter:
+    """
+    Selection of elements by IFC class for geometry extraction.
+    Included types default to every geometric ElementType and cover their subtypes. Excluded types win over included ones.
+    """
+
+    def __init__(self, include: Union[List[str], None] = None, exclude: Union[List[str], None] = None, label: Union[str, None] = None):
+        """
+        Initialize a new ElementTypeFilter object.
+
+        :param include: IFC classes to include. Defaults to every ElementType.
+        :param exclude: IFC classes to exclude.
+        :param label: Type label recorded on every mesh instead of the IFC class of the element.
+        """
+        self.include = list(include) if include else []
+        self.exclude = list(exclude) if exclude else []
+        self.label = label
+
+    @classmethod
+    def for_entity(cls, entity_name: str) -> 'ElementTypeFilter':
+        """
+        Every instance of a single IFC class, labelled with that class.
+        """
+        return cls([entity_name], label=entity_name)
+
+    @classmethod
+    def from_names(cls, include: Union[List[str], None], exclude: Union[List[str], None] = None) -> 'ElementTypeFilter':
+        """
+        Build a filter from requested type names, validated against ElementType.
+
+        :param include: Requested IFC classes.
+        :param exclude: IFC classes to leave out.
+        :return: A new ElementTypeFilter object.
+        """
+        return cls([cls.resolve_name(name) for name in include or []], [cls.resolve_name(name) for name in exclude or []])
+
+    @staticmethod
+    def resolve_name(name: str) -> str:
+        """
+        The ElementType value of a requested type name, matched case-insensitively.
+
+        :param name: Requested IFC class.
+        :return: The IFC class as spelled by ElementType.
+        """
+        for element_type in ElementType:
+            if element_type.value.lower() == name.strip().lower():
+                return element_type.value
+        raise ValueError(f"Unsupported element type: {name}")
+
+    def key(self) -> str:
+        """
+        Stable key of the selection, used to cache its payloads.
+        """
+        include = ",".join(sorted(self.include)) if self.include else "*"
+        key = include if not self.exclude else f"{include}-{','.join(sorted(self.exclude))}"
+        return key if self.label is None else f"{key}@{self.label}"
+
+    def collect(self, ifc_file: ifcopenshell.file) -> List[ifcopenshell.entity_instance]:
+        """
+        Elements of the file matching the filter, in file order.
+        """
+        include = self.include if self.include else [element_type.value for element_type in ElementType]
+        elements = {}
+        for name in include:
+            try:
+                instances = ifc_file.by_type(name)
+            except RuntimeError:
+                # Type is not part of the file's schema. (e.g. IfcWallStandardCase in IFC4X3)
+                continue
+            for element in instances:
+                if any(element.is_a(excluded) for excluded in self.exclude):
+                    continue
+                elements[element.id()] = element
+        return [elements[element_id] for element_id in sorted(elements)]
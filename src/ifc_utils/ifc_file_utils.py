@@ -1,10 +1,22 @@
 from src.server_utils.method_loggers import *
 import ifcopenshell.util.element
-import json
-from src.ifc_utils.ifc_geometry_utils import IfcGeometryUtil
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+import numpy as np
+from typing import Callable, Iterator, List
+from src.ifc_utils.ifc_geometry_engine import IfcGeometryEngine
 
 from src.model.model_elements import *
 from src.model.model_elements_simple import *
+from src.model.model_mesh import ElementMesh, MeshLibrary
+from src.model.model_quantities import MeshQuantities
+from src.model.model_slicing import MeshSlicer
+from src.model.model_quantization import MeshQuantizer
+from src.element_type.ifc_type_enum import ElementTypeFilter, ConnectionKind
+from src.data_structure.graph import CompactGraph
+from src.data_structure.spatial_index import SpatialIndex
+from src.server_utils.metrics import ELEMENTS_TESSELLATED, ELEMENTS_FAILED
+from src.server_utils.json_encoder import JsonEncoder
 
 class IfcUtilsFile:
     """
@@ -23,7 +35,7 @@ class IfcUtilsFile:
         elements = file.by_type('IfcProduct')
         if elements is None:
             Logger.log_error("No IfcProduct elements found.")
-            return categories if not to_json else json.dumps(categories, indent=4, default=str)
+            return categories if not to_json else JsonEncoder.dumps(categories).decode("utf-8")
 
         for element in elements:
             try:
@@ -34,9 +46,6 @@ class IfcUtilsFile:
                 # Get Element Type
                 element_type = element.is_a()
 
-                # Collect Slab
-                if element.is_a('IfcSlab'):
-                    slab = SlabSimple(element)
                 # Collections
                 if element_type not in categories:
                     categories[element_type] = []
@@ -54,83 +63,313 @@ class IfcUtilsFile:
                 continue
 
         if to_json:
-            return json.dumps(categories, indent=4, default=str)
+            return JsonEncoder.dumps(categories).decode("utf-8")
         else:
             return categories
 
     @staticmethod
     @Logger.log_method
-    def get_geometry(ifc_file: ifcopenshell.file, entity_name="IfcSlab", to_json=True, yz_swap=True):
-        elements = ifc_file.by_type('IfcProduct')
-        if elements is None:
-            Logger.log_error("No IfcProduct elements found.")
+    def summarize_by_category(file: ifcopenshell.file, to_json=False):
+        """
+        Count products per IFC class and list their ids, without reading attributes or geometry.
+        :param file:
+        :param to_json:
+        :return: {element type: {"count": int, "ids": [int]}}
+        """
+        summary = {}
+        for element in file.by_type('IfcProduct') or []:
+            element_type = element.is_a()
+            if element_type not in summary:
+                summary[element_type] = {"count": 0, "ids": []}
+            summary[element_type]["count"] += 1
+            summary[element_type]["ids"].append(element.id())
 
-        elements = ifc_file.by_type(entity_name)
-        all_geometry_data = []
+        if to_json:
+            return JsonEncoder.dumps(summary).decode("utf-8")
+        else:
+            return summary
 
-        for element in elements:
-            try:
-                if element is None:
-                    Logger.log_error("Encountered a NoneType element.")
-                    continue
+    @staticmethod
+    @Logger.log_method
+    def get_category_page(file: ifcopenshell.file, element_type: str, offset=0, limit=100, fields=None, to_json=False):
+        """
+        Attributes of one page of the products of an IFC class.
+        :param file:
+        :param element_type: IFC class. Only exact instances are listed, like in seperate_by_category.
+        :param offset: Index of the first element of the page.
+        :param limit: Maximum number of elements of the page.
+        :param fields: Attribute names to include. Every attribute is included if omitted.
+        :param to_json:
+        :return:
+        """
+        try:
+            elements = [element for element in file.by_type(element_type, include_subtypes=False)]
+        except RuntimeError:
+            elements = []
 
-                # Get Element Type
-                element_type = element.is_a()
+        items = []
+        for element in elements[offset:offset + limit]:
+            if fields:
+                item = {"id": element.id(), "type": element.is_a()}
+                for field in fields:
+                    item[field] = IfcUtilsFile._project_value(getattr(element, field, None))
+            else:
+                item = {key: IfcUtilsFile._project_value(value) for key, value in element.get_info().items()}
+            items.append(item)
+
+        page = {
+            "type": element_type,
+            "total": len(elements),
+            "offset": offset,
+            "limit": limit,
+            "items": items,
+        }
+        if to_json:
+            return JsonEncoder.dumps(page).decode("utf-8")
+        else:
+            return page
+
+    @staticmethod
+    def _project_value(value):
+        """
+        Replace referenced entities by their id and type so a page never pulls in the referenced graph.
+        """
+        if isinstance(value, ifcopenshell.entity_instance):
+            # Defined types (IfcLabel, IfcLengthMeasure, ...) have no id and carry a plain value.
+            if value.id() == 0 and hasattr(value, "wrappedValue"):
+                return IfcUtilsFile._project_value(value.wrappedValue)
+            return {"id": value.id(), "type": value.is_a()}
+        if isinstance(value, (tuple, list)):
+            return [IfcUtilsFile._project_value(item) for item in value]
+        return value
 
-                # Collect Slab
-                if element.is_a('IfcSlab'):
-                    slab = SlabSimple(element)
-                    geometry_type = slab.get_geometry_element().geometry.__class__.__name__
-
-                    shape = slab.get_geometry_element()
-                    matrix = np.array(shape.transformation.matrix).reshape(-1, 4)[-1][0:3]
-                    location = []
-
-                    vertices = slab.get_geometry_element().geometry.verts
-                    vertices = np.array(vertices).reshape(-1, 3)
-
-                    if yz_swap:
-                        vertices = vertices[:, [0, 2, 1]].tolist()
-                        location = [matrix[0], matrix[2], matrix[1]]
-                    else:
-                        vertices = vertices.tolist()
-                        location = [matrix[0], matrix[1], matrix[2]]
-
-                    faces = slab.get_geometry_element().geometry.faces
-                    faces = np.array(faces).reshape(-1, 3).tolist()
-
-                    normals = slab.get_geometry_element().geometry.normals
-
-                    edges = slab.get_geometry_element().geometry.edges
-                    edges = np.array(edges).reshape(-1, 2).tolist()
-
-                    geometry_data = {
-                        "id": element.id(),
-                        "type": "IfcSlab",
-                        "geometryType": geometry_type,
-                        "vertices": vertices,
-                        "vertices_count": len(vertices),
-                        "faces": faces,
-                        "faces_count": len(faces),
-                        "normals": normals,
-                        "normals_count": len(normals),
-                        "edges": edges,
-                        "edges_count": len(edges),
-                        "location": location,
-                    }
-                    all_geometry_data.append(geometry_data)
+    @staticmethod
+    def iter_element_meshes(ifc_file: ifcopenshell.file, type_filter: ElementTypeFilter, workers=None, elements=None,
+                            on_progress: Callable[[int, int], None] | None = None) -> Iterator[ElementMesh]:
+        """
+        Tessellate the elements selected by the filter and yield their meshes in model order,
+        Only the selected elements with a representation are handed to the geometry iterator.
+        apart from overdue shapes the geometry iterator yields late. (see IfcGeometryEngine.iterate_shapes)
+        :param ifc_file:
+        :param type_filter: IFC classes to collect.
+        :param workers: Number of tessellation threads. Defaults to GEOMETRY_WORKERS.
+        :param elements: Elements to tessellate instead of the ones selected by type_filter.
+        :param on_progress: Called with (elements done, total elements) after every tessellated element.
+        :return:
+        """
+        if elements is None:
+            elements = type_filter.collect(ifc_file)
+        elements = [element for element in elements if IfcGeometryEngine.has_representation(element)]
+        if not elements:
+            Logger.log_info(f"No elements with a representation found for {type_filter.key()}.")
 
+        geometry_cache = {}
+        done = 0
+        for element, shape in IfcGeometryEngine.iterate_shapes(ifc_file, elements, workers):
+            done += 1
+            mesh = None
+            try:
+                if shape is None:
+                    raise RuntimeError("the geometry iterator returned no shape")
+                mesh = ElementMesh.from_shape(element, shape, element_type=type_filter.label, geometry_cache=geometry_cache)
             except Exception as e:
+                ELEMENTS_FAILED.inc()
                 Logger.log_error(f"An error occurred while separating by category: {e}")
                 Logger.log_error(f"Current Element : {element}")
-            finally:
-                continue
+            else:
+                ELEMENTS_TESSELLATED.inc()
+            if on_progress is not None:
+                on_progress(done, len(elements))
+            if mesh is not None:
+                yield mesh
 
+    @staticmethod
+    @Logger.log_method
+    def get_element_meshes(ifc_file: ifcopenshell.file, type_filter: ElementTypeFilter, workers=None, elements=None,
+                           on_progress: Callable[[int, int], None] | None = None) -> List[ElementMesh]:
+        return list(IfcUtilsFile.iter_element_meshes(ifc_file, type_filter, workers, elements, on_progress))
+
+    @staticmethod
+    def serialize_geometry(meshes: List[ElementMesh], to_json=True, yz_swap=True, quantize=False, as_arrays=False):
+        """
+        Convert meshes to the per-element dictionaries returned by /getgeometry.
+        :param meshes:
+        :param to_json:
+        :param yz_swap: Swap Y and Z axes for Y-up viewers.
+        :param quantize: Encode positions and normals as integers, with decode parameters per element.
+        :param as_arrays: Keep mesh arrays as NumPy arrays, for JsonEncoder.
+        :return:
+        """
+        as_arrays = as_arrays or to_json
+        if quantize:
+            all_geometry_data = [MeshQuantizer.to_dict(mesh, yz_swap, as_arrays) for mesh in meshes]
+        else:
+            all_geometry_data = [mesh.to_dict(yz_swap, as_arrays) for mesh in meshes]
         if to_json:
-            return json.dumps(all_geometry_data, indent=4, default=str)
+            return JsonEncoder.dumps(all_geometry_data).decode("utf-8")
         else:
             return all_geometry_data
 
+    @staticmethod
+    def serialize_instanced_geometry(meshes: List[ElementMesh], to_json=True, yz_swap=True, as_arrays=False):
+        """
+        Convert meshes to a library of unique meshes plus per-element transforms.
+        :param meshes:
+        :param to_json:
+        :param yz_swap: Swap Y and Z axes for Y-up viewers.
+        :param as_arrays: Keep mesh arrays as NumPy arrays, for JsonEncoder.
+        :return:
+        """
+        instanced_data = MeshLibrary.build(meshes).to_dict(yz_swap, as_arrays or to_json)
+        if to_json:
+            return JsonEncoder.dumps(instanced_data).decode("utf-8")
+        else:
+            return instanced_data
+
+    @staticmethod
+    @Logger.log_method
+    def compute_quantities(meshes: List[ElementMesh], to_json=False):
+        """
+        Volume, surface area and bounding box per element and per IFC class.
+        :param meshes:
+        :param to_json:
+        :return:
+        """
+        quantities = MeshQuantities.compute(meshes)
+        if to_json:
+            return JsonEncoder.dumps(quantities).decode("utf-8")
+        else:
+            return quantities
+
+    @staticmethod
+    def build_spatial_index(meshes: List[ElementMesh]) -> SpatialIndex:
+        """
+        Spatial index over the model space bounding boxes of the meshes. Meshes without vertices are left out.
+        :param meshes:
+        :return: Index whose ids are positions in meshes.
+        """
+        box_min, box_max = MeshQuantities.bounding_boxes(meshes)
+        indices = np.flatnonzero(~np.isnan(box_min[:, 0]))
+        return SpatialIndex(indices, box_min[indices], box_max[indices])
+
+    @staticmethod
+    @Logger.log_method
+    def build_connectivity(ifc_file: ifcopenshell.file, type_filter: ElementTypeFilter) -> CompactGraph:
+        """
+        Connection graph of the selected elements, read in one pass over IfcRelConnectsElements.
+        (IfcRelConnectsPathElements is one of its subtypes) Connections to elements outside the selection are dropped.
+        :param ifc_file:
+        :param type_filter:
+        :return: Graph whose nodes are element ids and whose edge kinds are ConnectionKind values.
+        """
+        nodes = np.array([element.id() for element in type_filter.collect(ifc_file)], dtype=np.int64)
+        sources = []
+        targets = []
+        kinds = []
+        for relation in ifc_file.by_type("IfcRelConnectsElements"):
+            if relation.RelatingElement is None or relation.RelatedElement is None:
+                continue
+            sources.append(relation.RelatingElement.id())
+            targets.append(relation.RelatedElement.id())
+            kinds.append(ConnectionKind.of_relation(relation))
+
+        sources = np.array(sources, dtype=np.int64)
+        targets = np.array(targets, dtype=np.int64)
+        source_index = np.minimum(np.searchsorted(nodes, sources), max(len(nodes) - 1, 0))
+        target_index = np.minimum(np.searchsorted(nodes, targets), max(len(nodes) - 1, 0))
+        if len(nodes):
+            selected = (nodes[source_index] == sources) & (nodes[target_index] == targets)
+        else:
+            selected = np.zeros(len(sources), dtype=bool)
+        kinds = np.array(kinds, dtype=np.int8)
+        return CompactGraph.from_edges(nodes, source_index[selected], target_index[selected], kinds[selected])
+
+    @staticmethod
+    def summarize_connectivity(graph: CompactGraph, quantities: dict | None = None) -> dict:
+        """
+        Connected components and wall runs of a connection graph.
+        Runs follow end to end path connections only, so T junctions and plain element connections split them.
+        :param graph:
+        :param quantities: Result of compute_quantities for the same elements, to merge volume and area per group.
+        :return:
+        """
+        components = graph.components()
+        runs = graph.chains(graph.edge_kinds == ConnectionKind.END)
+        measures = {element["id"]: (element["volume"], element["area"]) for element in quantities["elements"]} if quantities else None
+
+        def describe(groups: List[list]) -> List[dict]:
+            if measures is None:
+                return [{"count": len(group), "ids": group} for group in groups]
+            described = []
+            for group in groups:
+                group_measures = [measures[element_id] for element_id in group if element_id in measures]
+                described.append({
+                    "count": len(group),
+                    "ids": group,
+                    "volume": float(sum(volume for volume, _ in group_measures)),
+                    "area": float(sum(area for _, area in group_measures)),
+                })
+            return described
+
+        return {
+            "nodes": len(graph),
+            "edges": graph.edge_count,
+            "components": describe(components),
+            "runs": describe(runs),
+        }
+
+    @staticmethod
+    def get_storey_elevations(ifc_file: ifcopenshell.file) -> List[tuple]:
+        """
+        Elevation of every building storey in metres, the unit of the tessellated geometry.
+        The storey placement is used when present, otherwise its Elevation attribute.
+        :param ifc_file:
+        :return: [(storey name, elevation)] sorted by elevation, one entry per distinct elevation.
+        """
+        scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+        elevations = {}
+        for storey in ifc_file.by_type('IfcBuildingStorey'):
+            if storey.ObjectPlacement is not None:
+                elevation = ifcopenshell.util.placement.get_local_placement(storey.ObjectPlacement)[2][3]
+            elif storey.Elevation is not None:
+                elevation = storey.Elevation
+            else:
+                continue
+            elevation = round(float(elevation) * scale, 6)
+            elevations.setdefault(elevation, storey.Name or f"#{storey.id()}")
+        return [(name, elevation) for elevation, name in sorted(elevations.items())]
+
+    @staticmethod
+    @Logger.log_method
+    def slice_by_levels(meshes: List[ElementMesh], levels: List[tuple], to_json=False):
+        """
+        Volume and area of every element between consecutive levels.
+        :param meshes:
+        :param levels: [(name, elevation)] of the cutting planes.
+        :param to_json:
+        :return:
+        """
+        slices = MeshSlicer.slice(meshes, [elevation for _, elevation in levels], [name for name, _ in levels])
+        if to_json:
+            return JsonEncoder.dumps(slices).decode("utf-8")
+        else:
+            return slices
+
+    @staticmethod
+    @Logger.log_method
+    def get_geometry(ifc_file: ifcopenshell.file, entity_name="IfcSlab", to_json=True, yz_swap=True, workers=None):
+        """
+        Tessellate elements and collect their meshes.
+        :param ifc_file:
+        :param entity_name: IFC class to collect.
+        :param to_json:
+        :param yz_swap: Swap Y and Z axes for Y-up viewers.
+        :param workers: Number of tessellation threads. Defaults to GEOMETRY_WORKERS.
+        :return:
+        """
+        meshes = IfcUtilsFile.iter_element_meshes(ifc_file, ElementTypeFilter.for_entity(entity_name), workers)
+        return IfcUtilsFile.serialize_geometry(list(meshes), to_json, yz_swap)
+
     @staticmethod
     @Logger.log_method
     def get_element_location(element: ifcopenshell.entity_instance) -> dict:
@@ -143,6 +382,21 @@ class IfcUtilsFile:
         coords = element.ObjectPlacement.RelativePlacement.Location.Coordinates
         return {"x": coords[0], "y": coords[1], "z": coords[2]}
 
+    @staticmethod
+    def get_element(ifc_file: ifcopenshell.file, element_ref: str) -> ifcopenshell.entity_instance | None:
+        """
+        Find an element by its STEP id or GlobalId.
+        :param ifc_file:
+        :param element_ref: STEP id (digits only) or GlobalId.
+        :return:
+        """
+        try:
+            if element_ref.isdigit():
+                return ifc_file.by_id(int(element_ref))
+            return ifc_file.by_guid(element_ref)
+        except RuntimeError:
+            return None
+
     @staticmethod
     def load(path, is_stream=False) -> ifcopenshell.file | None:
         try:
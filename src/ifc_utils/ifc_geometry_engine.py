@@ -0,0 +1,99 @@
+from typing import Iterable, Iterator, Tuple, Union
+
+import ifcopenshell
+import ifcopenshell.geom
+
+from src.config import GEOMETRY_WORKERS
+from src.server_utils.method_loggers import Logger
+
+
+class IfcGeometryEngine:
+    """
+    Tessellates IFC elements in parallel with the multi-threaded mode of ifcopenshell.geom.iterator.
+    """
+    # Shapes held back waiting for an earlier element before that element is given up on.
+    PENDING_LIMIT = 256
+
+    @staticmethod
+    def has_representation(element: ifcopenshell.entity_instance) -> bool:
+        """
+        Whether the element has a representation the iterator can tessellate.
+        Aggregates such as IfcRoof or IfcStair often have none, their parts carry the geometry.
+        """
+        return element is not None and getattr(element, "Representation", None) is not None
+
+    @staticmethod
+    def create_settings() -> ifcopenshell.geom.settings:
+        """
+        Geometry settings shared by every tessellation path.
+        Kept equal to the defaults of ifcopenshell.geom.create_shape so results match element by element.
+        """
+        return ifcopenshell.geom.settings()
+
+    @staticmethod
+    def iterate_shapes(ifc_file: ifcopenshell.file,
+                       elements: Iterable[ifcopenshell.entity_instance],
+                       workers: Union[int, None] = None) -> Iterator[Tuple[ifcopenshell.entity_instance, object]]:
+        """
+        Tessellate elements on a pool of iterator threads and yield (element, shape) pairs.
+        Shapes are yielded in the order of `elements` regardless of which thread finished first. Once PENDING_LIMIT
+        later shapes are waiting for the element in line, that element is passed over and its shape is yielded
+        whenever it arrives, so one slow or failing element never holds back the rest of the model.
+        Elements without a representation are left out. Elements the iterator returns no shape for are yielded
+        with a None shape once the iterator is exhausted.
+
+        :param ifc_file: The loaded IFC file.
+        :param elements: Elements to tessellate.
+        :param workers: Number of iterator threads. Defaults to GEOMETRY_WORKERS.
+        :return: Iterator of (element, shape or None).
+        """
+        elements = [element for element in elements if IfcGeometryEngine.has_representation(element)]
+        if not elements:
+            return
+
+        workers = max(1, workers if workers else GEOMETRY_WORKERS)
+        order = {element.id(): index for index, element in enumerate(elements)}
+
+        settings = IfcGeometryEngine.create_settings()
+        iterator = ifcopenshell.geom.iterator(settings, ifc_file, workers, include=elements)
+        if not iterator.initialize():
+            Logger.log_error("Geometry iterator could not be initialized.")
+            for element in elements:
+                yield element, None
+            return
+
+        pending = {}
+        # Elements passed over while waiting for their shape. Their shapes are yielded out of order on arrival.
+        overdue = set()
+        next_index = 0
+        while True:
+            shape = iterator.get()
+            index = order.get(shape.id)
+            if index in overdue:
+                overdue.discard(index)
+                yield elements[index], shape
+            elif index is not None and index >= next_index:
+                pending[index] = shape
+
+            # Pass over the element in line once too many later shapes wait for it.
+            while len(pending) > IfcGeometryEngine.PENDING_LIMIT and next_index not in pending:
+                overdue.add(next_index)
+                next_index += 1
+
+            # Release every shape that is next in line.
+            while next_index in pending:
+                yield elements[next_index], pending.pop(next_index)
+                next_index += 1
+
+            if not iterator.next():
+                break
+
+        skipped = 0
+        for index in sorted(overdue.union(range(next_index, len(elements)))):
+            shape = pending.pop(index, None)
+            if shape is None:
+                skipped += 1
+            yield elements[index], shape
+
+        if skipped > 0:
+            Logger.log_error(f"{skipped} element(s) could not be tessellated.")
@@ -32,8 +32,8 @@ class IfcGeometryUtil:
 
             #Create Polyline
             points = [point for point in item.SweptArea.OuterCurve.Points]
-            polyline_pts = IfcGeometryHelper.extract_points(points)
-            polyline = Polyline(polyline_pts)
+            polyline_pts = IfcGeometryHelper.extract_point_array(points)
+            polyline = PolylineArray(polyline_pts.coordinates)
 
             #Get Depth
             depth = item.Depth
@@ -109,4 +109,19 @@ class IfcGeometryHelper:
                     points.append(Point3d(coords[0], coords[1], 0))
                 elif len(coords) == 3:
                     points.append(Point3d(coords[0], coords[1], coords[2]))
-        return points if points else None
\ No newline at end of file
+        return points if points else None
+
+    @staticmethod
+    def extract_point_array(input: Any) -> Union[PointArray, None]:
+        """
+        Same as extract_points, but collects the coordinates into one PointArray instead of Point3d objects.
+        """
+        if all(hasattr(item, 'Coordinates') for item in input):
+            input = [point.Coordinates for point in input]
+
+        flat_list = [item for item in DataStructureHelper.flatten_as_points(input) if len(item) in (2, 3)]
+        if not flat_list:
+            return None
+        if all(len(item) == len(flat_list[0]) for item in flat_list):
+            return PointArray(np.array(flat_list, dtype=np.float64))
+        return PointArray(np.array([tuple(item) + (0.0,) * (3 - len(item)) for item in flat_list], dtype=np.float64))
@@ -0,0 +1,206 @@
+import hashlib
+from typing import Dict, List, Tuple
+
+import ifcopenshell
+
+from src.server_utils.method_loggers import Logger
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.model.model_mesh import ElementMesh
+from src.model.model_quantization import MeshQuantizer
+from src.element_type.ifc_type_enum import ElementTypeFilter
+
+
+class ElementHasher:
+    """
+    Content hashes of IFC entities that do not depend on STEP ids, so the same element hashes equally in two revisions.
+    Referenced entities are hashed by their content, recursively and once per entity.
+    IfcOwnerHistory is skipped, as exporters rewrite it on every save.
+    """
+    IGNORED_TYPES = {"IfcOwnerHistory"}
+    GEOMETRY_ATTRIBUTES = {"ObjectPlacement", "Representation"}
+
+    def __init__(self):
+        self.digests: Dict[int, bytes] = {}
+
+    def entity_digest(self, entity: ifcopenshell.entity_instance) -> bytes:
+        entity_id = entity.id()
+        digest = self.digests.get(entity_id) if entity_id else None
+        if digest is None:
+            digest_builder = hashlib.sha1(entity.is_a().encode("utf-8"))
+            for value in entity:
+                self.update(digest_builder, value)
+            digest = digest_builder.digest()
+            if entity_id:
+                self.digests[entity_id] = digest
+        return digest
+
+    def update(self, digest_builder, value) -> None:
+        if isinstance(value, ifcopenshell.entity_instance):
+            if value.is_a() in ElementHasher.IGNORED_TYPES:
+                digest_builder.update(b"~")
+            else:
+                digest_builder.update(self.entity_digest(value))
+        elif isinstance(value, (tuple, list)):
+            digest_builder.update(b"(")
+            for item in value:
+                self.update(digest_builder, item)
+            digest_builder.update(b")")
+        elif value is None:
+            digest_builder.update(b"$")
+        else:
+            digest_builder.update(repr(value).encode("utf-8"))
+        digest_builder.update(b",")
+
+    def element_hashes(self, element: ifcopenshell.entity_instance) -> Tuple[str, str]:
+        """
+        The geometry hash also covers the openings voiding the element, which are only reachable by inverse
+        attributes but cut its tessellated shape.
+
+        :return: (hash of the attributes, hash of the placement, representation and openings)
+        """
+        attributes = hashlib.sha1(element.is_a().encode("utf-8"))
+        geometry = hashlib.sha1()
+        for index in range(len(element)):
+            name = element.attribute_name(index)
+            self.update(geometry if name in ElementHasher.GEOMETRY_ATTRIBUTES else attributes, element[index])
+        # Sorted, as the order of inverse attributes is not stable between revisions.
+        for digest in sorted(self.entity_digest(void.RelatedOpeningElement) for void in getattr(element, "HasOpenings", None) or ()):
+            geometry.update(digest)
+        return attributes.hexdigest(), geometry.hexdigest()
+
+
+class IfcUtilsRevision:
+    """
+    Utility for comparing revisions of the same model by GlobalId.
+    """
+
+    @staticmethod
+    @Logger.log_method
+    def fingerprint_elements(ifc_file: ifcopenshell.file, type_filter: ElementTypeFilter) -> Dict[str, Tuple[int, str, str]]:
+        """
+        Hashes of the selected elements.
+        :param ifc_file:
+        :param type_filter:
+        :return: {GlobalId: (element id, attribute hash, geometry hash)}
+        """
+        hasher = ElementHasher()
+        fingerprints = {}
+        for element in type_filter.collect(ifc_file):
+            global_id = getattr(element, "GlobalId", None)
+            if global_id is None:
+                continue
+            fingerprints[global_id] = (element.id(),) + hasher.element_hashes(element)
+        return fingerprints
+
+    @staticmethod
+    @Logger.log_method
+    def diff(ifc_file: ifcopenshell.file, type_filter: ElementTypeFilter, fingerprints: Dict[str, Tuple[int, str, str]],
+             previous_fingerprints: Dict[str, Tuple[int, str, str]], previous_meshes: List[ElementMesh],
+             previous_tag: str) -> Tuple[List[ElementMesh], dict]:
+        """
+        Meshes of a revision built from the previous revision, tessellating only new elements and elements whose
+        placement, representation or openings changed.
+        :param ifc_file: The new revision.
+        :param type_filter:
+        :param fingerprints: fingerprint_elements of the new revision.
+        :param previous_fingerprints: fingerprint_elements of the previous revision.
+        :param previous_meshes: Meshes of the previous revision for the same filter.
+        :param previous_tag: Short id of the previous revision. Reused geometry ids are tagged with it, since the
+                             representation ids of two revisions can collide.
+        :return: (every mesh of the new revision in model order, delta with "added", "changed" and "removed" global ids,
+                 and "renumbered" elements whose STEP id differs from the previous revision)
+        """
+        added = [global_id for global_id in fingerprints if global_id not in previous_fingerprints]
+        removed = [global_id for global_id in previous_fingerprints if global_id not in fingerprints]
+        changed = []
+        geometry_changed = []
+        for global_id, (_, attribute_hash, geometry_hash) in fingerprints.items():
+            previous = previous_fingerprints.get(global_id)
+            if previous is None:
+                continue
+            if previous[2] != geometry_hash:
+                changed.append(global_id)
+                geometry_changed.append(global_id)
+            elif previous[1] != attribute_hash:
+                changed.append(global_id)
+
+        retessellate = [ifc_file.by_id(fingerprints[global_id][0]) for global_id in added + geometry_changed]
+        retessellate.sort(key=lambda element: element.id())
+        new_meshes = {mesh.global_id: mesh for mesh in IfcUtilsFile.iter_element_meshes(ifc_file, type_filter, elements=retessellate)}
+        Logger.log_info(f"Revision diff tessellated {len(retessellate)} of {len(fingerprints)} elements.")
+
+        previous_by_global_id = {mesh.global_id: mesh for mesh in previous_meshes}
+        meshes = []
+        for global_id, (element_id, _, _) in sorted(fingerprints.items(), key=lambda item: item[1][0]):
+            mesh = new_meshes.get(global_id)
+            if mesh is None:
+                previous = previous_by_global_id.get(global_id)
+                if previous is None:
+                    continue
+                # Same geometry, but STEP ids are not stable between revisions.
+                mesh = ElementMesh(
+                    element_id=element_id,
+                    element_type=type_filter.label if type_filter.label else ifc_file.by_id(element_id).is_a(),
+                    global_id=global_id,
+                    geometry_type=previous.geometry_type,
+                    geometry_id=previous.geometry_id if "@" in previous.geometry_id else f"{previous.geometry_id}@{previous_tag}",
+                    vertices=previous.vertices,
+                    faces=previous.faces,
+                    normals=previous.normals,
+                    edges=previous.edges,
+                    matrix=previous.matrix,
+                )
+            meshes.append(mesh)
+
+        renumbered = [
+            {"globalId": global_id, "previousId": previous_fingerprints[global_id][0], "id": element_id}
+            for global_id, (element_id, _, _) in fingerprints.items()
+            if global_id in previous_fingerprints and previous_fingerprints[global_id][0] != element_id
+        ]
+        delta = {
+            "added": added,
+            "changed": changed,
+            "geometryChanged": geometry_changed,
+            "removed": [{"globalId": global_id, "id": previous_fingerprints[global_id][0]} for global_id in removed],
+            "renumbered": renumbered,
+            "unchanged": len(fingerprints) - len(added) - len(changed),
+        }
+        return meshes, delta
+
+    @staticmethod
+    def serialize_delta(meshes: List[ElementMesh], delta: dict, yz_swap=True, quantize=False) -> dict:
+        """
+        Delta response: geometry of added elements and of elements whose geometry changed, and the ids of the others.
+        """
+        by_global_id = {mesh.global_id: mesh for mesh in meshes}
+
+        def geometry(global_id: str) -> dict | None:
+            mesh = by_global_id.get(global_id)
+            if mesh is None:
+                return None
+            data = MeshQuantizer.to_dict(mesh, yz_swap, as_arrays=True) if quantize else mesh.to_dict(yz_swap, as_arrays=True)
+            data["globalId"] = global_id
+            return data
+
+        geometry_changed = set(delta["geometryChanged"])
+        changed = []
+        for global_id in delta["changed"]:
+            if global_id in geometry_changed:
+                entry = geometry(global_id)
+                if entry is None:
+                    continue
+            else:
+                mesh = by_global_id.get(global_id)
+                if mesh is None:
+                    continue
+                entry = {"id": mesh.element_id, "type": mesh.element_type, "globalId": global_id}
+            entry["geometryChanged"] = global_id in geometry_changed
+            changed.append(entry)
+
+        return {
+            "added": [entry for entry in (geometry(global_id) for global_id in delta["added"]) if entry is not None],
+            "changed": changed,
+            "removed": delta["removed"],
+            "renumbered": delta["renumbered"],
+            "unchanged": delta["unchanged"],
+        }
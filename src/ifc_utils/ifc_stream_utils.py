@@ -0,0 +1,170 @@
+import re
+from typing import BinaryIO, Dict, Iterator, Tuple, Union
+
+import ifcopenshell.ifcopenshell_wrapper as ifcopenshell_wrapper
+
+from src.server_utils.method_loggers import Logger
+
+
+class IfcStepScanner:
+    """
+    Single pass reader of the instances of an IFC-SPF (STEP) file.
+
+    The file is read in fixed size chunks and every instance is handed out as its id, class and raw argument bytes,
+    then forgotten, so memory stays bounded by the chunk size and the longest instance instead of the file size.
+    Nothing is resolved, which makes it fit for listings that only need attributes of the instance itself.
+    """
+    CHUNK_SIZE = 1 << 20
+
+    # One statement up to its terminating semicolon, skipping semicolons in strings and comments.
+    # Written as an unrolled loop, so a statement cut at the end of the buffer fails in linear time.
+    STATEMENT = re.compile(rb"[^;'/]*(?:(?:'[^']*(?:''[^']*)*'|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/(?!\*))[^;'/]*)*;")
+    # A string literal, kept, or a comment, removed.
+    COMMENT = re.compile(rb"('[^']*(?:''[^']*)*')|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/")
+    INSTANCE = re.compile(rb"\s*#(\d+)\s*=\s*([A-Za-z0-9_]+)\s*\(")
+    FILE_SCHEMA = re.compile(rb"\s*FILE_SCHEMA\s*\(\s*\(\s*'([^']*)'")
+    # GlobalId, OwnerHistory and Name, the leading attributes of IfcRoot.
+    ROOT_ATTRIBUTES = re.compile(rb"\s*('[^']*(?:''[^']*)*'|\$)\s*,\s*(?:#\d+|\$)\s*,\s*('[^']*(?:''[^']*)*'|\$)")
+    ENCODED_CHARACTERS = re.compile(r"''|\\\\|\\X2\\((?:[0-9A-Fa-f]{4})*)\\X0\\|\\X4\\((?:[0-9A-Fa-f]{8})*)\\X0\\"
+                                    r"|\\X\\([0-9A-Fa-f]{2})|\\S\\(.)|\\P[A-I]?\\")
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        """
+        Initialize a new IfcStepScanner object.
+
+        :param stream: The file, opened in binary mode.
+        :param chunk_size: Bytes read at a time.
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.schema_name = None
+
+    def statements(self) -> Iterator[bytes]:
+        """
+        Every statement of the file, without its semicolon and comments.
+        """
+        buffer = b""
+        position = 0
+        at_end = False
+        while True:
+            match = IfcStepScanner.STATEMENT.match(buffer, position)
+            if match is None:
+                if at_end:
+                    break
+                chunk = self.stream.read(self.chunk_size)
+                at_end = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            position = match.end()
+            statement = match.group()[:-1]
+            if b"/*" in statement:
+                statement = IfcStepScanner.strip_comments(statement)
+            yield statement
+
+    @staticmethod
+    def strip_comments(statement: bytes) -> bytes:
+        """
+        The statement with every comment outside string literals replaced by a space.
+        """
+        return IfcStepScanner.COMMENT.sub(lambda match: match.group(1) or b" ", statement)
+
+    def instances(self) -> Iterator[Tuple[int, bytes, bytes]]:
+        """
+        Instances of the DATA sections, reading the schema from the header on the way.
+
+        :return: (id, upper case class, arguments without the closing parenthesis)
+        """
+        for statement in self.statements():
+            instance = IfcStepScanner.INSTANCE.match(statement)
+            if instance is None:
+                if self.schema_name is None:
+                    schema = IfcStepScanner.FILE_SCHEMA.match(statement)
+                    if schema is not None:
+                        self.schema_name = schema.group(1).decode("ascii", "replace")
+                continue
+            arguments = statement[instance.end():].rstrip()
+            yield int(instance.group(1)), instance.group(2).upper(), arguments[:-1] if arguments.endswith(b")") else arguments
+
+    @staticmethod
+    def decode_string(value: bytes) -> Union[str, None]:
+        """
+        Text of a STEP string literal, with the ISO 10303-21 escapes resolved.
+
+        :param value: The literal with its quotes, or $.
+        """
+        if value == b"$":
+            return None
+        try:
+            text = value[1:-1].decode("utf-8")
+        except UnicodeDecodeError:
+            text = value[1:-1].decode("latin-1")
+        if "'" not in text and "\\" not in text:
+            return text
+
+        def replace(match: re.Match) -> str:
+            token = match.group(0)
+            if token == "''":
+                return "'"
+            if token == "\\\\":
+                return "\\"
+            if match.group(1) is not None:
+                return bytes.fromhex(match.group(1)).decode("utf-16-be", "replace")
+            if match.group(2) is not None:
+                return bytes.fromhex(match.group(2)).decode("utf-32-be", "replace")
+            if match.group(3) is not None:
+                return bytes.fromhex(match.group(3)).decode("latin-1")
+            if match.group(4) is not None:
+                return chr(ord(match.group(4)) + 128)
+            return ""
+
+        return IfcStepScanner.ENCODED_CHARACTERS.sub(replace, text)
+
+    @staticmethod
+    def subtype_names(schema_name: str, entity_name: str) -> Dict[str, str]:
+        """
+        Classes of the schema deriving from an entity, the entity included.
+
+        :return: {upper case class: class}
+        """
+        try:
+            schema = ifcopenshell_wrapper.schema_by_name(schema_name)
+        except Exception:
+            raise ValueError(f"Unsupported IFC schema: {schema_name}")
+        names = {}
+        pending = [schema.declaration_by_name(entity_name)]
+        while pending:
+            declaration = pending.pop()
+            names[declaration.name().upper()] = declaration.name()
+            pending.extend(declaration.subtypes())
+        return names
+
+    @staticmethod
+    @Logger.log_method
+    def summarize_by_category(path: str, chunk_size: int = CHUNK_SIZE) -> dict:
+        """
+        Streaming counterpart of IfcUtilsFile.summarize_by_category, reading the file once without loading the model.
+        :param path: Path of an IFC-SPF file.
+        :param chunk_size: Bytes read at a time.
+        :return: {element type: {"count": int, "ids": [int], "globalIds": [str], "names": [str | None]}}
+        """
+        summary = {}
+        products = None
+        with open(path, "rb") as stream:
+            scanner = IfcStepScanner(stream, chunk_size)
+            for element_id, element_class, arguments in scanner.instances():
+                if products is None:
+                    # The header, and with it FILE_SCHEMA, precedes the first instance.
+                    products = IfcStepScanner.subtype_names(scanner.schema_name or "IFC4", "IfcProduct")
+                element_type = products.get(element_class.decode("ascii"))
+                if element_type is None:
+                    continue
+                category = summary.get(element_type)
+                if category is None:
+                    category = summary[element_type] = {"count": 0, "ids": [], "globalIds": [], "names": []}
+                root = IfcStepScanner.ROOT_ATTRIBUTES.match(arguments)
+                category["count"] += 1
+                category["ids"].append(element_id)
+                category["globalIds"].append(IfcStepScanner.decode_string(root.group(1)) if root else None)
+                category["names"].append(IfcStepScanner.decode_string(root.group(2)) if root else None)
+        return summary
@@ -1,20 +1,54 @@
+import functools
+import hashlib
 import os.path
 import shutil
 import uuid
+from collections import Counter
 from contextlib import asynccontextmanager
+from typing import Callable
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Response, Query
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.ifc_utils.ifc_revision_utils import IfcUtilsRevision
+from src.ifc_utils.ifc_stream_utils import IfcStepScanner
+from src.model.model_mesh import ElementMesh
+from src.model.model_lod import MeshSimplifier
+from src.model.model_quantization import MeshWelder
+from src.element_type.ifc_type_enum import ElementTypeFilter, ConnectionKind
+from src.data_structure.graph import CompactGraph
+from src.data_structure.spatial_index import SpatialIndex
+from src.server_utils.model_cache import model_cache, CachedModel
+from src.server_utils.model_registry import model_registry, ModelSession
+from src.server_utils.geometry_encoders import GeometryBinaryEncoder, GeometryNdjsonEncoder
+from src.server_utils.executors import run_blocking, run_blocking_sync, iterate_blocking, shutdown_executors
+from src.server_utils.compression import ResponseCompressor
+from src.server_utils.geometry_store import geometry_store
+from src.server_utils.job_queue import job_queue, Job, QueueFull, QueueClosed
+from src.server_utils.job_events import JobEventStream
+from src.server_utils.json_encoder import JsonEncoder, EncodedJSONResponse
+from src.server_utils.metrics import metrics, span, timed, MetricsMiddleware, MetricsRegistry, STAGE_FAILURES, UPLOAD_BYTES, REQUEST_ELEMENTS
+from starlette.concurrency import run_in_threadpool
 
-from src.config import SERVER_PORT, SERVER_HOST, ENVIRONMENT
+from src.config import SERVER_PORT, SERVER_HOST, ENVIRONMENT, STREAM_CACHE_LIMIT_MB
 
 from dotenv import load_dotenv
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    #Start
+
+    yield
+
+    #Shutdown
+    job_queue.shutdown()
+    shutdown_executors()
+    clear_temp_files()
+
 #Server Setting
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=EncodedJSONResponse)
 
 origins = [
     "http://localhost:3000",
@@ -27,9 +61,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
 
 UPLOAD_DIRECTORY = "temp_files"
 ALLOWED_EXTENSIONS = {".ifc"}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+GEOMETRY_FORMATS = ("json", "binary", "ndjson")
 
 #Server file upload functions
 def is_allowed_file(filename: str) -> bool:
@@ -42,6 +79,364 @@ def get_unique_filename(filename: str) -> str:
     unique_filename = f"{unique_id}{ext}"
     return unique_filename
 
+def write_chunk(buffer, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    buffer.write(chunk)
+
+async def save_upload(file: UploadFile) -> tuple[str, int, str]:
+    """
+    Stream the upload to disk in chunks under a unique name, measuring its size and SHA-256 along the way.
+    :return: (file location, size in bytes, hex digest)
+    """
+    if not os.path.exists(UPLOAD_DIRECTORY):
+        os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
+
+    unique_filename = get_unique_filename(file.filename)
+    file_location = os.path.join(UPLOAD_DIRECTORY, unique_filename)
+    digest = hashlib.sha256()
+    size = 0
+    with span("upload_write"):
+        buffer = await run_in_threadpool(open, file_location, "wb")
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(write_chunk, buffer, digest, chunk)
+                size += len(chunk)
+        finally:
+            await run_in_threadpool(buffer.close)
+    UPLOAD_BYTES.observe(size)
+    return file_location, size, digest.hexdigest()
+
+async def load_cached_model(file: UploadFile) -> tuple[CachedModel | None, int]:
+    """
+    Return the parsed model of the upload, loading it only if identical bytes were not seen before.
+    :return: (cached model or None if the file could not be loaded, upload size in bytes)
+    """
+    file_location, file_size, file_hash = await save_upload(file)
+    cached_model = model_cache.get(file_hash)
+    if cached_model is not None:
+        await run_in_threadpool(os.remove, file_location)
+        return cached_model, file_size
+    return await run_blocking(parse_upload, file_location, file_size, file_hash), file_size
+
+def parse_upload(file_location: str, file_size: int, file_hash: str) -> CachedModel | None:
+    """
+    Parse a saved upload into the model cache, unless identical bytes were parsed meanwhile.
+    :return: The cached model, or None if the file could not be loaded.
+    """
+    cached_model = model_cache.get(file_hash)
+    if cached_model is not None:
+        os.remove(file_location)
+        return cached_model
+
+    with span("parse"):
+        ifc_file = IfcUtilsFile.load(file_location)
+    if not ifc_file:
+        STAGE_FAILURES.inc(stage="parse")
+        return None
+    return model_cache.put(file_hash, ifc_file, file_size)
+
+def get_cached_meshes(cached_model: CachedModel, type_filter: ElementTypeFilter,
+                      on_progress: Callable[[int, int], None] | None = None) -> list[ElementMesh]:
+    """
+    Return the tessellated meshes of the model, read from the geometry store or tessellated on the first request.
+    """
+    payload_name = f"meshes:{type_filter.key()}"
+    meshes = cached_model.get_payload(payload_name)
+    if meshes is None:
+        with span("store_read"):
+            meshes = geometry_store.load(cached_model.key, type_filter.key())
+        if meshes is None:
+            with span("tessellate"):
+                meshes = IfcUtilsFile.get_element_meshes(cached_model.ifc_file, type_filter, on_progress=on_progress)
+            REQUEST_ELEMENTS.observe(len(meshes))
+            with span("store_write"):
+                geometry_store.save(cached_model.key, type_filter.key(), meshes)
+        model_cache.set_payload(cached_model, payload_name, meshes)
+    return meshes
+
+def get_cached_lod_meshes(cached_model: CachedModel, type_filter: ElementTypeFilter, tier: int, weld: bool = False) -> list[ElementMesh]:
+    """
+    Meshes of an LOD tier, simplified from the full meshes on the first request of the tier, and welded if requested.
+    """
+    if weld:
+        payload_name = f"meshes:{type_filter.key()}{geometry_variant(tier, weld)}"
+        welded_meshes = cached_model.get_payload(payload_name)
+        if welded_meshes is None:
+            welded_meshes = MeshWelder.weld(get_cached_lod_meshes(cached_model, type_filter, tier))
+            model_cache.set_payload(cached_model, payload_name, welded_meshes)
+        return welded_meshes
+
+    meshes = get_cached_meshes(cached_model, type_filter)
+    if tier == 0:
+        return meshes
+    payload_name = f"meshes:{type_filter.key()}{geometry_variant(tier)}"
+    lod_meshes = cached_model.get_payload(payload_name)
+    if lod_meshes is None:
+        lod_meshes = MeshSimplifier.simplify(meshes, tier)
+        model_cache.set_payload(cached_model, payload_name, lod_meshes)
+    return lod_meshes
+
+def geometry_variant(tier: int, weld: bool = False, quantize: bool = False) -> str:
+    """
+    Payload name suffix of processed geometry. Empty for the full, unprocessed meshes.
+    """
+    return (f":lod{tier}" if tier else "") + (":welded" if weld else "") + (":quantized" if quantize else "")
+
+def select_lod_tier(cached_model: CachedModel, type_filter: ElementTypeFilter, lod: int, triangle_budget: int | None) -> int:
+    """
+    The requested tier, or the most detailed tier within the triangle budget. (the coarsest tier if none fits)
+    """
+    if triangle_budget is None:
+        return lod
+    for tier in range(MeshSimplifier.tier_count()):
+        if MeshSimplifier.triangle_count(get_cached_lod_meshes(cached_model, type_filter, tier)) <= triangle_budget:
+            return tier
+    return MeshSimplifier.tier_count() - 1
+
+def get_cached_spatial_index(cached_model: CachedModel, type_filter: ElementTypeFilter) -> tuple[list[ElementMesh], SpatialIndex]:
+    """
+    Meshes of the filter and the spatial index over their bounding boxes, both kept with the cached model.
+    """
+    meshes = get_cached_meshes(cached_model, type_filter)
+    payload_name = f"spatial:{type_filter.key()}"
+    spatial_index = cached_model.get_payload(payload_name)
+    if spatial_index is None:
+        spatial_index = IfcUtilsFile.build_spatial_index(meshes)
+        model_cache.set_payload(cached_model, payload_name, spatial_index)
+    return meshes, spatial_index
+
+def negotiate_geometry_format(request: Request, response_format: str | None) -> str:
+    """
+    Geometry is JSON unless requested otherwise with ?format=binary|ndjson or the matching Accept header.
+    """
+    if response_format is not None:
+        if response_format.lower() not in GEOMETRY_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {response_format}. Use one of {', '.join(GEOMETRY_FORMATS)}.")
+        return response_format.lower()
+    accept = request.headers.get("accept", "")
+    if GeometryBinaryEncoder.MEDIA_TYPE in accept:
+        return "binary"
+    if GeometryNdjsonEncoder.MEDIA_TYPE in accept:
+        return "ndjson"
+    return "json"
+
+async def stream_geometry(cached_model: CachedModel, type_filter: ElementTypeFilter, quantize: bool = False,
+                          headers: dict | None = None) -> StreamingResponse:
+    """
+    Stream meshes as NDJSON while they are tessellated.
+    The meshes are cached once the stream completes, unless their arrays outgrow STREAM_CACHE_LIMIT_MB on the way.
+    Larger models are streamed with flat memory and left to be tessellated again by a later request.
+    """
+    payload_name = f"meshes:{type_filter.key()}"
+    meshes = cached_model.get_payload(payload_name)
+    if meshes is None and geometry_store.enabled:
+        meshes = await run_in_threadpool(timed("store_read", geometry_store.load), cached_model.key, type_filter.key())
+        if meshes is not None:
+            await run_in_threadpool(model_cache.set_payload, cached_model, payload_name, meshes)
+    if meshes is not None:
+        return StreamingResponse(GeometryNdjsonEncoder.iter_lines(meshes, quantize=quantize),
+                                 media_type=GeometryNdjsonEncoder.MEDIA_TYPE, headers=headers)
+
+    limit = STREAM_CACHE_LIMIT_MB * 1024 ** 2
+    collected = []
+    collected_bytes = 0
+    streamed = 0
+
+    def collect(mesh: ElementMesh) -> None:
+        nonlocal collected, collected_bytes, streamed
+        streamed += 1
+        if collected is None:
+            return
+        collected_bytes += mesh.nbytes
+        if collected_bytes > limit:
+            logging.info(f"Streamed geometry of {cached_model.key} exceeds {STREAM_CACHE_LIMIT_MB} MB, it is not cached.")
+            collected = None
+        else:
+            collected.append(mesh)
+
+    async def generate():
+        lines = GeometryNdjsonEncoder.iter_lines(
+            IfcUtilsFile.iter_element_meshes(cached_model.ifc_file, type_filter),
+            on_mesh=collect, quantize=quantize)
+        with span("tessellate"):
+            async for line in iterate_blocking(lines):
+                yield line
+        REQUEST_ELEMENTS.observe(streamed)
+        if collected is not None:
+            await run_in_threadpool(model_cache.set_payload, cached_model, payload_name, collected)
+            await run_blocking(timed("store_write", geometry_store.save), cached_model.key, type_filter.key(), collected)
+
+    return StreamingResponse(generate(), media_type=GeometryNdjsonEncoder.MEDIA_TYPE, headers=headers)
+
+async def encode_response(request: Request, content: bytes | Callable[[], bytes], media_type: str, cached_model: CachedModel | None = None,
+                          payload_name: str | None = None, headers: dict | None = None) -> Response:
+    """
+    Response compressed with the encoding negotiated from Accept-Encoding.
+    The compressed body of a cached payload is stored with the model as "{payload_name}:{encoding}" and reused,
+    so the body is neither rendered nor compressed again. Bodies already encoded are sent as they are. Rendering, and
+    compression of large bodies, run on the default threadpool, so cached responses never queue behind tessellations.
+
+    :param content: The uncompressed body, or a function returning it.
+    """
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    encoding = ResponseCompressor.negotiate(request.headers.get("accept-encoding"))
+    compressed_name = f"{payload_name}:{encoding}" if cached_model is not None and payload_name and encoding else None
+
+    body = cached_model.get_payload(compressed_name) if compressed_name else None
+    if body is None:
+        body = content if isinstance(content, bytes) else await run_in_threadpool(timed("serialize", content))
+        if encoding is None or len(body) < ResponseCompressor.MIN_SIZE:
+            return Response(content=body, media_type=media_type, headers=headers)
+        compress = timed("compress", ResponseCompressor.compress)
+        if len(body) > ResponseCompressor.INLINE_LIMIT:
+            body = await run_in_threadpool(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        if compressed_name:
+            model_cache.set_payload(cached_model, compressed_name, body)
+
+    headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+async def encode_json_response(request: Request, content, cached_model: CachedModel | None = None,
+                               payload_name: str | None = None, headers: dict | None = None) -> Response:
+    """
+    JSON response of content encoded once by JsonEncoder. Content already encoded to bytes is sent as it is.
+    """
+    body = content if isinstance(content, bytes) else functools.partial(JsonEncoder.dumps, content)
+    return await encode_response(request, body, "application/json", cached_model, payload_name, headers)
+
+async def get_categories(cached_model: CachedModel) -> bytes:
+    categories_json = cached_model.get_payload("categories")
+    if categories_json is None:
+        categories = await run_blocking(IfcUtilsFile.seperate_by_category, cached_model.ifc_file)
+        categories_json = await run_blocking(timed("serialize", JsonEncoder.dumps), categories)
+        model_cache.set_payload(cached_model, "categories", categories_json)
+    return categories_json
+
+async def scan_category_summary(file: UploadFile) -> dict:
+    """
+    Category summary of an upload read in a single streaming pass, without parsing or caching the model.
+    Peak memory depends on the number of products instead of the file size.
+    """
+    file_location, _, _ = await save_upload(file)
+    try:
+        return await run_blocking(IfcStepScanner.summarize_by_category, file_location)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await run_in_threadpool(os.remove, file_location)
+
+async def get_category_summary(cached_model: CachedModel) -> dict:
+    summary = cached_model.get_payload("categories:summary")
+    if summary is None:
+        summary = await run_blocking(IfcUtilsFile.summarize_by_category, cached_model.ifc_file)
+        await run_in_threadpool(model_cache.set_payload, cached_model, "categories:summary", summary)
+    return summary
+
+async def build_geometry_response(request: Request, cached_model: CachedModel, type_filter: ElementTypeFilter, geometry_format: str,
+                                  instanced: bool = False, lod: int = 0, triangle_budget: int | None = None,
+                                  weld: bool = False, quantize: bool = False) -> Response:
+    """
+    Geometry of the selected IFC classes in the format from negotiate_geometry_format. (json, binary or ndjson)
+    Instanced geometry is JSON only and never quantized. The LOD tier is picked by lod, or by triangle_budget when given,
+    and returned in the X-LOD-Tier header. The tier picked for a budget is cached, so repeated requests skip the executor.
+    """
+    tier = lod
+    if triangle_budget is not None:
+        tier_name = f"lod_tier:{type_filter.key()}:{triangle_budget}"
+        tier = cached_model.get_payload(tier_name)
+        if tier is None:
+            tier = await run_blocking(select_lod_tier, cached_model, type_filter, lod, triangle_budget)
+            model_cache.set_payload(cached_model, tier_name, tier)
+    headers = {"X-LOD-Tier": str(tier)}
+
+    if instanced:
+        payload_name = f"instanced:{type_filter.key()}{geometry_variant(tier, weld)}"
+        instanced_json = cached_model.get_payload(payload_name)
+        if instanced_json is None:
+            meshes = await run_blocking(get_cached_lod_meshes, cached_model, type_filter, tier, weld)
+            instanced_json = await run_blocking(timed("serialize", encode_instanced_geometry), meshes)
+            model_cache.set_payload(cached_model, payload_name, instanced_json)
+        return await encode_json_response(request, instanced_json, cached_model, payload_name, headers)
+
+    if geometry_format == "ndjson" and tier == 0 and not weld:
+        return await stream_geometry(cached_model, type_filter, quantize, headers)
+    if geometry_format == "ndjson":
+        meshes = await run_blocking(get_cached_lod_meshes, cached_model, type_filter, tier, weld)
+        return StreamingResponse(GeometryNdjsonEncoder.iter_lines(meshes, quantize=quantize), media_type=GeometryNdjsonEncoder.MEDIA_TYPE, headers=headers)
+    if geometry_format == "binary":
+        payload_name = f"binary:{type_filter.key()}{geometry_variant(tier, weld, quantize)}"
+        body = cached_model.get_payload(payload_name)
+        if body is None:
+            meshes = await run_blocking(get_cached_lod_meshes, cached_model, type_filter, tier, weld)
+            body = await run_blocking(timed("serialize", GeometryBinaryEncoder.encode), meshes, quantize=quantize)
+            model_cache.set_payload(cached_model, payload_name, body)
+        return await encode_response(request, body, GeometryBinaryEncoder.MEDIA_TYPE, cached_model, payload_name, headers)
+
+    payload_name = f"geometry:{type_filter.key()}{geometry_variant(tier, weld, quantize)}"
+    geometry_json = cached_model.get_payload(payload_name)
+    if geometry_json is None:
+        meshes = await run_blocking(get_cached_lod_meshes, cached_model, type_filter, tier, weld)
+        geometry_json = await run_blocking(timed("serialize", encode_geometry), meshes, quantize)
+        model_cache.set_payload(cached_model, payload_name, geometry_json)
+    return await encode_json_response(request, geometry_json, cached_model, payload_name, headers)
+
+def encode_geometry(meshes: list[ElementMesh], quantize: bool = False) -> bytes:
+    """
+    Per-element geometry as JSON, with the mesh arrays written by the encoder instead of going through lists.
+    """
+    return JsonEncoder.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False, quantize=quantize, as_arrays=True))
+
+def encode_instanced_geometry(meshes: list[ElementMesh]) -> bytes:
+    return JsonEncoder.dumps(IfcUtilsFile.serialize_instanced_geometry(meshes, to_json=False, as_arrays=True))
+
+def parse_type_filter(types: str | None, exclude: str | None, default_entity: str | None = None) -> ElementTypeFilter:
+    """
+    Element selection from comma separated ?types= and ?exclude= parameters.
+    Without either, a single default entity is selected the way the original endpoints did.
+    Every name is validated against ElementType.
+    """
+    try:
+        entity = ElementTypeFilter.resolve_name(default_entity) if default_entity else None
+        if not types and not exclude and entity:
+            return ElementTypeFilter.for_entity(entity)
+        return ElementTypeFilter.from_names(split_names(types), split_names(exclude))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def split_names(value: str | None) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+def parse_coordinates(value: str, count: int, name: str, yz_swap: bool) -> list[list[float]]:
+    """
+    Parse comma separated numbers into points of 3, converted from Y-up viewer axes to model axes if yz_swap.
+    """
+    try:
+        numbers = [float(number) for number in split_names(value)]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count * 3:
+        raise HTTPException(status_code=400, detail=f"{name} must be {count * 3} comma separated numbers.")
+    points = [numbers[index:index + 3] for index in range(0, len(numbers), 3)]
+    return [[x, z, y] for x, y, z in points] if yz_swap else points
+
+def get_session(model_id: str) -> ModelSession:
+    session = model_registry.get(model_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Model {model_id} is not loaded. Upload it again.")
+    return session
+
+def remove_upload(file_location: str) -> None:
+    """
+    Delete a saved upload, if it was not deleted already. (parse_upload deletes uploads whose model was cached)
+    """
+    try:
+        os.remove(file_location)
+    except FileNotFoundError:
+        pass
+
 def clear_temp_files():
     if os.path.exists(UPLOAD_DIRECTORY):
         shutil.rmtree(UPLOAD_DIRECTORY)
@@ -52,7 +447,7 @@ def connection_test():
     content = {
         "Connection Status" : "Success"
     }
-    return JSONResponse(content=content)
+    return EncodedJSONResponse(content=content)
 
 @app.get("/")
 def home_message():
@@ -67,69 +462,361 @@ def home_message():
 
     return HTMLResponse(content=content)
 
+@app.get("/metrics")
+def get_metrics():
+    return Response(content=metrics.render(), media_type=MetricsRegistry.CONTENT_TYPE)
+
 @app.post("/uploadfile")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(request: Request, file: UploadFile = File(...), summary: bool = False, stream: bool = False):
     #Extension Check
     if not is_allowed_file(file.filename):
         raise HTTPException(status_code=400, detail="Invalid file extension. Only .ifc files are allowed.")
 
-    #Make dir if not exist
-    if not os.path.exists(UPLOAD_DIRECTORY):
-        os.makedirs(UPLOAD_DIRECTORY)
-
-    #Set unique filename
-    unique_filename = get_unique_filename(file.filename)
-    file_location = os.path.join(UPLOAD_DIRECTORY, unique_filename)
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    if summary and stream:
+        return await encode_json_response(request, await scan_category_summary(file))
 
-    ifc_file = IfcUtilsFile.load(file_location)
-    if ifc_file:
-        categories_json = IfcUtilsFile.seperate_by_category(ifc_file, to_json=True)
-        return JSONResponse(content=categories_json)
+    cached_model, _ = await load_cached_model(file)
+    if cached_model and summary:
+        return await encode_json_response(request, await get_category_summary(cached_model), cached_model, "categories:summary")
+    if cached_model:
+        categories_json = await get_categories(cached_model)
+        return await encode_json_response(request, categories_json, cached_model, "categories")
     else:
         return {"error": "Failed to load IFC file"}
 
 @app.post("/getgeometry")
-async def get_geometry(file: UploadFile = File(...)):
-    request_body = await file.read()
-    request_body_size = len(request_body)
-    file.file.seek(0)
-
+async def get_geometry(request: Request, file: UploadFile = File(...), response_format: str | None = Query(None, alias="format"),
+                       types: str | None = None, exclude: str | None = None, instanced: bool = False,
+                       lod: int = Query(0, ge=0, lt=MeshSimplifier.tier_count()), triangle_budget: int | None = Query(None, ge=0),
+                       weld: bool = False, quantize: bool = False):
     if not is_allowed_file(file.filename):
         raise HTTPException(status_code=400, detail="Invalid file extension. Only .ifc files are allowed.")
+    type_filter = parse_type_filter(types, exclude, default_entity="IfcSlab")
+    geometry_format = negotiate_geometry_format(request, response_format)
 
-    if not os.path.exists(UPLOAD_DIRECTORY):
-        os.makedirs(UPLOAD_DIRECTORY)
-
-    unique_filename = get_unique_filename(file.filename)
-    file_location = os.path.join(UPLOAD_DIRECTORY, unique_filename)
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    ifc_file = IfcUtilsFile.load(file_location)
-    if ifc_file:
-        geometry_data = IfcUtilsFile.get_geometry(ifc_file)
-        response = JSONResponse(content=geometry_data)
-        response_body_size = len(response.body)
+    cached_model, request_body_size = await load_cached_model(file)
+    if cached_model:
+        response = await build_geometry_response(request, cached_model, type_filter, geometry_format, instanced, lod, triangle_budget,
+                                                 weld, quantize)
     else:
-        response = JSONResponse(content={"error": "Failed to load IFC file"})
-        response_body_size = len(response.body)
+        response = EncodedJSONResponse(content={"error": "Failed to load IFC file"})
 
     # 요청 및 응답 크기 로깅
     logging.info(f"Request size: {request_body_size / 1024**2 : .3f} MB")
-    logging.info(f"Response size: {response_body_size / 1024**2: .3f} MB")
+    if not isinstance(response, StreamingResponse):
+        logging.info(f"Response size: {len(response.body) / 1024**2: .3f} MB")
 
     return response
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    #Start
+#Model sessions: upload once, query many times by model_id
+@app.post("/models")
+async def upload_model(file: UploadFile = File(...)):
+    if not is_allowed_file(file.filename):
+        raise HTTPException(status_code=400, detail="Invalid file extension. Only .ifc files are allowed.")
 
-    yield
+    cached_model, _ = await load_cached_model(file)
+    if not cached_model:
+        raise HTTPException(status_code=422, detail="Failed to load IFC file")
 
-    #Shutdown
-    clear_temp_files()
+    session = model_registry.register(cached_model, file.filename)
+    return EncodedJSONResponse(content=session.to_dict())
+
+@app.get("/models")
+def list_models():
+    return EncodedJSONResponse(content=[session.to_dict() for session in model_registry.list()])
+
+@app.get("/models/{model_id}")
+def get_model(model_id: str):
+    return EncodedJSONResponse(content=get_session(model_id).to_dict())
+
+@app.delete("/models/{model_id}")
+def delete_model(model_id: str):
+    if not model_registry.remove(model_id):
+        raise HTTPException(status_code=404, detail=f"Model {model_id} is not loaded.")
+    return EncodedJSONResponse(content={"model_id": model_id, "deleted": True})
+
+@app.get("/models/{model_id}/categories")
+async def get_model_categories(request: Request, model_id: str):
+    session = get_session(model_id)
+    categories_json = await get_categories(session.cached_model)
+    return await encode_json_response(request, categories_json, session.cached_model, "categories")
+
+@app.get("/models/{model_id}/categories/summary")
+async def get_model_category_summary(request: Request, model_id: str):
+    session = get_session(model_id)
+    summary = await get_category_summary(session.cached_model)
+    return await encode_json_response(request, summary, session.cached_model, "categories:summary")
+
+@app.get("/models/{model_id}/categories/{element_type}")
+async def get_model_category_page(model_id: str, element_type: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=10000), fields: str | None = None):
+    session = get_session(model_id)
+    field_names = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    page = await run_blocking(IfcUtilsFile.get_category_page, session.cached_model.ifc_file, element_type, offset, limit, field_names)
+    return Response(content=JsonEncoder.dumps(page), media_type="application/json")
+
+@app.get("/models/{model_id}/geometry")
+async def get_model_geometry(request: Request, model_id: str, entity: str = "IfcSlab", response_format: str | None = Query(None, alias="format"),
+                             types: str | None = None, exclude: str | None = None, instanced: bool = False,
+                             lod: int = Query(0, ge=0, lt=MeshSimplifier.tier_count()), triangle_budget: int | None = Query(None, ge=0),
+                             weld: bool = False, quantize: bool = False):
+    type_filter = parse_type_filter(types, exclude, default_entity=entity)
+    geometry_format = negotiate_geometry_format(request, response_format)
+    session = get_session(model_id)
+    return await build_geometry_response(request, session.cached_model, type_filter, geometry_format, instanced, lod, triangle_budget,
+                                         weld, quantize)
+
+@app.get("/models/{model_id}/quantities")
+async def get_model_quantities(request: Request, model_id: str, types: str | None = None, exclude: str | None = None):
+    type_filter = parse_type_filter(types, exclude)
+    session = get_session(model_id)
+    cached_model = session.cached_model
+
+    payload_name = f"quantities:{type_filter.key()}"
+    quantities = cached_model.get_payload(payload_name)
+    if quantities is None:
+        meshes = await run_blocking(get_cached_meshes, cached_model, type_filter)
+        quantities = await run_blocking(IfcUtilsFile.compute_quantities, meshes)
+        await run_in_threadpool(model_cache.set_payload, cached_model, payload_name, quantities)
+    return await encode_json_response(request, quantities, cached_model, payload_name)
+
+@app.get("/models/{model_id}/slices")
+async def get_model_slices(request: Request, model_id: str, types: str | None = None, exclude: str | None = None, elevations: str | None = None):
+    type_filter = parse_type_filter(types, exclude)
+    session = get_session(model_id)
+    cached_model = session.cached_model
+
+    if elevations:
+        try:
+            levels = [(name, float(name)) for name in split_names(elevations)]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Elevations must be comma separated numbers in metres.")
+    else:
+        levels = await run_blocking(IfcUtilsFile.get_storey_elevations, cached_model.ifc_file)
+
+    payload_name = f"slices:{type_filter.key()}:{','.join(str(elevation) for _, elevation in levels)}"
+    slices = cached_model.get_payload(payload_name)
+    if slices is None:
+        meshes = await run_blocking(get_cached_meshes, cached_model, type_filter)
+        slices = await run_blocking(IfcUtilsFile.slice_by_levels, meshes, levels)
+        await run_in_threadpool(model_cache.set_payload, cached_model, payload_name, slices)
+    return await encode_json_response(request, slices, cached_model, payload_name)
+
+def get_cached_connectivity(cached_model: CachedModel, type_filter: ElementTypeFilter) -> CompactGraph:
+    payload_name = f"connectivity:{type_filter.key()}"
+    graph = cached_model.get_payload(payload_name)
+    if graph is None:
+        graph = IfcUtilsFile.build_connectivity(cached_model.ifc_file, type_filter)
+        model_cache.set_payload(cached_model, payload_name, graph)
+    return graph
+
+@app.get("/models/{model_id}/connectivity")
+async def get_model_connectivity(request: Request, model_id: str, types: str = "IfcWall", exclude: str | None = None, quantities: bool = False):
+    type_filter = parse_type_filter(types, exclude)
+    session = get_session(model_id)
+    cached_model = session.cached_model
+    graph = await run_blocking(get_cached_connectivity, cached_model, type_filter)
+
+    element_quantities = None
+    if quantities:
+        payload_name = f"quantities:{type_filter.key()}"
+        element_quantities = cached_model.get_payload(payload_name)
+        if element_quantities is None:
+            meshes = await run_blocking(get_cached_meshes, cached_model, type_filter)
+            element_quantities = await run_blocking(IfcUtilsFile.compute_quantities, meshes)
+            await run_in_threadpool(model_cache.set_payload, cached_model, payload_name, element_quantities)
+    summary = await run_blocking(IfcUtilsFile.summarize_connectivity, graph, element_quantities)
+    return await encode_json_response(request, summary)
+
+@app.get("/models/{model_id}/connectivity/{element_ref}")
+async def get_model_element_connections(model_id: str, element_ref: str, types: str = "IfcWall", exclude: str | None = None):
+    type_filter = parse_type_filter(types, exclude)
+    session = get_session(model_id)
+    cached_model = session.cached_model
+    element = IfcUtilsFile.get_element(cached_model.ifc_file, element_ref)
+    if element is None:
+        raise HTTPException(status_code=404, detail=f"Element {element_ref} not found.")
+
+    graph = await run_blocking(get_cached_connectivity, cached_model, type_filter)
+    if graph.index_of(element.id()) is None:
+        raise HTTPException(status_code=404, detail=f"Element {element_ref} is not one of {types}.")
+    neighbours = [{"id": neighbour, "connection": ConnectionKind(kind).name} for neighbour, kind in graph.neighbours(element.id())]
+    return EncodedJSONResponse(content={"id": element.id(), "neighbours": neighbours})
+
+def get_cached_fingerprints(cached_model: CachedModel, type_filter: ElementTypeFilter) -> dict:
+    payload_name = f"fingerprints:{type_filter.key()}"
+    fingerprints = cached_model.get_payload(payload_name)
+    if fingerprints is None:
+        fingerprints = IfcUtilsRevision.fingerprint_elements(cached_model.ifc_file, type_filter)
+        model_cache.set_payload(cached_model, payload_name, fingerprints)
+    return fingerprints
+
+def build_revision_delta(cached_model: CachedModel, previous_model: CachedModel, type_filter: ElementTypeFilter) -> dict:
+    """
+    Meshes of a revision built from the previous one, tessellating only new and changed elements.
+    The meshes are cached and stored like fully tessellated ones, and the delta is cached per previous revision.
+    """
+    payload_name = f"delta:{type_filter.key()}:{previous_model.key}"
+    delta = cached_model.get_payload(payload_name)
+    if delta is not None:
+        return delta
+
+    fingerprints = get_cached_fingerprints(cached_model, type_filter)
+    previous_fingerprints = get_cached_fingerprints(previous_model, type_filter)
+    previous_meshes = get_cached_meshes(previous_model, type_filter)
+    meshes, delta = IfcUtilsRevision.diff(cached_model.ifc_file, type_filter, fingerprints, previous_fingerprints,
+                                          previous_meshes, previous_model.key[:12])
+
+    meshes_name = f"meshes:{type_filter.key()}"
+    if cached_model.get_payload(meshes_name) is None:
+        model_cache.set_payload(cached_model, meshes_name, meshes)
+        geometry_store.save(cached_model.key, type_filter.key(), meshes)
+    model_cache.set_payload(cached_model, payload_name, delta)
+    return delta
+
+@app.get("/models/{model_id}/diff/{previous_id}")
+async def get_model_revision_diff(request: Request, model_id: str, previous_id: str, entity: str = "IfcSlab",
+                                  types: str | None = None, exclude: str | None = None, quantize: bool = False):
+    type_filter = parse_type_filter(types, exclude, default_entity=entity)
+    session = get_session(model_id)
+    previous_session = get_session(previous_id)
+    cached_model = session.cached_model
+    delta = await run_blocking(build_revision_delta, cached_model, previous_session.cached_model, type_filter)
+
+    meshes = await run_blocking(get_cached_meshes, cached_model, type_filter)
+    content = await run_blocking(IfcUtilsRevision.serialize_delta, meshes, delta, quantize=quantize)
+    content = {"model_id": model_id, "previous_id": previous_id, **content}
+    return await encode_json_response(request, content)
+
+def run_geometry_job(job: Job, file_location: str, file_size: int, file_hash: str, file_name: str,
+                     type_filter: ElementTypeFilter) -> dict:
+    """
+    Parse an upload, register it as a model session and tessellate the selected elements, reporting progress to the job.
+    """
+    job.report("parsing")
+    cached_model = parse_upload(file_location, file_size, file_hash)
+    if cached_model is None:
+        raise ValueError("Failed to load IFC file")
+    session = model_registry.register(cached_model, file_name)
+
+    type_totals = Counter(element.is_a() for element in type_filter.collect(cached_model.ifc_file))
+    job.report("tessellating", total=sum(type_totals.values()), model_id=session.model_id, type_totals=dict(type_totals))
+    meshes = get_cached_meshes(cached_model, type_filter, on_progress=lambda done, total: job.report(done=done, total=total))
+    job.report(done=len(meshes), total=len(meshes))
+    return {"model_id": session.model_id, "elements": len(meshes)}
+
+def get_job(job_id: str) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+@app.post("/jobs/geometry")
+async def submit_geometry_job(file: UploadFile = File(...), entity: str = "IfcSlab", types: str | None = None, exclude: str | None = None):
+    if not is_allowed_file(file.filename):
+        raise HTTPException(status_code=400, detail="Invalid file extension. Only .ifc files are allowed.")
+    type_filter = parse_type_filter(types, exclude, default_entity=entity)
+    if not job_queue.has_capacity():
+        status_code = 503 if job_queue.closed else 429
+        raise HTTPException(status_code=status_code, detail="Job queue is full.", headers={"Retry-After": "10"})
+
+    file_location, file_size, file_hash = await save_upload(file)
+    params = {"file_name": file.filename, "entity": entity, "types": types, "exclude": exclude}
+    # The job worker waits for the IFC executor, so jobs and requests share one bound on parsing and tessellation.
+    job = Job("geometry", functools.partial(run_blocking_sync, run_geometry_job, file_location=file_location, file_size=file_size,
+                                            file_hash=file_hash, file_name=file.filename, type_filter=type_filter), params,
+              cleanup=functools.partial(remove_upload, file_location))
+    try:
+        job_queue.submit(job)
+    except (QueueFull, QueueClosed) as e:
+        await run_in_threadpool(job.release)
+        status_code = 503 if isinstance(e, QueueClosed) else 429
+        raise HTTPException(status_code=status_code, detail="Job queue is full.", headers={"Retry-After": "10"})
+    return EncodedJSONResponse(status_code=202, content=job.to_dict(), headers={"Location": f"/jobs/{job.job_id}"})
+
+@app.get("/jobs")
+def list_jobs():
+    return EncodedJSONResponse(content=[job.to_dict() for job in job_queue.list()])
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    return EncodedJSONResponse(content=get_job(job_id).to_dict())
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = get_job(job_id)
+    return EncodedJSONResponse(content={"job_id": job_id, "cancelled": job.cancel(), "state": job.state})
+
+@app.get("/jobs/{job_id}/events")
+def stream_job_events(request: Request, job_id: str):
+    job = get_job(job_id)
+    events = JobEventStream(job, is_disconnected=request.is_disconnected)
+    return StreamingResponse(events.iter_events(), media_type=JobEventStream.MEDIA_TYPE, headers=JobEventStream.HEADERS)
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(request: Request, job_id: str, response_format: str | None = Query(None, alias="format"), instanced: bool = False,
+                         lod: int = Query(0, ge=0, lt=MeshSimplifier.tier_count()), triangle_budget: int | None = Query(None, ge=0),
+                         weld: bool = False, quantize: bool = False):
+    geometry_format = negotiate_geometry_format(request, response_format)
+    job = get_job(job_id)
+    if job.state == Job.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.state == Job.CANCELLED:
+        raise HTTPException(status_code=410, detail=f"Job {job_id} was cancelled.")
+    if job.state != Job.DONE:
+        return EncodedJSONResponse(status_code=409, content=job.to_dict())
+
+    type_filter = parse_type_filter(job.params["types"], job.params["exclude"], default_entity=job.params["entity"])
+    session = get_session(job.result["model_id"])
+    return await build_geometry_response(request, session.cached_model, type_filter, geometry_format, instanced, lod, triangle_budget,
+                                         weld, quantize)
+
+@app.get("/models/{model_id}/elements/{element_ref}")
+async def get_model_element(request: Request, model_id: str, element_ref: str, geometry: bool = False):
+    session = get_session(model_id)
+    ifc_file = session.cached_model.ifc_file
+    element = IfcUtilsFile.get_element(ifc_file, element_ref)
+    if element is None:
+        raise HTTPException(status_code=404, detail=f"Element {element_ref} not found.")
+
+    content = {"info": element.get_info()}
+    if geometry:
+        meshes = await run_blocking(IfcUtilsFile.get_element_meshes, ifc_file, ElementTypeFilter.for_entity(element.is_a()), elements=[element])
+        content["geometry"] = meshes[0].to_dict(as_arrays=True) if meshes else None
+    return await encode_json_response(request, content)
+
+@app.get("/models/{model_id}/query")
+async def query_model_region(request: Request, model_id: str, box: str | None = None, ray: str | None = None, point: str | None = None,
+                             k: int = Query(1, ge=1, le=1000), max_distance: float | None = None,
+                             types: str | None = None, exclude: str | None = None, geometry: bool = False, yz_swap: bool = True):
+    if sum(value is not None for value in (box, ray, point)) != 1:
+        raise HTTPException(status_code=400, detail="Give exactly one of box, ray or point.")
+    type_filter = parse_type_filter(types, exclude)
+    session = get_session(model_id)
+    meshes, spatial_index = await run_blocking(get_cached_spatial_index, session.cached_model, type_filter)
+
+    if box is not None:
+        first, second = parse_coordinates(box, 2, "box", yz_swap)
+        query_min = [min(a, b) for a, b in zip(first, second)]
+        query_max = [max(a, b) for a, b in zip(first, second)]
+        hits = [(index, None) for index in spatial_index.query_box(query_min, query_max).tolist()]
+    elif ray is not None:
+        origin, direction = parse_coordinates(ray, 2, "ray", yz_swap)
+        hits = spatial_index.query_ray(origin, direction, max_distance if max_distance is not None else float("inf"))
+    else:
+        hits = spatial_index.nearest(parse_coordinates(point, 1, "point", yz_swap)[0], k)
+        if max_distance is not None:
+            hits = [(index, distance) for index, distance in hits if distance <= max_distance]
+
+    elements = []
+    for index, distance in hits:
+        mesh = meshes[index]
+        element = {"id": mesh.element_id, "type": mesh.element_type, "globalId": mesh.global_id}
+        if distance is not None:
+            element["distance"] = distance
+        if geometry:
+            element["geometry"] = mesh.to_dict(yz_swap, as_arrays=True)
+        elements.append(element)
+    return await encode_json_response(request, {"count": len(elements), "elements": elements})
 
 #Server On
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from ..model.model_geometry import *
-from typing import List
+from typing import List, Union
 from ..element_type.ifc_type_enum import *
 
 #Base class
@@ -36,7 +36,7 @@ class Slab(Element):
         return self.geometry
 
 class SlabProfile(ElementGeometry):
-    def __init__(self, boundary: Polyline, depth: float):
+    def __init__(self, boundary: Union[Polyline, PolylineArray], depth: float):
         self.boundary_curve = boundary
         self.depth = depth
 #endregion
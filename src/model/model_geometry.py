@@ -1,5 +1,6 @@
 import math
-from typing import List
+from typing import Iterator, List, Union
+import numpy as np
 from abc import ABC, abstractmethod
 
 class GeometryFundamental(ABC):
@@ -599,6 +600,11 @@ class BoundingBox(GeometryFundamental):
             (self.min_point.y + self.max_point.y) / 2,
             (self.min_point.z + self.max_point.z) / 2
         )
+
+    def to_string(self) -> str:
+        result_min_pt = f"Min : X : {self.min_point.x}, Y : {self.min_point.y}, Z : {self.min_point.z}\n"
+        result_max_pt = f"Max : X : {self.max_point.x}, Y : {self.max_point.y}, Z : {self.max_point.z}"
+        return result_min_pt + result_max_pt
 class Plane(GeometryFundamental):
     """
     Represents a plane in 3D space defined by a point and a normal vector.
@@ -755,4 +761,241 @@ class Sphere(GeometryFundamental):
         :param point: The Point3d object to check.
         :return: True if the point is inside the sphere, False otherwise.
         """
-        return self.center.distance_to(point) <= self.radius
\ No newline at end of file
+        return self.center.distance_to(point) <= self.radius
+class PointView(Point3d):
+    """
+    Point3d backed by one row of a PointArray. Reading or writing x, y and z goes to the array.
+    """
+    tolerance = 1.0e-3
+
+    def __init__(self, coordinates: np.ndarray, index: int):
+        """
+        Initialize a new PointView object.
+
+        :param coordinates: The (N, 3) coordinate array of the PointArray.
+        :param index: Row of the point.
+        """
+        self._coordinates = coordinates
+        self._index = index
+
+    @property
+    def x(self) -> float:
+        return float(self._coordinates[self._index, 0])
+
+    @x.setter
+    def x(self, value: float):
+        self._coordinates[self._index, 0] = value
+
+    @property
+    def y(self) -> float:
+        return float(self._coordinates[self._index, 1])
+
+    @y.setter
+    def y(self, value: float):
+        self._coordinates[self._index, 1] = value
+
+    @property
+    def z(self) -> float:
+        return float(self._coordinates[self._index, 2])
+
+    @z.setter
+    def z(self, value: float):
+        self._coordinates[self._index, 2] = value
+class PointArray(GeometryFundamental):
+    """
+    Represents a sequence of points stored as one (N, 3) NumPy array.
+    Indexing returns PointView objects, so code written for lists of Point3d keeps working.
+    """
+
+    def __init__(self, coordinates: Union[np.ndarray, List]):
+        """
+        Initialize a new PointArray object.
+
+        :param coordinates: (N, 2) or (N, 3) coordinates. 2D points are placed at z = 0.
+        """
+        super().__init__()
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        if coordinates.size == 0:
+            coordinates = np.empty((0, 3))
+        elif coordinates.ndim == 1:
+            coordinates = coordinates.reshape(1, -1)
+        if coordinates.shape[1] == 2:
+            coordinates = np.column_stack([coordinates, np.zeros(len(coordinates))])
+        self.coordinates = coordinates
+
+    @classmethod
+    def from_points(cls, points: List[Point3d]) -> 'PointArray':
+        """
+        Create a PointArray from Point3d objects.
+
+        :param points: A list of Point3d objects.
+        :return: A new PointArray object.
+        """
+        return cls([(point.x, point.y, point.z) for point in points])
+
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[PointView, 'PointArray']:
+        if isinstance(index, slice):
+            view = PointArray.__new__(PointArray)
+            view.tolerance = self.tolerance
+            view.coordinates = self.coordinates[index]
+            return view
+        if index < 0:
+            index += len(self.coordinates)
+        if not 0 <= index < len(self.coordinates):
+            raise IndexError("PointArray index out of range")
+        return PointView(self.coordinates, index)
+
+    def __iter__(self) -> Iterator[PointView]:
+        for index in range(len(self.coordinates)):
+            yield PointView(self.coordinates, index)
+
+    def to_points(self) -> List[Point3d]:
+        """
+        Copy the points into independent Point3d objects.
+
+        :return: A list of Point3d objects.
+        """
+        return [Point3d(x, y, z) for x, y, z in self.coordinates.tolist()]
+
+    def centroid(self) -> Point3d:
+        """
+        Calculate the average of the points.
+
+        :return: A Point3d object at the centroid.
+        """
+        if len(self.coordinates) == 0:
+            return Point3d.invalid_point3d()
+        return Point3d(*self.coordinates.mean(axis=0).tolist())
+
+    def bounding_box(self) -> BoundingBox:
+        """
+        Calculate the axis aligned bounding box of the points.
+
+        :return: A BoundingBox object.
+        """
+        if len(self.coordinates) == 0:
+            return BoundingBox(Point3d.invalid_point3d(), Point3d.invalid_point3d())
+        return BoundingBox(Point3d(*self.coordinates.min(axis=0).tolist()), Point3d(*self.coordinates.max(axis=0).tolist()))
+
+    def transform(self, matrix: np.ndarray) -> 'PointArray':
+        """
+        Apply a 4x4 transformation matrix to every point.
+
+        :param matrix: The (4, 4) transformation matrix.
+        :return: A new PointArray object.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        return type(self)(self.coordinates @ matrix[0:3, 0:3].T + matrix[0:3, 3])
+
+    def to_string(self) -> str:
+        return "\n".join(f"Point{i} : X : {x}, Y : {y}, Z : {z}" for i, (x, y, z) in enumerate(self.coordinates.tolist()))
+class PolylineArray(PointArray):
+    """
+    Represents a polyline whose points are stored as one (N, 3) NumPy array.
+    Offers the interface of Polyline with vectorized measurements.
+    """
+
+    def __init__(self, coordinates: Union[np.ndarray, List]):
+        """
+        Initialize a new PolylineArray object.
+
+        :param coordinates: (N, 2) or (N, 3) coordinates of the vertices.
+        """
+        super().__init__(coordinates)
+
+    @classmethod
+    def from_polyline(cls, polyline: Polyline) -> 'PolylineArray':
+        """
+        Create a PolylineArray from a Polyline.
+
+        :param polyline: The Polyline object.
+        :return: A new PolylineArray object.
+        """
+        return cls.from_points(polyline.points)
+
+    @property
+    def points(self) -> PointArray:
+        """
+        The vertices, indexable like the list of Point3d of a Polyline.
+        """
+        return self[:]
+
+    @property
+    def count(self) -> int:
+        return len(self.coordinates)
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Check if the first and last points coincide within the tolerance.
+        """
+        if len(self.coordinates) <= 2:
+            return False
+        return bool(np.all(np.abs(self.coordinates[0] - self.coordinates[-1]) <= self.tolerance))
+
+    def segment_lengths(self) -> np.ndarray:
+        """
+        Calculate the length of every segment.
+
+        :return: Array of N - 1 segment lengths.
+        """
+        return np.linalg.norm(np.diff(self.coordinates, axis=0), axis=1)
+
+    def length(self) -> float:
+        """
+        Calculate the total length of the polyline.
+
+        :return: The total length of the polyline.
+        """
+        return float(self.segment_lengths().sum())
+
+    def area(self) -> float:
+        """
+        Calculate the area enclosed in the XY plane, like Polygon.area. An open polyline is closed implicitly.
+
+        :return: The enclosed area.
+        """
+        if len(self.coordinates) < 3:
+            return 0.0
+        x = self.coordinates[:, 0]
+        y = self.coordinates[:, 1]
+        return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2.0)
+
+    def centroid(self) -> Point3d:
+        """
+        Calculate the centroid of the polyline as a curve, weighting each segment midpoint by its length.
+
+        :return: A Point3d object at the centroid.
+        """
+        lengths = self.segment_lengths()
+        if lengths.sum() == 0:
+            return super().centroid()
+        midpoints = (self.coordinates[:-1] + self.coordinates[1:]) / 2
+        return Point3d(*(lengths @ midpoints / lengths.sum()).tolist())
+
+    def add_point(self, point: Point3d):
+        """
+        Add a point to the polyline.
+
+        :param point: The Point3d object to add.
+        """
+        self.coordinates = np.vstack([self.coordinates, [point.x, point.y, point.z]])
+
+    def point_count(self) -> int:
+        """
+        Get the number of points in the polyline.
+
+        :return: The number of points in the polyline.
+        """
+        return len(self.coordinates)
+
+    def to_polyline(self) -> Polyline:
+        """
+        Copy into a Polyline of independent Point3d objects.
+
+        :return: A new Polyline object.
+        """
+        return Polyline(self.to_points())
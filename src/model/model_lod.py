@@ -0,0 +1,124 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..model.model_mesh import ElementMesh
+
+
+class MeshSimplifier:
+    """
+    Level of detail tiers of element meshes by vertex clustering.
+
+    Every element is overlaid with a grid of the same number of cells along each side, so thin elements such as walls
+    and slabs keep their thickness, and all vertices of a grid cell collapse to the mean of that cell.
+    Triangles left with two corners in one cell are dropped. Vertices are kept apart by the dominant direction of
+    their normal, so faces stay flat shaded, but take the position of the whole cell, so no cracks open between faces.
+    """
+
+    # Grid cells along each side of an element, per tier. Tier 0 is the full mesh.
+    TIER_GRIDS = (None, 64, 16, 4)
+
+    @staticmethod
+    def tier_count() -> int:
+        return len(MeshSimplifier.TIER_GRIDS)
+
+    @staticmethod
+    def cluster(vertices: np.ndarray, faces: np.ndarray, normals: np.ndarray, edges: np.ndarray,
+                cell_size: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Simplify mesh arrays on a grid of the given cell size.
+
+        :param vertices: (N, 3) vertex positions.
+        :param faces: (M, 3) triangle vertex indices.
+        :param normals: (N, 3) vertex normals.
+        :param edges: (K, 2) edge vertex indices.
+        :param cell_size: (3,) size of a grid cell along each axis.
+        :return: (vertices, faces, normals, edges) of the simplified mesh.
+        """
+        if len(vertices) == 0:
+            return vertices, faces, normals, edges
+        cell_size = np.where(cell_size > 0, cell_size, 1.0)
+
+        cells = np.floor((vertices - vertices.min(axis=0)) / cell_size).astype(np.int64)
+        _, cell_of_vertex, cell_counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+        cell_of_vertex = cell_of_vertex.reshape(-1)
+        cell_positions = np.stack([np.bincount(cell_of_vertex, weights=vertices[:, axis]) for axis in range(3)], axis=1)
+        cell_positions /= cell_counts[:, None]
+
+        has_normals = len(normals) == len(vertices)
+        if has_normals:
+            dominant = np.argmax(np.abs(normals), axis=1)
+            direction = dominant * 2 + (normals[np.arange(len(normals)), dominant] < 0)
+        else:
+            direction = np.zeros(len(vertices), dtype=np.int64)
+        _, cluster_of_vertex = np.unique(np.stack([cell_of_vertex, direction], axis=1), axis=0, return_inverse=True)
+        cluster_of_vertex = cluster_of_vertex.reshape(-1)
+        cluster_count = cluster_of_vertex.max() + 1
+        cluster_cells = np.zeros(cluster_count, dtype=np.int64)
+        cluster_cells[cluster_of_vertex] = cell_of_vertex
+
+        face_cells = cell_of_vertex[faces]
+        kept = (face_cells[:, 0] != face_cells[:, 1]) & (face_cells[:, 1] != face_cells[:, 2]) & (face_cells[:, 0] != face_cells[:, 2])
+        new_faces = cluster_of_vertex[faces[kept]]
+        if len(new_faces):
+            _, first = np.unique(np.sort(new_faces, axis=1), axis=0, return_index=True)
+            new_faces = new_faces[np.sort(first)]
+
+        edge_cells = cell_of_vertex[edges]
+        new_edges = cluster_of_vertex[edges[edge_cells[:, 0] != edge_cells[:, 1]]]
+        if len(new_edges):
+            new_edges = np.unique(np.sort(new_edges, axis=1), axis=0)
+
+        # Drop clusters no face or edge refers to any more and renumber the rest.
+        used = np.unique(np.concatenate([new_faces.ravel(), new_edges.ravel()]))
+        remap = np.full(cluster_count, -1, dtype=np.int64)
+        remap[used] = np.arange(len(used))
+
+        new_vertices = cell_positions[cluster_cells[used]]
+        if has_normals:
+            summed = np.stack([np.bincount(cluster_of_vertex, weights=normals[:, axis], minlength=cluster_count) for axis in range(3)], axis=1)[used]
+            lengths = np.linalg.norm(summed, axis=1, keepdims=True)
+            new_normals = np.divide(summed, lengths, out=np.zeros_like(summed), where=lengths > 0)
+        else:
+            new_normals = np.empty((0, 3))
+        return new_vertices, remap[new_faces].reshape(-1, 3), new_normals, remap[new_edges].reshape(-1, 2)
+
+    @staticmethod
+    def simplify(meshes: List[ElementMesh], tier: int) -> List[ElementMesh]:
+        """
+        Meshes of an LOD tier. Elements sharing a representation are simplified once and share the result.
+
+        :param meshes: Full resolution element meshes.
+        :param tier: Index into TIER_GRIDS.
+        :return: New meshes with the simplified arrays and the placement of the originals.
+        """
+        grid = MeshSimplifier.TIER_GRIDS[tier]
+        if grid is None:
+            return meshes
+
+        simplified: Dict[str, tuple] = {}
+        result = []
+        for mesh in meshes:
+            arrays = simplified.get(mesh.geometry_id)
+            if arrays is None:
+                extent = np.ptp(mesh.vertices, axis=0) if len(mesh.vertices) else np.zeros(3)
+                arrays = MeshSimplifier.cluster(mesh.vertices, mesh.faces, mesh.normals, mesh.edges, extent / grid)
+                simplified[mesh.geometry_id] = arrays
+            vertices, faces, normals, edges = arrays
+            result.append(ElementMesh(
+                element_id=mesh.element_id,
+                element_type=mesh.element_type,
+                global_id=mesh.global_id,
+                geometry_type=mesh.geometry_type,
+                geometry_id=f"{mesh.geometry_id}:lod{tier}",
+                vertices=vertices,
+                faces=faces,
+                normals=normals,
+                edges=edges,
+                matrix=mesh.matrix,
+            ))
+        return result
+
+    @staticmethod
+    def triangle_count(meshes: List[ElementMesh]) -> int:
+        return sum(len(mesh.faces) for mesh in meshes)
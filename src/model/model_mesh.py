@@ -0,0 +1,234 @@
+import hashlib
+from typing import Dict, List, Union
+
+import ifcopenshell
+import ifcopenshell.util.shape
+import numpy as np
+
+
+class ElementMesh:
+    """
+    Tessellated geometry of a single IFC element, kept as NumPy arrays.
+    Vertices are in the element's local coordinates and `matrix` places them in the model.
+    """
+
+    def __init__(self,
+                 element_id: int,
+                 element_type: str,
+                 global_id: Union[str, None],
+                 geometry_type: str,
+                 geometry_id: str,
+                 vertices: np.ndarray,
+                 faces: np.ndarray,
+                 normals: np.ndarray,
+                 edges: np.ndarray,
+                 matrix: np.ndarray):
+        """
+        Initialize a new ElementMesh object.
+
+        :param element_id: STEP id of the element.
+        :param element_type: IFC class of the element. (IfcSlab, IfcWall, ...)
+        :param global_id: GlobalId of the element.
+        :param geometry_type: Class name of the tessellated geometry.
+        :param geometry_id: Id of the representation the geometry was built from.
+        :param vertices: (N, 3) float64 array of vertex positions.
+        :param faces: (M, 3) int array of triangle vertex indices.
+        :param normals: (N, 3) float64 array of vertex normals.
+        :param edges: (K, 2) int array of edge vertex indices.
+        :param matrix: (4, 4) placement matrix of the element.
+        """
+        self.element_id = element_id
+        self.element_type = element_type
+        self.global_id = global_id
+        self.geometry_type = geometry_type
+        self.geometry_id = geometry_id
+        self.vertices = vertices
+        self.faces = faces
+        self.normals = normals
+        self.edges = edges
+        self.matrix = matrix
+
+    @classmethod
+    def from_shape(cls, element: ifcopenshell.entity_instance, shape, element_type: Union[str, None] = None,
+                   geometry_cache: Union[Dict[str, tuple], None] = None) -> 'ElementMesh':
+        """
+        Build an ElementMesh from a shape created by ifcopenshell.geom.
+
+        :param element: The IFC element the shape belongs to.
+        :param shape: The shape returned by create_shape or the geometry iterator.
+        :param element_type: Type label to record. Defaults to the element's IFC class.
+        :param geometry_cache: Arrays already built per geometry id. Elements sharing a representation share the arrays.
+        :return: A new ElementMesh object.
+        """
+        geometry = shape.geometry
+        geometry_id = str(geometry.id)
+        arrays = geometry_cache.get(geometry_id) if geometry_cache is not None else None
+        if arrays is None:
+            arrays = (
+                np.asarray(geometry.verts, dtype=np.float64).reshape(-1, 3),
+                np.asarray(geometry.faces, dtype=np.int64).reshape(-1, 3),
+                np.asarray(geometry.normals, dtype=np.float64).reshape(-1, 3),
+                np.asarray(geometry.edges, dtype=np.int64).reshape(-1, 2),
+            )
+            if geometry_cache is not None:
+                geometry_cache[geometry_id] = arrays
+
+        vertices, faces, normals, edges = arrays
+        return cls(
+            element_id=element.id(),
+            element_type=element_type if element_type else element.is_a(),
+            global_id=getattr(element, "GlobalId", None),
+            geometry_type=geometry.__class__.__name__,
+            geometry_id=geometry_id,
+            vertices=vertices,
+            faces=faces,
+            normals=normals,
+            edges=edges,
+            matrix=np.asarray(ifcopenshell.util.shape.get_shape_matrix(shape), dtype=np.float64),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the mesh arrays in bytes.
+        """
+        return self.vertices.nbytes + self.faces.nbytes + self.normals.nbytes + self.edges.nbytes + self.matrix.nbytes
+
+    def location(self) -> np.ndarray:
+        """
+        Translation part of the placement matrix.
+
+        :return: Array of [x, y, z].
+        """
+        return self.matrix[0:3, 3]
+
+    def to_dict(self, yz_swap=True, as_arrays=False) -> dict:
+        """
+        Convert to the per-element dictionary returned by /getgeometry.
+
+        :param yz_swap: Swap Y and Z axes of vertices and location for Y-up viewers.
+        :param as_arrays: Keep the arrays as contiguous NumPy arrays instead of lists, for encoders that write them directly.
+        :return: Dictionary of the element geometry.
+        """
+        convert = np.ascontiguousarray if as_arrays else np.ndarray.tolist
+        location = self.location()
+        if yz_swap:
+            vertices = convert(self.vertices[:, [0, 2, 1]])
+            location = [float(location[0]), float(location[2]), float(location[1])]
+        else:
+            vertices = convert(self.vertices)
+            location = [float(location[0]), float(location[1]), float(location[2])]
+
+        faces = convert(self.faces)
+        normals = convert(self.normals.reshape(-1))
+        edges = convert(self.edges)
+
+        return {
+            "id": self.element_id,
+            "type": self.element_type,
+            "geometryType": self.geometry_type,
+            "vertices": vertices,
+            "vertices_count": len(vertices),
+            "faces": faces,
+            "faces_count": len(faces),
+            "normals": normals,
+            "normals_count": len(normals),
+            "edges": edges,
+            "edges_count": len(edges),
+            "location": location,
+        }
+
+
+class MeshLibrary:
+    """
+    Unique meshes of a set of elements plus one placement per element.
+    Meshes are shared by representation id first, then by a hash of their arrays.
+    """
+    # Permutation that swaps Y and Z. It is its own inverse, so a matrix M becomes P @ M @ P.
+    YZ_SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=np.float64)
+
+    def __init__(self):
+        self.meshes: List[ElementMesh] = []
+        self.instances: List[tuple] = []
+        self.index_by_geometry_id: Dict[str, int] = {}
+        self.index_by_hash: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, meshes: List[ElementMesh]) -> 'MeshLibrary':
+        library = cls()
+        for mesh in meshes:
+            library.add(mesh)
+        return library
+
+    @staticmethod
+    def mesh_hash(mesh: ElementMesh) -> str:
+        digest = hashlib.sha1()
+        for array in (mesh.vertices, mesh.faces, mesh.normals, mesh.edges):
+            digest.update(np.ascontiguousarray(array).tobytes())
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def add(self, mesh: ElementMesh) -> int:
+        """
+        Add the mesh of an element and return the index of the library mesh it uses.
+
+        :param mesh: The element mesh.
+        :return: Index in `meshes`.
+        """
+        index = self.index_by_geometry_id.get(mesh.geometry_id)
+        if index is None:
+            mesh_hash = MeshLibrary.mesh_hash(mesh)
+            index = self.index_by_hash.get(mesh_hash)
+            if index is None:
+                index = len(self.meshes)
+                self.meshes.append(mesh)
+                self.index_by_hash[mesh_hash] = index
+            self.index_by_geometry_id[mesh.geometry_id] = index
+
+        self.instances.append((mesh, index))
+        return index
+
+    def to_dict(self, yz_swap=True, as_arrays=False) -> dict:
+        """
+        Convert to the instanced geometry payload.
+        Matrices are flattened column-major, ready for Matrix4.fromArray in three.js.
+
+        :param yz_swap: Swap Y and Z axes of vertices and matrices for Y-up viewers.
+        :param as_arrays: Keep the mesh arrays as contiguous NumPy arrays instead of lists. (see ElementMesh.to_dict)
+        :return: Dictionary with "meshes" and "instances".
+        """
+        convert = np.ascontiguousarray if as_arrays else np.ndarray.tolist
+        meshes = []
+        for index, mesh in enumerate(self.meshes):
+            vertices = mesh.vertices[:, [0, 2, 1]] if yz_swap else mesh.vertices
+            meshes.append({
+                "mesh": index,
+                "geometryId": mesh.geometry_id,
+                "geometryType": mesh.geometry_type,
+                "vertices": convert(vertices),
+                "vertices_count": len(vertices),
+                "faces": convert(mesh.faces),
+                "faces_count": len(mesh.faces),
+                "normals": convert(mesh.normals.reshape(-1)),
+                "normals_count": mesh.normals.size,
+                "edges": convert(mesh.edges),
+                "edges_count": len(mesh.edges),
+            })
+
+        instances = []
+        for mesh, index in self.instances:
+            matrix = MeshLibrary.YZ_SWAP @ mesh.matrix @ MeshLibrary.YZ_SWAP if yz_swap else mesh.matrix
+            instances.append({
+                "id": mesh.element_id,
+                "type": mesh.element_type,
+                "mesh": index,
+                "matrix": matrix.reshape(-1, order="F").tolist(),
+                "location": matrix[0:3, 3].tolist(),
+            })
+
+        return {
+            "meshes": meshes,
+            "meshes_count": len(meshes),
+            "instances": instances,
+            "instances_count": len(instances),
+        }
@@ -0,0 +1,146 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from ..model.model_mesh import ElementMesh
+
+
+class MeshQuantities:
+    """
+    Vectorized quantity takeoff over tessellated element meshes.
+    Every triangle of every element is processed in one batch, and per-element sums are gathered with bincount.
+    Quantities are in the units of the tessellated geometry. (metres, as ifcopenshell.geom outputs SI units)
+    """
+
+    @staticmethod
+    def world_vertices(mesh: ElementMesh) -> np.ndarray:
+        """
+        Vertices of the mesh placed in model coordinates.
+
+        :param mesh: The element mesh.
+        :return: (N, 3) array.
+        """
+        return mesh.vertices @ mesh.matrix[0:3, 0:3].T + mesh.matrix[0:3, 3]
+
+    @staticmethod
+    def stack(meshes: List[ElementMesh]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Concatenate meshes into model space arrays.
+
+        :param meshes: Element meshes.
+        :return: (vertices (N, 3), faces (M, 3) with global indices, element index per face (M,), vertex offsets (len + 1,))
+        """
+        vertex_counts = np.array([len(mesh.vertices) for mesh in meshes], dtype=np.int64)
+        face_counts = np.array([len(mesh.faces) for mesh in meshes], dtype=np.int64)
+        vertex_offsets = np.concatenate([[0], np.cumsum(vertex_counts)])
+
+        if len(meshes) == 0 or vertex_offsets[-1] == 0:
+            return np.empty((0, 3)), np.empty((0, 3), dtype=np.int64), np.empty(0, dtype=np.int64), vertex_offsets
+
+        vertices = np.concatenate([MeshQuantities.world_vertices(mesh) for mesh in meshes])
+        faces = np.concatenate([mesh.faces for mesh in meshes]) + np.repeat(vertex_offsets[:-1], face_counts)[:, None]
+        face_elements = np.repeat(np.arange(len(meshes)), face_counts)
+        return vertices, faces, face_elements, vertex_offsets
+
+    @staticmethod
+    def triangle_measures(vertices: np.ndarray, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Area and signed volume contribution of every triangle.
+        The signed volume is the tetrahedron spanned with the origin, so it sums to the enclosed volume of a closed mesh.
+
+        :param vertices: (N, 3) array.
+        :param faces: (M, 3) array of vertex indices.
+        :return: (areas (M,), signed volumes (M,))
+        """
+        a = vertices[faces[:, 0]]
+        b = vertices[faces[:, 1]]
+        c = vertices[faces[:, 2]]
+        cross = np.cross(b - a, c - a)
+        areas = 0.5 * np.linalg.norm(cross, axis=1)
+        volumes = np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0
+        return areas, volumes
+
+    @staticmethod
+    def reduce_bounding_boxes(vertices: np.ndarray, vertex_offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bounding box of every vertex range of stacked meshes. Meshes without vertices get NaN corners.
+
+        :param vertices: (N, 3) stacked vertices.
+        :param vertex_offsets: Start of every mesh in vertices, followed by N.
+        :return: (minimum corners (len, 3), maximum corners (len, 3))
+        """
+        count = len(vertex_offsets) - 1
+        bbox_min = np.full((count, 3), np.nan)
+        bbox_max = np.full((count, 3), np.nan)
+        non_empty = np.flatnonzero(np.diff(vertex_offsets) > 0)
+        if len(non_empty):
+            starts = vertex_offsets[:-1][non_empty]
+            bbox_min[non_empty] = np.minimum.reduceat(vertices, starts, axis=0)
+            bbox_max[non_empty] = np.maximum.reduceat(vertices, starts, axis=0)
+        return bbox_min, bbox_max
+
+    @staticmethod
+    def bounding_boxes(meshes: List[ElementMesh]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Model space bounding box of every mesh.
+
+        :param meshes: Element meshes.
+        :return: (minimum corners (len, 3), maximum corners (len, 3))
+        """
+        vertices, _, _, vertex_offsets = MeshQuantities.stack(meshes)
+        return MeshQuantities.reduce_bounding_boxes(vertices, vertex_offsets)
+
+    @staticmethod
+    def compute(meshes: List[ElementMesh]) -> dict:
+        """
+        Volume, surface area and bounding box per element, aggregated per IFC class.
+
+        :param meshes: Element meshes.
+        :return: Dictionary with "elements", "types" and "total".
+        """
+        count = len(meshes)
+        vertices, faces, face_elements, vertex_offsets = MeshQuantities.stack(meshes)
+        areas, volumes = MeshQuantities.triangle_measures(vertices, faces)
+
+        element_areas = np.bincount(face_elements, weights=areas, minlength=count)
+        # Outward or inward winding only flips the sign of a closed mesh.
+        element_volumes = np.abs(np.bincount(face_elements, weights=volumes, minlength=count))
+
+        bbox_min, bbox_max = MeshQuantities.reduce_bounding_boxes(vertices, vertex_offsets)
+
+        elements = []
+        types = {}
+        for index, mesh in enumerate(meshes):
+            has_bbox = not np.isnan(bbox_min[index, 0])
+            elements.append({
+                "id": mesh.element_id,
+                "type": mesh.element_type,
+                "globalId": mesh.global_id,
+                "volume": float(element_volumes[index]),
+                "area": float(element_areas[index]),
+                "bbox": {"min": bbox_min[index].tolist(), "max": bbox_max[index].tolist()} if has_bbox else None,
+            })
+
+        type_names = np.array([mesh.element_type for mesh in meshes], dtype=object)
+        for type_name in dict.fromkeys(type_names):
+            mask = type_names == type_name
+            types[type_name] = MeshQuantities.aggregate(mask, element_volumes, element_areas, bbox_min, bbox_max)
+
+        return {
+            "units": {"length": "m", "area": "m2", "volume": "m3"},
+            "elements": elements,
+            "types": types,
+            "total": MeshQuantities.aggregate(np.ones(count, dtype=bool), element_volumes, element_areas, bbox_min, bbox_max),
+        }
+
+    @staticmethod
+    def aggregate(mask: np.ndarray, volumes: np.ndarray, areas: np.ndarray, bbox_min: np.ndarray, bbox_max: np.ndarray) -> dict:
+        selected_min = bbox_min[mask]
+        selected_max = bbox_max[mask]
+        has_bbox = len(selected_min) and not np.all(np.isnan(selected_min))
+        return {
+            "count": int(mask.sum()),
+            "volume": float(volumes[mask].sum()),
+            "area": float(areas[mask].sum()),
+            "bbox": {"min": np.nanmin(selected_min, axis=0).tolist(), "max": np.nanmax(selected_max, axis=0).tolist()} if has_bbox else None,
+        }
@@ -0,0 +1,171 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from ..model.model_mesh import ElementMesh
+
+
+class MeshWelder:
+    """
+    Merges coincident vertices of element meshes by spatial hashing.
+    Positions are snapped to a grid of the tolerance and vertices sharing a grid key and a normal become one.
+    Vertices on a sharp edge keep their own normals, so flat shading is unchanged.
+    """
+
+    # Metres, the unit of the tessellated geometry.
+    TOLERANCE = 1e-4
+    NORMAL_TOLERANCE = 1e-3
+
+    @staticmethod
+    def weld_arrays(vertices: np.ndarray, faces: np.ndarray, normals: np.ndarray, edges: np.ndarray,
+                    tolerance: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Weld mesh arrays.
+
+        :return: (vertices, faces, normals, edges) without duplicate vertices, degenerate faces or duplicate edges.
+        """
+        if len(vertices) == 0:
+            return vertices, faces, normals, edges
+
+        keys = np.floor(vertices / tolerance + 0.5).astype(np.int64)
+        has_normals = len(normals) == len(vertices)
+        if has_normals:
+            keys = np.concatenate([keys, np.floor(normals / MeshWelder.NORMAL_TOLERANCE + 0.5).astype(np.int64)], axis=1)
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        new_faces = inverse[faces]
+        new_faces = new_faces[(new_faces[:, 0] != new_faces[:, 1]) & (new_faces[:, 1] != new_faces[:, 2]) & (new_faces[:, 0] != new_faces[:, 2])]
+        new_edges = inverse[edges]
+        new_edges = new_edges[new_edges[:, 0] != new_edges[:, 1]]
+        if len(new_edges):
+            new_edges = np.unique(np.sort(new_edges, axis=1), axis=0)
+        return vertices[first], new_faces, normals[first] if has_normals else normals, new_edges
+
+    @staticmethod
+    def weld(meshes: List[ElementMesh], tolerance: float = TOLERANCE) -> List[ElementMesh]:
+        """
+        Welded copies of the meshes. Elements sharing a representation are welded once and share the result.
+
+        :param meshes: Element meshes.
+        :param tolerance: Vertices closer than this are merged.
+        :return: New meshes with the welded arrays and the placement of the originals.
+        """
+        welded = {}
+        result = []
+        for mesh in meshes:
+            arrays = welded.get(mesh.geometry_id)
+            if arrays is None:
+                arrays = MeshWelder.weld_arrays(mesh.vertices, mesh.faces, mesh.normals, mesh.edges, tolerance)
+                welded[mesh.geometry_id] = arrays
+            vertices, faces, normals, edges = arrays
+            result.append(ElementMesh(
+                element_id=mesh.element_id,
+                element_type=mesh.element_type,
+                global_id=mesh.global_id,
+                geometry_type=mesh.geometry_type,
+                geometry_id=mesh.geometry_id,
+                vertices=vertices,
+                faces=faces,
+                normals=normals,
+                edges=edges,
+                matrix=mesh.matrix,
+            ))
+        return result
+
+
+class MeshQuantizer:
+    """
+    Compact encoding of mesh attributes.
+    Positions become 16-bit integers relative to the bounding box of each element: position = offset + value * scale.
+    Normals become two signed 8-bit integers by octahedral encoding.
+    """
+
+    POSITION_BITS = 16
+    NORMAL_BITS = 8
+
+    @staticmethod
+    def quantize_positions(vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :param vertices: (N, 3) positions.
+        :return: ((N, 3) uint16 values, (3,) offset, (3,) scale)
+        """
+        steps = (1 << MeshQuantizer.POSITION_BITS) - 1
+        if len(vertices) == 0:
+            return np.empty((0, 3), dtype=np.uint16), np.zeros(3), np.zeros(3)
+        offset = vertices.min(axis=0)
+        scale = (vertices.max(axis=0) - offset) / steps
+        values = np.divide(vertices - offset, scale, out=np.zeros_like(vertices), where=scale > 0)
+        return np.rint(values).astype(np.uint16), offset, scale
+
+    @staticmethod
+    def oct_encode(normals: np.ndarray) -> np.ndarray:
+        """
+        :param normals: (N, 3) unit vectors.
+        :return: (N, 2) int8 values.
+        """
+        steps = (1 << (MeshQuantizer.NORMAL_BITS - 1)) - 1
+        length = np.abs(normals).sum(axis=1, keepdims=True)
+        projected = np.divide(normals, length, out=np.zeros_like(normals, dtype=np.float64), where=length > 0)
+        x, y, z = projected[:, 0], projected[:, 1], projected[:, 2]
+        # The lower hemisphere is folded over the diagonals of the octahedron.
+        folded_x = (1.0 - np.abs(y)) * np.where(x >= 0, 1.0, -1.0)
+        folded_y = (1.0 - np.abs(x)) * np.where(y >= 0, 1.0, -1.0)
+        encoded = np.stack([np.where(z < 0, folded_x, x), np.where(z < 0, folded_y, y)], axis=1)
+        return np.rint(np.clip(encoded, -1.0, 1.0) * steps).astype(np.int8)
+
+    @staticmethod
+    def oct_decode(encoded: np.ndarray) -> np.ndarray:
+        """
+        Inverse of oct_encode, as the client decodes it.
+        """
+        steps = (1 << (MeshQuantizer.NORMAL_BITS - 1)) - 1
+        x = encoded[:, 0].astype(np.float64) / steps
+        y = encoded[:, 1].astype(np.float64) / steps
+        z = 1.0 - np.abs(x) - np.abs(y)
+        unfolded_x = (1.0 - np.abs(y)) * np.where(x >= 0, 1.0, -1.0)
+        unfolded_y = (1.0 - np.abs(x)) * np.where(y >= 0, 1.0, -1.0)
+        normals = np.stack([np.where(z < 0, unfolded_x, x), np.where(z < 0, unfolded_y, y), z], axis=1)
+        return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+    @staticmethod
+    def encode(mesh: ElementMesh, yz_swap=True) -> Tuple[np.ndarray, np.ndarray, dict]:
+        """
+        Quantized positions and normals of a mesh, in Y-up axes if yz_swap.
+
+        :return: (positions (N, 3) uint16, normals (N, 2) int8, decode parameters)
+        """
+        vertices = mesh.vertices[:, [0, 2, 1]] if yz_swap else mesh.vertices
+        normals = mesh.normals[:, [0, 2, 1]] if yz_swap else mesh.normals
+        positions, offset, scale = MeshQuantizer.quantize_positions(vertices)
+        decode = {
+            "position": {"bits": MeshQuantizer.POSITION_BITS, "offset": offset.tolist(), "scale": scale.tolist()},
+            "normal": {"encoding": "oct", "bits": MeshQuantizer.NORMAL_BITS},
+        }
+        return positions, MeshQuantizer.oct_encode(normals), decode
+
+    @staticmethod
+    def to_dict(mesh: ElementMesh, yz_swap=True, as_arrays=False) -> dict:
+        """
+        Quantized counterpart of ElementMesh.to_dict. Arrays are flat and normals follow yz_swap like the positions.
+        """
+        convert = np.ascontiguousarray if as_arrays else np.ndarray.tolist
+        positions, normals, decode = MeshQuantizer.encode(mesh, yz_swap)
+        location = mesh.location()
+        if yz_swap:
+            location = location[[0, 2, 1]]
+        return {
+            "id": mesh.element_id,
+            "type": mesh.element_type,
+            "geometryType": mesh.geometry_type,
+            "vertices": convert(positions.reshape(-1)),
+            "vertices_count": len(positions),
+            "faces": convert(mesh.faces.reshape(-1)),
+            "faces_count": len(mesh.faces),
+            "normals": convert(normals.reshape(-1)),
+            "normals_count": len(normals),
+            "edges": convert(mesh.edges.reshape(-1)),
+            "edges_count": len(mesh.edges),
+            "location": [float(value) for value in location],
+            "decode": decode,
+        }
@@ -0,0 +1,152 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from ..model.model_mesh import ElementMesh
+from ..model.model_quantities import MeshQuantities
+
+
+class MeshSlicer:
+    """
+    Vectorized slicing of element meshes by horizontal planes.
+
+    The volume of a closed mesh below z = h is the flux of F = (0, 0, z - h) through the part of its surface below
+    the plane. F vanishes on the cutting plane, so no cap has to be built: each triangle contributes its signed XY
+    projected area times (mean z - h) of the clipped part. A triangle crossing the plane is clipped to the
+    sub-triangle at its lone vertex, whose other two corners lie on the plane.
+    """
+
+    @staticmethod
+    def triangle_planes(triangles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signed XY projected area and area of every triangle. Independent of the cutting planes, so computed once.
+
+        :param triangles: (M, 3, 3) array of triangle corners in model coordinates.
+        :return: (projected areas (M,), areas (M,))
+        """
+        a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+        cross = np.cross(b - a, c - a)
+        return 0.5 * cross[:, 2], 0.5 * np.linalg.norm(cross, axis=1)
+
+    @staticmethod
+    def measures_below(triangles: np.ndarray, projected: np.ndarray, areas: np.ndarray, height: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signed volume and surface area below a horizontal plane, per triangle.
+
+        :param triangles: (M, 3, 3) array of triangle corners in model coordinates.
+        :param projected: Signed XY projected area of every triangle.
+        :param areas: Area of every triangle.
+        :param height: Elevation of the plane.
+        :return: (signed volume contributions (M,), areas (M,))
+        """
+        z = triangles[:, :, 2]
+        below = z < height
+        below_count = below.sum(axis=1)
+
+        full_volumes = projected * (z.mean(axis=1) - height)
+
+        volumes = np.where(below_count == 3, full_volumes, 0.0)
+        surface = np.where(below_count == 3, areas, 0.0)
+
+        crossing = (below_count == 1) | (below_count == 2)
+        if np.any(crossing):
+            z_crossing = z[crossing]
+            below_crossing = below[crossing]
+            count_crossing = below_count[crossing]
+
+            # Rotate each triangle so the lone vertex comes first. Cyclic rotation keeps the winding.
+            lone = np.where(count_crossing == 1, np.argmax(below_crossing, axis=1), np.argmax(~below_crossing, axis=1))
+            order = (lone[:, None] + np.arange(3)) % 3
+            z_rotated = np.take_along_axis(z_crossing, order, axis=1)
+            z0, z1, z2 = z_rotated[:, 0], z_rotated[:, 1], z_rotated[:, 2]
+
+            t1 = (height - z0) / (z1 - z0)
+            t2 = (height - z0) / (z2 - z0)
+            part_volumes = projected[crossing] * t1 * t2 * (z0 - height) / 3.0
+            part_areas = areas[crossing] * t1 * t2
+
+            lone_below = count_crossing == 1
+            volumes[crossing] = np.where(lone_below, part_volumes, full_volumes[crossing] - part_volumes)
+            surface[crossing] = np.where(lone_below, part_areas, areas[crossing] - part_areas)
+
+        return volumes, surface
+
+    @staticmethod
+    def slice(meshes: List[ElementMesh], heights: List[float], names: Union[List[str], None] = None) -> dict:
+        """
+        Split every element at the planes and report the volume and area of each element in each band.
+        Band i spans from plane i - 1 to plane i, with an open band below the first and above the last plane.
+
+        :param meshes: Element meshes.
+        :param heights: Plane elevations in model coordinates.
+        :param names: Name of each plane. (e.g. storey names)
+        :return: Dictionary with "bands", "elements" and "types".
+        """
+        order = np.argsort(heights)
+        heights = np.asarray(heights, dtype=np.float64)[order]
+        names = [names[index] for index in order] if names else [f"{height:g}" for height in heights]
+
+        count = len(meshes)
+        band_count = len(heights) + 1
+        vertices, faces, face_elements, _ = MeshQuantities.stack(meshes)
+        triangles = vertices[faces]
+        projected, triangle_areas = MeshSlicer.triangle_planes(triangles)
+
+        _, triangle_volumes = MeshQuantities.triangle_measures(vertices, faces)
+        total_volumes = np.bincount(face_elements, weights=triangle_volumes, minlength=count)
+        total_areas = np.bincount(face_elements, weights=triangle_areas, minlength=count)
+        # Inverted winding flips every signed volume of the element.
+        signs = np.where(total_volumes < 0, -1.0, 1.0)
+
+        volumes_below = np.zeros((band_count + 1, count))
+        areas_below = np.zeros((band_count + 1, count))
+        for index, height in enumerate(heights):
+            volumes, areas = MeshSlicer.measures_below(triangles, projected, triangle_areas, height)
+            volumes_below[index + 1] = np.bincount(face_elements, weights=volumes, minlength=count) * signs
+            areas_below[index + 1] = np.bincount(face_elements, weights=areas, minlength=count)
+        volumes_below[band_count] = np.abs(total_volumes)
+        areas_below[band_count] = total_areas
+
+        band_volumes = np.diff(volumes_below, axis=0)
+        band_areas = np.diff(areas_below, axis=0)
+
+        bands = []
+        for index in range(band_count):
+            bands.append({
+                "band": index,
+                "name": names[index - 1] if index > 0 else f"below {names[0]}" if names else "all",
+                "bottom": float(heights[index - 1]) if index > 0 else None,
+                "top": float(heights[index]) if index < len(heights) else None,
+            })
+
+        elements = []
+        types = {}
+        for element_index, mesh in enumerate(meshes):
+            element_bands = []
+            for band in np.flatnonzero(band_areas[:, element_index] > 0):
+                element_bands.append({
+                    "band": int(band),
+                    "volume": float(band_volumes[band, element_index]),
+                    "area": float(band_areas[band, element_index]),
+                })
+            elements.append({
+                "id": mesh.element_id,
+                "type": mesh.element_type,
+                "globalId": mesh.global_id,
+                "bands": element_bands,
+            })
+
+        type_names = np.array([mesh.element_type for mesh in meshes], dtype=object)
+        for type_name in dict.fromkeys(type_names):
+            mask = type_names == type_name
+            types[type_name] = [
+                {"band": band, "volume": float(band_volumes[band, mask].sum()), "area": float(band_areas[band, mask].sum())}
+                for band in range(band_count)
+            ]
+
+        return {
+            "units": {"length": "m", "area": "m2", "volume": "m3"},
+            "bands": bands,
+            "elements": elements,
+            "types": types,
+        }
@@ -0,0 +1,83 @@
+import gzip
+from typing import Callable, Dict, Union
+
+from src.server_utils.method_loggers import Logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class ResponseCompressor:
+    """
+    Content-Encoding negotiation and compression of response bodies.
+    gzip is always available, br and zstd when the brotli and zstandard packages are installed.
+    """
+
+    # Bodies smaller than this are sent as they are.
+    MIN_SIZE = 1024
+    # Bodies larger than this are compressed off the event loop.
+    INLINE_LIMIT = 64 * 1024
+
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    ZSTD_LEVEL = 9
+
+    @staticmethod
+    def compressors() -> Dict[str, Callable[[bytes], bytes]]:
+        """
+        Available encodings, in server preference order.
+        """
+        compressors = {}
+        if zstandard is not None:
+            compressors["zstd"] = lambda body: zstandard.ZstdCompressor(level=ResponseCompressor.ZSTD_LEVEL).compress(body)
+        if brotli is not None:
+            compressors["br"] = lambda body: brotli.compress(body, quality=ResponseCompressor.BROTLI_QUALITY)
+        compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=ResponseCompressor.GZIP_LEVEL, mtime=0)
+        return compressors
+
+    @staticmethod
+    def negotiate(accept_encoding: Union[str, None]) -> Union[str, None]:
+        """
+        Pick the encoding for an Accept-Encoding header value.
+        The highest q-value wins, and ties go to the server preference order.
+
+        :param accept_encoding: The header value, e.g. "gzip, deflate, br;q=0.9".
+        :return: The encoding, or None to send the body uncompressed.
+        """
+        if not accept_encoding:
+            return None
+        weights = {}
+        for part in accept_encoding.split(","):
+            name, _, parameters = part.strip().partition(";")
+            name = name.strip().lower()
+            weight = 1.0
+            for parameter in parameters.split(";"):
+                key, _, value = parameter.strip().partition("=")
+                if key.strip() == "q":
+                    try:
+                        weight = float(value)
+                    except ValueError:
+                        weight = 0.0
+            if name:
+                weights[name] = weight
+
+        best = None
+        best_weight = 0.0
+        for encoding in ResponseCompressor.compressors():
+            weight = weights.get(encoding, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = encoding, weight
+        return best
+
+    @staticmethod
+    def compress(body: bytes, encoding: str) -> bytes:
+        compressed = ResponseCompressor.compressors()[encoding](body)
+        Logger.log_info(f"Compressed {len(body)} bytes to {len(compressed)} bytes with {encoding}")
+        return compressed
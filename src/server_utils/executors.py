@@ -0,0 +1,52 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from src.config import IFC_EXECUTOR_WORKERS
+
+# Parsing and tessellation run here instead of on the event loop.
+# The pool is bounded so concurrent uploads queue up rather than oversubscribing CPU and memory.
+ifc_executor = ThreadPoolExecutor(max_workers=IFC_EXECUTOR_WORKERS, thread_name_prefix="ifc-worker")
+
+_EXHAUSTED = object()
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the IFC executor and await its result.
+
+    :param func: The blocking function.
+    :return: The return value of func.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ifc_executor, functools.partial(func, *args, **kwargs))
+
+
+def run_blocking_sync(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the IFC executor from a thread outside the event loop, and wait for its result.
+    Background jobs go through here, so they share the executor's bound with requests.
+
+    :param func: The blocking function.
+    :return: The return value of func. Exceptions raised by func are raised again.
+    """
+    return ifc_executor.submit(func, *args, **kwargs).result()
+
+
+async def iterate_blocking(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """
+    Advance a blocking iterator on the IFC executor, one item at a time.
+
+    :param iterator: The blocking iterator. (e.g. a generator that tessellates on demand)
+    :return: Async iterator of the same items.
+    """
+    while True:
+        item = await run_blocking(next, iterator, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            break
+        yield item
+
+
+def shutdown_executors() -> None:
+    ifc_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+import json
+import struct
+from typing import Callable, Iterable, Iterator, List, Union
+
+import numpy as np
+
+from src.model.model_mesh import ElementMesh
+from src.model.model_quantization import MeshQuantizer
+from src.server_utils.json_encoder import JsonEncoder
+
+
+class GeometryBinaryEncoder:
+    """
+    Packs element meshes into one binary payload: a JSON manifest followed by contiguous little-endian buffers.
+
+    Layout:
+        magic "ASGB" | uint32 version | uint32 manifest byte length | manifest (UTF-8 JSON, space padded to 4 bytes) | buffers
+
+    Every buffer is described in manifest["buffers"] by byteOffset and byteLength relative to the start of the
+    buffer section. Each element records [offset, count] in items of its buffer, and indices stay local to the element.
+    Quantized payloads store positions as uint16 and normals as oct-encoded int8 pairs, with per-element decode
+    parameters in the manifest. (see MeshQuantizer)
+    """
+    MAGIC = b"ASGB"
+    VERSION = 1
+    MEDIA_TYPE = "application/octet-stream"
+
+    BUFFERS = {
+        "vertices": ("<f4", 3),
+        "faces": ("<u4", 3),
+        "normals": ("<f4", 3),
+        "edges": ("<u4", 2),
+    }
+    QUANTIZED_BUFFERS = {
+        "vertices": ("<u2", 3),
+        "faces": ("<u4", 3),
+        "normals": ("<i1", 2),
+        "edges": ("<u4", 2),
+    }
+
+    @staticmethod
+    def encode(meshes: List[ElementMesh], yz_swap=True, quantize=False) -> bytes:
+        """
+        Encode meshes into the binary geometry format.
+
+        :param meshes: Meshes to encode.
+        :param yz_swap: Swap Y and Z axes of vertices and location for Y-up viewers.
+        :param quantize: Store quantized positions and normals.
+        :return: The encoded payload.
+        """
+        layout = GeometryBinaryEncoder.QUANTIZED_BUFFERS if quantize else GeometryBinaryEncoder.BUFFERS
+        arrays = {name: [] for name in layout}
+        counts = {name: 0 for name in layout}
+        elements = []
+
+        for mesh in meshes:
+            location = mesh.location()
+            vertices = mesh.vertices
+            normals = mesh.normals
+            decode = None
+            if yz_swap:
+                vertices = vertices[:, [0, 2, 1]]
+                location = location[[0, 2, 1]]
+            if quantize:
+                vertices, normals, decode = MeshQuantizer.encode(mesh, yz_swap)
+
+            element = {
+                "id": mesh.element_id,
+                "type": mesh.element_type,
+                "geometryType": mesh.geometry_type,
+                "location": [float(value) for value in location],
+            }
+            if decode is not None:
+                element["decode"] = decode
+            for name, array in (("vertices", vertices), ("faces", mesh.faces), ("normals", normals), ("edges", mesh.edges)):
+                element[name] = [counts[name], len(array)]
+                counts[name] += len(array)
+                arrays[name].append(array)
+            elements.append(element)
+
+        buffers = []
+        descriptors = {}
+        byte_offset = 0
+        for name, (dtype, item_size) in layout.items():
+            if arrays[name]:
+                data = np.concatenate(arrays[name]).astype(dtype, copy=False)
+            else:
+                data = np.empty((0, item_size), dtype=dtype)
+            data = np.ascontiguousarray(data).tobytes()
+            descriptors[name] = {
+                "byteOffset": byte_offset,
+                "byteLength": len(data),
+                "componentType": np.dtype(dtype).name,
+                "itemSize": item_size,
+            }
+            buffers.append(data)
+            byte_offset += len(data)
+
+        manifest = {
+            "version": GeometryBinaryEncoder.VERSION,
+            "yzSwap": yz_swap,
+            "quantized": quantize,
+            "buffers": descriptors,
+            "elements": elements,
+        }
+        manifest_bytes = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        manifest_bytes += b" " * (-len(manifest_bytes) % 4)
+
+        header = GeometryBinaryEncoder.MAGIC + struct.pack("<II", GeometryBinaryEncoder.VERSION, len(manifest_bytes))
+        return b"".join([header, manifest_bytes, *buffers])
+
+
+class GeometryNdjsonEncoder:
+    """
+    Encodes element meshes as newline-delimited JSON, one element per line, as soon as each mesh is available.
+    """
+    MEDIA_TYPE = "application/x-ndjson"
+
+    @staticmethod
+    def iter_lines(meshes: Iterable[ElementMesh], yz_swap=True, on_mesh: Union[Callable[[ElementMesh], None], None] = None,
+                   quantize=False) -> Iterator[bytes]:
+        """
+        Encode meshes lazily.
+
+        :param meshes: Meshes to encode. May be a generator that tessellates on demand.
+        :param yz_swap: Swap Y and Z axes of vertices and location for Y-up viewers.
+        :param on_mesh: Called with every mesh after it was encoded.
+        :param quantize: Encode positions and normals as integers. (see MeshQuantizer.to_dict)
+        :return: Iterator of encoded lines.
+        """
+        for mesh in meshes:
+            data = MeshQuantizer.to_dict(mesh, yz_swap, as_arrays=True) if quantize else mesh.to_dict(yz_swap, as_arrays=True)
+            yield JsonEncoder.dumps(data) + b"\n"
+            if on_mesh is not None:
+                on_mesh(mesh)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from src.config import GEOMETRY_STORE_DIR, GEOMETRY_STORE_BUDGET_MB
+from src.model.model_mesh import ElementMesh
+from src.server_utils.method_loggers import Logger
+
+
+class GeometryStore:
+    """
+    Disk store of tessellated meshes that survives restarts, keyed by the SHA-256 of the model and the type filter.
+
+    Every entry is a directory {root}/{model hash}/{filter hash}/ holding one .npy file per mesh array, with the arrays
+    of all unique geometries concatenated, the placement matrices of all elements, and a JSON manifest of ranges.
+    Entries are read with memory mapping, so meshes are views of the files and pages load on first access.
+    The least recently read entries are deleted once the store exceeds its size budget.
+    """
+    VERSION = 1
+    MANIFEST = "manifest.json"
+    ARRAYS = {
+        "vertices": (np.float64, 3),
+        "faces": (np.int64, 3),
+        "normals": (np.float64, 3),
+        "edges": (np.int64, 2),
+    }
+
+    def __init__(self, root: str, budget_bytes: int):
+        """
+        Initialize a new GeometryStore object.
+
+        :param root: Directory of the store. Kept apart from the upload directory, which is cleared on shutdown.
+        :param budget_bytes: Size budget of all entries in bytes. 0 disables the store.
+        """
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes > 0
+
+    def entry_path(self, model_key: str, filter_key: str) -> str:
+        return os.path.join(self.root, model_key, hashlib.sha1(filter_key.encode("utf-8")).hexdigest()[:16])
+
+    def load(self, model_key: str, filter_key: str) -> Union[List[ElementMesh], None]:
+        """
+        Read stored meshes.
+
+        :param model_key: SHA-256 hex digest of the model file.
+        :param filter_key: ElementTypeFilter.key() of the meshes.
+        :return: Meshes backed by memory mapped arrays, or None if nothing usable is stored.
+        """
+        if not self.enabled:
+            return None
+        path = self.entry_path(model_key, filter_key)
+        if not os.path.exists(os.path.join(path, GeometryStore.MANIFEST)):
+            return None
+        try:
+            with open(os.path.join(path, GeometryStore.MANIFEST), "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest.get("version") != GeometryStore.VERSION or manifest.get("filter") != filter_key:
+                return None
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in GeometryStore.ARRAYS}
+            matrices = np.load(os.path.join(path, "matrices.npy"), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            Logger.log_error(f"Geometry store entry {path} could not be read: {e}")
+            return None
+
+        geometries = []
+        for geometry in manifest["geometries"]:
+            views = {}
+            for name in GeometryStore.ARRAYS:
+                start, count = geometry[name]
+                views[name] = arrays[name][start:start + count]
+            geometries.append(views)
+
+        meshes = []
+        for index, element in enumerate(manifest["elements"]):
+            geometry = geometries[element["geometry"]]
+            meshes.append(ElementMesh(
+                element_id=element["id"],
+                element_type=element["type"],
+                global_id=element["globalId"],
+                geometry_type=element["geometryType"],
+                geometry_id=manifest["geometries"][element["geometry"]]["id"],
+                vertices=geometry["vertices"],
+                faces=geometry["faces"],
+                normals=geometry["normals"],
+                edges=geometry["edges"],
+                matrix=matrices[index],
+            ))
+        self.touch(path)
+        Logger.log_info(f"Geometry store read {len(meshes)} meshes of {model_key} ({filter_key})")
+        return meshes
+
+    def save(self, model_key: str, filter_key: str, meshes: List[ElementMesh]) -> None:
+        """
+        Store meshes, then evict old entries if the store exceeds its budget.
+        The entry is written to a temporary directory and renamed, so readers never see a partial entry.
+
+        :param model_key: SHA-256 hex digest of the model file.
+        :param filter_key: ElementTypeFilter.key() of the meshes.
+        :param meshes: Meshes to store.
+        """
+        if not self.enabled:
+            return
+        path = self.entry_path(model_key, filter_key)
+        if os.path.exists(os.path.join(path, GeometryStore.MANIFEST)):
+            return
+
+        geometry_index = {}
+        geometries = []
+        chunks = {name: [] for name in GeometryStore.ARRAYS}
+        counts = {name: 0 for name in GeometryStore.ARRAYS}
+        elements = []
+        for mesh in meshes:
+            index = geometry_index.get(mesh.geometry_id)
+            if index is None:
+                index = len(geometries)
+                geometry_index[mesh.geometry_id] = index
+                geometry = {"id": mesh.geometry_id}
+                for name in GeometryStore.ARRAYS:
+                    array = getattr(mesh, name)
+                    geometry[name] = [counts[name], len(array)]
+                    counts[name] += len(array)
+                    chunks[name].append(array)
+                geometries.append(geometry)
+            elements.append({
+                "id": mesh.element_id,
+                "type": mesh.element_type,
+                "globalId": mesh.global_id,
+                "geometryType": mesh.geometry_type,
+                "geometry": index,
+            })
+
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(temp_path)
+            for name, (dtype, item_size) in GeometryStore.ARRAYS.items():
+                array = np.concatenate(chunks[name]).astype(dtype, copy=False) if chunks[name] else np.empty((0, item_size), dtype=dtype)
+                np.save(os.path.join(temp_path, f"{name}.npy"), array.reshape(-1, item_size))
+            matrices = np.stack([mesh.matrix for mesh in meshes]) if meshes else np.empty((0, 4, 4))
+            np.save(os.path.join(temp_path, "matrices.npy"), matrices)
+            manifest = {"version": GeometryStore.VERSION, "model": model_key, "filter": filter_key,
+                        "geometries": geometries, "elements": elements}
+            with open(os.path.join(temp_path, GeometryStore.MANIFEST), "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, separators=(",", ":"))
+            with self.lock:
+                if os.path.exists(path):
+                    shutil.rmtree(temp_path, ignore_errors=True)
+                    return
+                os.replace(temp_path, path)
+        except OSError as e:
+            Logger.log_error(f"Geometry store entry {path} could not be written: {e}")
+            shutil.rmtree(temp_path, ignore_errors=True)
+            return
+        Logger.log_info(f"Geometry store wrote {len(meshes)} meshes of {model_key} ({filter_key})")
+        self.evict(keep=path)
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """
+        Mark an entry as recently used. The modification time of the manifest orders eviction.
+        """
+        try:
+            os.utime(os.path.join(path, GeometryStore.MANIFEST))
+        except OSError:
+            pass
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """
+        Stored entries.
+
+        :return: [(path, last use time, size in bytes)]
+        """
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for model_key in os.listdir(self.root):
+            model_path = os.path.join(self.root, model_key)
+            if not os.path.isdir(model_path):
+                continue
+            for entry_name in os.listdir(model_path):
+                path = os.path.join(model_path, entry_name)
+                manifest_path = os.path.join(path, GeometryStore.MANIFEST)
+                if entry_name.endswith(".tmp") or not os.path.exists(manifest_path):
+                    continue
+                try:
+                    size = sum(os.path.getsize(os.path.join(path, file_name)) for file_name in os.listdir(path))
+                    entries.append((path, os.path.getmtime(manifest_path), size))
+                except OSError:
+                    continue
+        return entries
+
+    def evict(self, keep: Union[str, None] = None) -> None:
+        """
+        Delete least recently used entries until the store fits its budget.
+
+        :param keep: Entry never deleted. (the one just written)
+        """
+        with self.lock:
+            entries = sorted(self.entries(), key=lambda entry: entry[1])
+            total = sum(size for _, _, size in entries)
+            for path, _, size in entries:
+                if total <= self.budget_bytes:
+                    break
+                if path == keep:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                Logger.log_info(f"Geometry store evicted {path}")
+                model_path = os.path.dirname(path)
+                if not os.listdir(model_path):
+                    os.rmdir(model_path)
+
+
+geometry_store = GeometryStore(GEOMETRY_STORE_DIR, GEOMETRY_STORE_BUDGET_MB * 1024 ** 2)
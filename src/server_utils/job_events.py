@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, Union
+
+from src.config import JOB_EVENT_INTERVAL_SECONDS
+from src.server_utils.job_queue import Job
+from src.server_utils.json_encoder import JsonEncoder
+
+
+class JobEventStream:
+    """
+    Progress of a job as Server-Sent Events.
+
+    The job only updates counters while it works. The stream samples them at a fixed interval and sends an event
+    when something changed, so the number of events does not grow with the number of elements:
+    - stage: the job entered a stage, with the seconds spent in the previous one and the details known so far
+             (e.g. element totals per type once parsing completed)
+    - progress: done and total of the stage, throughput since the stage started, throughput since the last event
+                and the estimated seconds left
+    - done, failed, cancelled: the final status, after which the stream ends
+    """
+    MEDIA_TYPE = "text/event-stream"
+    HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    # Seconds without events after which a comment is sent to keep proxies from closing the connection.
+    KEEPALIVE_SECONDS = 15.0
+
+    def __init__(self, job: Job, interval: float = JOB_EVENT_INTERVAL_SECONDS,
+                 is_disconnected: Union[Callable[[], Awaitable[bool]], None] = None):
+        """
+        Initialize a new JobEventStream object.
+
+        :param job: The observed job.
+        :param interval: Minimum seconds between two samples of the job.
+        :param is_disconnected: Returns True once the client went away, e.g. Request.is_disconnected.
+        """
+        self.job = job
+        self.interval = interval
+        self.is_disconnected = is_disconnected
+
+    @staticmethod
+    def format(event: str, data: dict, event_id: Union[int, None] = None) -> str:
+        lines = [f"event: {event}"]
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        # Encoded like the other responses, so details holding e.g. NumPy scalars do not break the stream.
+        lines.append(f"data: {JsonEncoder.dumps(data).decode('utf-8')}")
+        return "\n".join(lines) + "\n\n"
+
+    async def iter_events(self) -> AsyncIterator[str]:
+        job = self.job
+        revision = None
+        stage = None
+        stage_started_at = None
+        last_done = None
+        last_time = time.monotonic()
+        last_sent = last_time
+        while True:
+            finished = job.finished
+            if job.revision != revision:
+                revision = job.revision
+                now = time.monotonic()
+                if job.stage != stage:
+                    yield self.format("stage", {
+                        "stage": job.stage,
+                        "previous": stage,
+                        "previous_seconds": job.stage_started_at - stage_started_at
+                        if stage_started_at is not None and job.stage_started_at is not None else None,
+                        "details": job.details,
+                    }, revision)
+                    stage = job.stage
+                    stage_started_at = job.stage_started_at
+                    last_done = None
+                progress = job.progress()
+                # The first sample of a stage has nothing to compare to.
+                progress["recent_rate"] = (progress["done"] - last_done) / (now - last_time) \
+                    if last_done is not None and now > last_time else None
+                yield self.format("progress", progress, revision)
+                last_done = progress["done"]
+                last_time = last_sent = now
+
+            if finished:
+                yield self.format(job.state, job.to_dict(), revision)
+                return
+            if time.monotonic() - last_sent >= JobEventStream.KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            if self.is_disconnected is not None and await self.is_disconnected():
+                return
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,291 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, List, Union
+
+from src.config import JOB_WORKERS, JOB_QUEUE_LIMIT, JOB_RESULT_TTL_SECONDS
+from src.server_utils.method_loggers import Logger
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job function once the job was cancelled.
+    """
+
+
+class QueueFull(Exception):
+    """
+    Raised on submit when the queue holds its limit of pending jobs.
+    """
+
+
+class QueueClosed(Exception):
+    """
+    Raised on submit after the queue was shut down.
+    """
+
+
+class Job:
+    """
+    A unit of heavy work run by the JobQueue, with its progress and outcome.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, kind: str, func: Callable[['Job'], Any], params: Union[dict, None] = None,
+                 cleanup: Union[Callable[[], None], None] = None):
+        """
+        Initialize a new Job object.
+
+        :param kind: Name of the operation. (e.g. "geometry")
+        :param func: Called with the job on a worker thread. Its return value becomes the result.
+        :param params: Request parameters, reported with the status.
+        :param cleanup: Called once when the job finishes in any state, or is cancelled before it started.
+                        (e.g. to delete the uploaded file)
+        """
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.func = func
+        self.params = params or {}
+        self.cleanup = cleanup
+        self.cleanup_lock = threading.Lock()
+        # Guards the move out of QUEUED, which either a worker starting the job or a cancellation makes.
+        self.state_lock = threading.Lock()
+        self.state = Job.QUEUED
+        self.stage = Job.QUEUED
+        self.stage_started_at = None
+        self.done = 0
+        self.total = None
+        self.details = {}
+        # Incremented on every report, so observers can tell whether anything changed.
+        self.revision = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (Job.DONE, Job.FAILED, Job.CANCELLED)
+
+    def report(self, stage: Union[str, None] = None, done: Union[int, None] = None, total: Union[int, None] = None,
+               **details) -> None:
+        """
+        Update the progress of the job. Raises JobCancelled if the job was cancelled meanwhile,
+        so job functions stop at their next report.
+        Called once per element, so it only assigns counters.
+
+        :param stage: Name of the current step. Entering a stage resets done and total.
+        :param done: Units of work done in the stage.
+        :param total: Units of work of the stage.
+        :param details: Facts about the job learned so far (e.g. element counts per type), kept across stages.
+        """
+        if stage is not None and stage != self.stage:
+            self.set_stage(stage)
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if details:
+            self.details.update(details)
+        self.revision += 1
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def set_stage(self, stage: str) -> None:
+        self.stage = stage
+        self.stage_started_at = time.time()
+        self.done = 0
+        self.total = None
+        self.revision += 1
+
+    def progress(self) -> dict:
+        """
+        Progress of the current stage, with the throughput in units per second since the stage started
+        and the estimated seconds left at that rate.
+        """
+        rate = None
+        eta_seconds = None
+        if self.stage_started_at is not None and self.done:
+            elapsed = (self.finished_at or time.time()) - self.stage_started_at
+            if elapsed > 0:
+                rate = self.done / elapsed
+                if self.total is not None:
+                    eta_seconds = max(self.total - self.done, 0) / rate
+        return {"stage": self.stage, "done": self.done, "total": self.total, "rate": rate, "eta_seconds": eta_seconds}
+
+    def cancel(self) -> bool:
+        """
+        Request cancellation. Queued jobs are cancelled at once and never start, running jobs stop at their next report.
+
+        :return: False if the job already finished.
+        """
+        with self.state_lock:
+            if self.finished:
+                return False
+            self.cancel_event.set()
+            if self.state != Job.QUEUED:
+                return True
+            self.finished_at = time.time()
+            self.state = Job.CANCELLED
+            self.set_stage(Job.CANCELLED)
+        self.release()
+        return True
+
+    def release(self) -> None:
+        """
+        Run the cleanup of the job, once.
+        """
+        with self.cleanup_lock:
+            cleanup, self.cleanup = self.cleanup, None
+        if cleanup is None:
+            return
+        try:
+            cleanup()
+        except Exception as e:
+            Logger.log_error(f"Job {self.job_id} ({self.kind}) cleanup failed: {e}")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "progress": self.progress(),
+            "details": self.details,
+            "result": self.result if self.state == Job.DONE else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    In-process job queue served by a fixed number of worker threads.
+    Submitting beyond the pending limit fails instead of queueing without bound, so callers can push back on clients.
+    Finished jobs are kept for their result until the TTL passes.
+    """
+
+    def __init__(self, workers: int, max_pending: int, result_ttl_seconds: float):
+        """
+        Initialize a new JobQueue object. Worker threads start with the first submitted job.
+
+        :param workers: Number of jobs run at the same time.
+        :param max_pending: Number of jobs allowed to wait for a worker.
+        :param result_ttl_seconds: Seconds a finished job is kept.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl_seconds = result_ttl_seconds
+        self.pending: "queue.Queue[Union[Job, None]]" = queue.Queue(maxsize=max_pending)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.threads: List[threading.Thread] = []
+        self.closed = False
+        self.lock = threading.RLock()
+
+    def submit(self, job: Job) -> Job:
+        """
+        Queue a job.
+
+        :raises QueueFull: The pending limit is reached.
+        :raises QueueClosed: The queue was shut down.
+        """
+        with self.lock:
+            if self.closed:
+                raise QueueClosed()
+            self.expire()
+            self.start_workers()
+            try:
+                self.pending.put_nowait(job)
+            except queue.Full:
+                raise QueueFull()
+            self.jobs[job.job_id] = job
+            Logger.log_info(f"Job {job.job_id} ({job.kind}) queued, {self.pending.qsize()} pending")
+            return job
+
+    def has_capacity(self) -> bool:
+        return not self.closed and not self.pending.full()
+
+    def get(self, job_id: str) -> Union[Job, None]:
+        with self.lock:
+            self.expire()
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self.lock:
+            self.expire()
+            return list(self.jobs.values())
+
+    def start_workers(self) -> None:
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self.work, name=f"job-worker-{len(self.threads)}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def work(self) -> None:
+        while True:
+            job = self.pending.get()
+            if job is None:
+                break
+            self.run(job)
+
+    @staticmethod
+    def run(job: Job) -> None:
+        with job.state_lock:
+            # Cancelled while it was queued.
+            if job.finished:
+                return
+            job.state = Job.RUNNING
+            job.started_at = time.time()
+
+        try:
+            job.result = job.func(job)
+            state = Job.DONE
+        except JobCancelled:
+            state = Job.CANCELLED
+        except Exception as e:
+            Logger.log_error(f"Job {job.job_id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            state = Job.FAILED
+        finally:
+            job.release()
+        job.finished_at = time.time()
+        job.state = state
+        job.revision += 1
+        Logger.log_info(f"Job {job.job_id} ({job.kind}) {job.state} in {job.finished_at - job.started_at:.2f}s")
+
+    def expire(self) -> None:
+        """
+        Drop finished jobs older than the TTL.
+        """
+        with self.lock:
+            deadline = time.time() - self.result_ttl_seconds
+            for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < deadline]:
+                del self.jobs[job_id]
+
+    def shutdown(self) -> None:
+        """
+        Refuse new jobs, cancel every unfinished job and let the workers exit.
+        """
+        with self.lock:
+            self.closed = True
+            for job in self.jobs.values():
+                job.cancel()
+            for _ in self.threads:
+                try:
+                    self.pending.put_nowait(None)
+                except queue.Full:
+                    break
+
+
+job_queue = JobQueue(JOB_WORKERS, JOB_QUEUE_LIMIT, JOB_RESULT_TTL_SECONDS)
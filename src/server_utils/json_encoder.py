@@ -0,0 +1,70 @@
+import json
+from typing import Any, Callable, Dict, Union
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from src.config import JSON_ENCODER
+from src.server_utils.method_loggers import Logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonEncoder:
+    """
+    Compact JSON encoding of response content, written once to bytes.
+    orjson is used when installed and writes NumPy arrays directly. Otherwise the standard library encoder is used,
+    with arrays converted to lists. Values neither encoder knows (e.g. IFC entities) are written as their str.
+    """
+
+    @staticmethod
+    def default(value: Any) -> Any:
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        return str(value)
+
+    @staticmethod
+    def encoders() -> Dict[str, Callable[[Any], bytes]]:
+        """
+        Available encoders, in preference order.
+        """
+        encoders = {}
+        if orjson is not None:
+            options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            encoders["orjson"] = lambda content: orjson.dumps(content, default=JsonEncoder.default, option=options)
+        encoders["json"] = lambda content: json.dumps(content, separators=(",", ":"), ensure_ascii=False,
+                                                      default=JsonEncoder.default).encode("utf-8")
+        return encoders
+
+    @staticmethod
+    def encoder(name: Union[str, None] = None) -> Callable[[Any], bytes]:
+        """
+        :param name: "orjson", "json", or "auto" for the first available. Defaults to JSON_ENCODER.
+        """
+        encoders = JsonEncoder.encoders()
+        name = name or JSON_ENCODER
+        if name == "auto":
+            return next(iter(encoders.values()))
+        encoder = encoders.get(name)
+        if encoder is None:
+            Logger.log_error(f"JSON encoder {name} is not available, using {next(iter(encoders))}")
+            return next(iter(encoders.values()))
+        return encoder
+
+    @staticmethod
+    def dumps(content: Any, encoder: Union[str, None] = None) -> bytes:
+        return JsonEncoder.encoder(encoder)(content)
+
+
+class EncodedJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with JsonEncoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return JsonEncoder.dumps(content)
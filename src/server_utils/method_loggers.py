@@ -1,6 +1,8 @@
 import logging
+import time
 from functools import wraps
 from src.config import ENVIRONMENT
+from src.server_utils.metrics import METHOD_DURATION
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,12 +14,17 @@ class Logger:
         @wraps(func)
         def wrapper(*args, **kwargs):
             if ENVIRONMENT == "dev":
-                args_info = [(type(arg).__name__, arg) for arg in args]
+                # Type names only: the repr of an argument can be a whole model.
+                args_info = [type(arg).__name__ for arg in args]
                 kwargs_info = {k: type(v).__name__ for k, v in kwargs.items()}
                 logger.info(f"Executing {func.__name__} with arguments types {args_info} and kwargs types {kwargs_info}")
-            result = func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                METHOD_DURATION.observe(time.perf_counter() - start, method=func.__qualname__)
             if ENVIRONMENT == "dev":
-                logger.info(f"{func.__name__} returned type {type(result).__name__}")
+                logger.info(f"{func.__name__} returned type {type(result).__name__} in {time.perf_counter() - start:.3f}s")
             return result
         return wrapper
 
@@ -0,0 +1,281 @@
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """
+    A named family of samples, one per combination of label values. Updates are thread safe.
+    """
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+
+    def label_values(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def format_labels(self, values: LabelValues, extra: Union[Tuple[str, str], None] = None) -> str:
+        pairs = list(zip(self.label_names, values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def samples(self) -> Iterator[str]:
+        return iter(())
+
+    def render(self) -> str:
+        documentation = self.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        lines = [f"# HELP {self.name} {documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        # A metric without labels has a single sample, reported from the start.
+        self.values: Dict[LabelValues, float] = {} if self.label_names else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self.lock:
+            values = list(self.values.items())
+        for key, value in values:
+            yield f"{self.name}{self.format_labels(key)} {format_value(value)}"
+
+
+class Gauge(Metric):
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        # A metric without labels has a single sample, reported from the start.
+        self.values: Dict[LabelValues, float] = {} if self.label_names else {(): 0.0}
+
+    def set(self, value: float, **labels) -> None:
+        with self.lock:
+            self.values[self.label_values(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self.lock:
+            values = list(self.values.items())
+        for key, value in values:
+            yield f"{self.name}{self.format_labels(key)} {format_value(value)}"
+
+
+class Histogram(Metric):
+    """
+    Observations counted into cumulative buckets, with their sum and count.
+    """
+    TYPE = "histogram"
+    # Seconds, from a cached response to parsing a large model.
+    DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+    # Bytes, 1 KiB to 4 GiB in steps of 4.
+    SIZE_BUCKETS = tuple(float(1024 * 4 ** exponent) for exponent in range(12))
+    # Elements of a request.
+    COUNT_BUCKETS = (1.0, 10.0, 100.0, 1000.0, 10000.0, 100000.0, 1000000.0)
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        if not self.label_names:
+            self.values[()] = ([0] * (len(self.buckets) + 1), [0.0])
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Bucket counts are kept per bucket and made cumulative when rendered.
+                state = self.values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            state[0][index] += 1
+            state[1][0] += value
+
+    def samples(self) -> Iterator[str]:
+        with self.lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self.values.items()]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{self.format_labels(key, ('le', format_value(bound)))} {cumulative}"
+            yield f"{self.name}_sum{self.format_labels(key)} {format_value(total)}"
+            yield f"{self.name}_count{self.format_labels(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    In-process metrics of the server, rendered in the Prometheus text exposition format.
+    Updating a metric takes a lock and a dictionary lookup, so instrumentation stays on in production.
+    """
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = Histogram.DURATION_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_DURATION = metrics.histogram("ifc_stage_duration_seconds", "Duration of a processing stage.", ["stage"])
+STAGE_FAILURES = metrics.counter("ifc_stage_failures_total", "Processing stages that raised an error.", ["stage"])
+METHOD_DURATION = metrics.histogram("ifc_method_duration_seconds", "Duration of methods decorated with Logger.log_method.", ["method"])
+UPLOAD_BYTES = metrics.histogram("ifc_upload_bytes", "Size of uploaded IFC files.", buckets=Histogram.SIZE_BUCKETS)
+ELEMENTS_TESSELLATED = metrics.counter("ifc_elements_tessellated_total", "Elements tessellated into meshes.")
+ELEMENTS_FAILED = metrics.counter("ifc_elements_failed_total", "Elements whose tessellation failed.")
+REQUEST_ELEMENTS = metrics.histogram("ifc_request_elements", "Elements tessellated by one request or job.", buckets=Histogram.COUNT_BUCKETS)
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+HTTP_DURATION = metrics.histogram("http_request_duration_seconds", "Time from the request to the last byte of the response.", ["method", "route"])
+HTTP_REQUEST_BYTES = metrics.counter("http_request_bytes_total", "Bytes of request bodies.", ["route"])
+HTTP_RESPONSE_BYTES = metrics.counter("http_response_bytes_total", "Bytes of response bodies, as sent.", ["route"])
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Requests being served.")
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time a block as a processing stage, counting it as failed if it raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_FAILURES.inc(stage=stage)
+        raise
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+
+
+def timed(stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    func, timed as a processing stage on every call. For handing to run_blocking.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(stage):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests, body bytes in and out and their durations per route.
+    Writing the response body is timed as the "response_write" stage, from the first to the last body message.
+    Routes are labelled by their path template, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.route_paths = None
+
+    def route_of(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self.route_paths is None:
+            application = scope.get("app")
+            routes = getattr(application, "routes", []) if application is not None else []
+            self.route_paths = {getattr(route, "endpoint", None): route.path for route in routes if hasattr(route, "path")}
+        return self.route_paths.get(endpoint, getattr(endpoint, "__name__", "unknown"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        received = 0
+        sent = 0
+        status = 500
+        write_started = None
+
+        async def receive_counted():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def send_counted(message):
+            nonlocal sent, status, write_started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                write_started = time.perf_counter()
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            end = time.perf_counter()
+            route = self.route_of(scope)
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_DURATION.observe(end - start, method=method, route=route)
+            HTTP_REQUEST_BYTES.inc(received, route=route)
+            HTTP_RESPONSE_BYTES.inc(sent, route=route)
+            if write_started is not None:
+                STAGE_DURATION.observe(end - write_started, stage="response_write")
@@ -0,0 +1,195 @@
+import mmap
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Set, Tuple, Union
+
+import ifcopenshell
+import numpy as np
+
+from src.config import MODEL_CACHE_BUDGET_MB, MODEL_MEMORY_FACTOR
+from src.server_utils.method_loggers import Logger
+
+
+class CachedModel:
+    """
+    Loaded IFC file and the payloads derived from it, stored under the SHA-256 of the upload.
+    """
+
+    SCALAR_TYPES = frozenset((bool, int, float, complex))
+
+    def __init__(self, key: str, ifc_file: ifcopenshell.file, file_size: int):
+        """
+        Initialize a new CachedModel object.
+
+        :param key: SHA-256 hex digest of the uploaded file.
+        :param ifc_file: The loaded IFC file.
+        :param file_size: Size of the uploaded file in bytes.
+        """
+        self.key = key
+        self.ifc_file = ifc_file
+        self.file_size = file_size
+        self.payloads: Dict[str, Tuple[Any, int]] = {}
+
+    def get_payload(self, name: str) -> Any:
+        """
+        Get a derived payload. (categories, geometry, ...)
+
+        :param name: Name of the payload.
+        :return: The payload, or None if it was not computed yet.
+        """
+        item = self.payloads.get(name)
+        return item[0] if item is not None else None
+
+    def model_size(self) -> int:
+        """
+        Estimated memory of the loaded file. ifcopenshell does not report it, so it is scaled from the file size.
+        """
+        return int(self.file_size * MODEL_MEMORY_FACTOR)
+
+    def size(self) -> int:
+        """
+        Estimated memory of the model and every payload in bytes.
+        """
+        return self.model_size() + sum(size for _, size in self.payloads.values())
+
+    @staticmethod
+    def estimate_size(payload: Any) -> int:
+        """
+        Estimated memory of a payload in bytes, following containers and the attributes of objects.
+        (meshes, spatial indexes, graphs, ...) Every object is counted once, so arrays shared between meshes
+        are not counted per element. Memory mapped arrays are paged in from disk by the OS and are not counted.
+        """
+        total = 0
+        seen: Set[int] = set()
+        stack = [payload]
+        while stack:
+            item = stack.pop()
+            if item is None or type(item) in CachedModel.SCALAR_TYPES:
+                total += sys.getsizeof(item)
+                continue
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+
+            if isinstance(item, np.ndarray):
+                if not CachedModel.is_memory_mapped(item):
+                    total += item.nbytes
+            elif isinstance(item, (bytes, bytearray, str)):
+                total += sys.getsizeof(item)
+            elif isinstance(item, memoryview):
+                total += item.nbytes
+            elif isinstance(item, dict):
+                total += sys.getsizeof(item)
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                total += sys.getsizeof(item)
+                stack.extend(item)
+            elif isinstance(item, (ifcopenshell.file, ifcopenshell.entity_instance)):
+                # Owned by the loaded file, which is counted by model_size.
+                continue
+            elif hasattr(item, "__dict__"):
+                attributes = vars(item)
+                total += sys.getsizeof(item) + sys.getsizeof(attributes)
+                stack.extend(attributes.values())
+            else:
+                total += sys.getsizeof(item)
+        return total
+
+    @staticmethod
+    def is_memory_mapped(array: np.ndarray) -> bool:
+        """
+        Whether the array, or the array it is a view of, is backed by a memory mapped file.
+        """
+        while array is not None:
+            if isinstance(array, (np.memmap, mmap.mmap)):
+                return True
+            array = getattr(array, "base", None)
+        return False
+
+
+class ModelCache:
+    """
+    In-process LRU cache of parsed models keyed by the SHA-256 of the uploaded bytes.
+    Entries are evicted from the least recently used side once the memory budget is exceeded.
+    """
+
+    def __init__(self, budget_bytes: int):
+        """
+        Initialize a new ModelCache object.
+
+        :param budget_bytes: Memory budget of all entries in bytes.
+        """
+        self.budget_bytes = budget_bytes
+        self.entries: "OrderedDict[str, CachedModel]" = OrderedDict()
+        self.lock = threading.RLock()
+
+    def get(self, key: str) -> Union[CachedModel, None]:
+        """
+        Get a cached model and mark it as recently used.
+
+        :param key: SHA-256 hex digest of the uploaded file.
+        :return: The cached model, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, ifc_file: ifcopenshell.file, file_size: int) -> CachedModel:
+        """
+        Cache a loaded model.
+
+        :param key: SHA-256 hex digest of the uploaded file.
+        :param ifc_file: The loaded IFC file.
+        :param file_size: Size of the uploaded file in bytes.
+        :return: The cached model.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = CachedModel(key, ifc_file, file_size)
+                self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.evict()
+            return entry
+
+    def set_payload(self, entry: CachedModel, name: str, payload: Any) -> None:
+        """
+        Store a payload derived from a model. Models that were already evicted still keep the payload
+        for the sessions that hold them.
+
+        :param entry: The model the payload was derived from.
+        :param name: Name of the payload.
+        :param payload: The payload to store.
+        """
+        size = CachedModel.estimate_size(payload)
+        with self.lock:
+            entry.payloads[name] = (payload, size)
+            if entry.key in self.entries:
+                self.evict()
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def size(self) -> int:
+        with self.lock:
+            return sum(entry.size() for entry in self.entries.values())
+
+    def evict(self) -> None:
+        """
+        Drop least recently used entries until the cache fits its budget.
+        The most recently used entry is always kept, even if it alone exceeds the budget.
+        """
+        with self.lock:
+            total = self.size()
+            while total > self.budget_bytes and len(self.entries) > 1:
+                key, entry = self.entries.popitem(last=False)
+                total -= entry.size()
+                Logger.log_info(f"Model cache evicted {key}")
+
+
+model_cache = ModelCache(MODEL_CACHE_BUDGET_MB * 1024 ** 2)
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Union
+
+from src.config import MODEL_IDLE_TTL_SECONDS, MAX_RESIDENT_MODELS
+from src.server_utils.method_loggers import Logger
+from src.server_utils.model_cache import CachedModel
+
+
+class ModelSession:
+    """
+    A model kept resident for follow-up requests by model_id.
+    """
+
+    def __init__(self, model_id: str, cached_model: CachedModel, file_name: str):
+        """
+        Initialize a new ModelSession object.
+
+        :param model_id: Id handed out to the client. Equal to the SHA-256 of the upload.
+        :param cached_model: The parsed model and its payloads.
+        :param file_name: Original name of the uploaded file.
+        """
+        self.model_id = model_id
+        self.cached_model = cached_model
+        self.file_name = file_name
+        self.created_at = time.time()
+        self.last_access = self.created_at
+
+    def touch(self) -> None:
+        self.last_access = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "model_id": self.model_id,
+            "file_name": self.file_name,
+            "file_size": self.cached_model.file_size,
+            "schema": self.cached_model.ifc_file.schema,
+            "created_at": self.created_at,
+            "last_access": self.last_access,
+        }
+
+
+class ModelRegistry:
+    """
+    Registry of resident models. Sessions idle for longer than the TTL are dropped, and the least recently used
+    sessions are dropped once more than `max_models` are resident.
+    """
+
+    def __init__(self, idle_ttl_seconds: float, max_models: int):
+        """
+        Initialize a new ModelRegistry object.
+
+        :param idle_ttl_seconds: Seconds without access after which a session expires.
+        :param max_models: Maximum number of resident sessions.
+        """
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_models = max_models
+        self.sessions: "OrderedDict[str, ModelSession]" = OrderedDict()
+        self.lock = threading.RLock()
+
+    def register(self, cached_model: CachedModel, file_name: str) -> ModelSession:
+        """
+        Register a parsed model. Registering identical bytes again returns the existing session.
+
+        :param cached_model: The parsed model.
+        :param file_name: Original name of the uploaded file.
+        :return: The session of the model.
+        """
+        with self.lock:
+            self.expire()
+            session = self.sessions.get(cached_model.key)
+            if session is None:
+                session = ModelSession(cached_model.key, cached_model, file_name)
+                self.sessions[session.model_id] = session
+            session.touch()
+            self.sessions.move_to_end(session.model_id)
+
+            while len(self.sessions) > self.max_models:
+                model_id, _ = self.sessions.popitem(last=False)
+                Logger.log_info(f"Model registry evicted {model_id}")
+            return session
+
+    def get(self, model_id: str) -> Union[ModelSession, None]:
+        """
+        Get a resident session and refresh its idle timer.
+
+        :param model_id: Id returned on upload.
+        :return: The session, or None if it is unknown or expired.
+        """
+        with self.lock:
+            self.expire()
+            session = self.sessions.get(model_id)
+            if session is not None:
+                session.touch()
+                self.sessions.move_to_end(model_id)
+            return session
+
+    def remove(self, model_id: str) -> bool:
+        with self.lock:
+            return self.sessions.pop(model_id, None) is not None
+
+    def list(self) -> List[ModelSession]:
+        with self.lock:
+            self.expire()
+            return list(self.sessions.values())
+
+    def expire(self) -> None:
+        """
+        Drop sessions whose idle time exceeded the TTL.
+        """
+        with self.lock:
+            deadline = time.time() - self.idle_ttl_seconds
+            # Sessions are ordered by access, so expired ones are at the front.
+            while self.sessions:
+                model_id, session = next(iter(self.sessions.items()))
+                if session.last_access >= deadline:
+                    break
+                self.sessions.popitem(last=False)
+                Logger.log_info(f"Model registry expired {model_id}")
+
+
+model_registry = ModelRegistry(MODEL_IDLE_TTL_SECONDS, MAX_RESIDENT_MODELS)
@@ -0,0 +1,52 @@
+import os
+
+# src.config requires a port, even though no server is started.
+os.environ.setdefault("SERVER_PORT", "8000")
+
+import pytest
+
+from benchmarks.model_generator import ModelSize, SyntheticModelGenerator
+
+
+@pytest.fixture(scope="session")
+def synthetic_path(tmp_path_factory) -> str:
+    """
+    A small synthetic model with every element kind the generator writes, on disk.
+    """
+    path = tmp_path_factory.mktemp("models") / "synthetic.ifc"
+    return SyntheticModelGenerator(ModelSize(slabs=6, walls=6, columns=6, mapped=6, storeys=2), seed=1).write(str(path))
+
+
+@pytest.fixture
+def synthetic_file(synthetic_path):
+    """
+    The synthetic model, opened for each test so tests may modify it.
+    """
+    import ifcopenshell
+    return ifcopenshell.open(synthetic_path)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """
+    Test client of the app, with uploads and the geometry store kept in a temporary directory.
+    The lifespan is not entered, as it shuts down the shared executors.
+    """
+    from fastapi.testclient import TestClient
+    import src.main
+    from src.server_utils.geometry_store import geometry_store
+
+    monkeypatch.setattr(src.main, "UPLOAD_DIRECTORY", str(tmp_path / "uploads"))
+    monkeypatch.setattr(geometry_store, "root", str(tmp_path / "geometry_store"))
+    return TestClient(src.main.app)
+
+
+@pytest.fixture
+def model_id(client, synthetic_path) -> str:
+    """
+    Session id of the synthetic model, uploaded through /models.
+    """
+    with open(synthetic_path, "rb") as model_file:
+        response = client.post("/models", files={"file": ("synthetic.ifc", model_file)})
+    assert response.status_code == 200
+    return response.json()["model_id"]
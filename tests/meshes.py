@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.model.model_mesh import ElementMesh
+
+# Corners of the unit cube, and its faces as outward wound triangles.
+CUBE_CORNERS = np.array([[x, y, z] for z in (0.0, 1.0) for y in (0.0, 1.0) for x in (0.0, 1.0)])
+CUBE_QUADS = [(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)]
+
+
+def box_mesh(size=(1.0, 1.0, 1.0), matrix=None, element_id=1, element_type="IfcColumn", split_faces=True) -> ElementMesh:
+    """
+    Closed box with a corner at the local origin, shaped like tessellated IFC geometry.
+
+    :param size: Extent along x, y and z.
+    :param matrix: Placement. Defaults to the identity.
+    :param split_faces: Give every face its own vertices and normals, as ifcopenshell.geom does.
+                        Otherwise the 8 corners are shared and have no normals.
+    """
+    corners = CUBE_CORNERS * np.asarray(size, dtype=np.float64)
+    if split_faces:
+        vertices, normals, faces = [], [], []
+        for quad in CUBE_QUADS:
+            a, b, c, d = (corners[index] for index in quad)
+            normal = np.cross(b - a, d - a)
+            normal /= np.linalg.norm(normal)
+            start = len(vertices)
+            vertices.extend([a, b, c, d])
+            normals.extend([normal] * 4)
+            faces.extend([(start, start + 1, start + 2), (start, start + 2, start + 3)])
+        vertices, normals = np.array(vertices), np.array(normals)
+    else:
+        vertices, normals = corners, np.empty((0, 3))
+        faces = [triangle for a, b, c, d in CUBE_QUADS for triangle in ((a, b, c), (a, c, d))]
+    faces = np.array(faces, dtype=np.int64)
+    edges = np.unique(np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1), axis=0)
+    return ElementMesh(element_id, element_type, f"guid-{element_id}", "IfcShapeRepresentation", f"box-{element_id}",
+                       vertices, faces, normals, edges, np.eye(4) if matrix is None else np.asarray(matrix, dtype=np.float64))
+
+
+def placement(translation=(0.0, 0.0, 0.0), rotation=None) -> np.ndarray:
+    matrix = np.eye(4)
+    if rotation is not None:
+        matrix[0:3, 0:3] = rotation
+    matrix[0:3, 3] = translation
+    return matrix
+
+
+def rotation_z(angle: float) -> np.ndarray:
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.array([[cos, -sin, 0.0], [sin, cos, 0.0], [0.0, 0.0, 1.0]])
+
+
+def rotation_x(angle: float) -> np.ndarray:
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.array([[1.0, 0.0, 0.0], [0.0, cos, -sin], [0.0, sin, cos]])
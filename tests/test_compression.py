@@ -0,0 +1,90 @@
+import gzip
+import types
+
+import pytest
+
+from src.server_utils import compression
+from src.server_utils.compression import ResponseCompressor
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    monkeypatch.setattr(compression, "zstandard", None)
+
+
+@pytest.fixture
+def every_backend(monkeypatch):
+    """
+    Stand-ins for the optional brotli and zstandard packages, marking bodies with their encoding.
+    """
+    zstd_compressor = types.SimpleNamespace(compress=lambda body: b"zstd:" + body)
+    monkeypatch.setattr(compression, "brotli", types.SimpleNamespace(compress=lambda body, quality: b"br:" + body))
+    monkeypatch.setattr(compression, "zstandard", types.SimpleNamespace(ZstdCompressor=lambda level: zstd_compressor))
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("deflate", None),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("*, gzip;q=0", None),
+    ("identity;q=0, gzip", "gzip"),
+    ("identity;q=0", None),
+    ("br, zstd", None),
+    ("br, gzip;q=0.5", "gzip"),
+    ("gzip;q=invalid", None),
+])
+def test_negotiate_with_gzip_only(gzip_only, accept_encoding, expected):
+    assert ResponseCompressor.negotiate(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip, br, zstd", "zstd"),
+    ("gzip, br;q=0.9, zstd;q=0.8", "gzip"),
+    ("br;q=0.5, gzip;q=0.5", "br"),
+    ("*", "zstd"),
+    ("*;q=0.1, gzip;q=0.2", "gzip"),
+    ("zstd;q=0, *", "br"),
+    (" gzip ; q=0.3 , br ; q=0.4 ", "br"),
+])
+def test_negotiate_prefers_q_values_then_server_order(every_backend, accept_encoding, expected):
+    assert ResponseCompressor.negotiate(accept_encoding) == expected
+
+
+def test_compress(every_backend):
+    body = b"x" * 4096
+
+    assert gzip.decompress(ResponseCompressor.compress(body, "gzip")) == body
+    assert ResponseCompressor.compress(body, "br") == b"br:" + body
+    assert ResponseCompressor.compress(body, "zstd") == b"zstd:" + body
+
+
+def test_compressed_payloads_are_cached(client, model_id, gzip_only):
+    from src.server_utils.model_registry import model_registry
+    cached_model = model_registry.get(model_id).cached_model
+
+    plain = client.get(f"/models/{model_id}/geometry?types=IfcWall", headers={"accept-encoding": "identity"})
+    first = client.get(f"/models/{model_id}/geometry?types=IfcWall", headers={"accept-encoding": "gzip"})
+    compressed = cached_model.get_payload("geometry:IfcWall:gzip")
+    second = client.get(f"/models/{model_id}/geometry?types=IfcWall", headers={"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert compressed is not None
+    assert gzip.decompress(compressed) == plain.content
+    assert first.content == second.content == plain.content
+    assert cached_model.get_payload("geometry:IfcWall:gzip") is compressed
+
+
+def test_small_bodies_are_not_compressed(client, model_id, gzip_only):
+    response = client.get(f"/models/{model_id}/query?point=0,0,0&types=IfcColumn", headers={"accept-encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert len(response.content) < ResponseCompressor.MIN_SIZE
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,86 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.server_utils.geometry_encoders import GeometryBinaryEncoder, GeometryNdjsonEncoder
+
+
+def decode_binary(payload: bytes) -> tuple:
+    """
+    Read the binary geometry format the way a client does.
+
+    :return: (manifest, {buffer name: (items, item size) array})
+    """
+    assert payload[:4] == GeometryBinaryEncoder.MAGIC
+    version, manifest_length = struct.unpack_from("<II", payload, 4)
+    assert version == GeometryBinaryEncoder.VERSION
+    manifest = json.loads(payload[12:12 + manifest_length])
+    start = 12 + manifest_length
+    buffers = {}
+    for name, descriptor in manifest["buffers"].items():
+        offset = start + descriptor["byteOffset"]
+        data = np.frombuffer(payload[offset:offset + descriptor["byteLength"]], dtype=descriptor["componentType"])
+        buffers[name] = data.reshape(-1, descriptor["itemSize"])
+    return manifest, buffers
+
+
+def element_array(buffers: dict, element: dict, name: str) -> np.ndarray:
+    offset, count = element[name]
+    return buffers[name][offset:offset + count]
+
+
+@pytest.fixture
+def meshes(synthetic_file):
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    return IfcUtilsFile.get_element_meshes(synthetic_file, type_filter)
+
+
+@pytest.mark.parametrize("yz_swap", [True, False])
+def test_binary_round_trip(meshes, yz_swap):
+    manifest, buffers = decode_binary(GeometryBinaryEncoder.encode(meshes, yz_swap=yz_swap))
+
+    assert manifest["quantized"] is False
+    assert [element["id"] for element in manifest["elements"]] == [mesh.element_id for mesh in meshes]
+    axes = [0, 2, 1] if yz_swap else [0, 1, 2]
+    for element, mesh in zip(manifest["elements"], meshes):
+        assert element["type"] == mesh.element_type
+        np.testing.assert_allclose(element_array(buffers, element, "vertices"), mesh.vertices[:, axes], atol=1e-5)
+        np.testing.assert_array_equal(element_array(buffers, element, "faces"), mesh.faces)
+        np.testing.assert_allclose(element_array(buffers, element, "normals"), mesh.normals, atol=1e-6)
+        np.testing.assert_array_equal(element_array(buffers, element, "edges"), mesh.edges)
+        np.testing.assert_allclose(element["location"], mesh.location()[axes])
+
+
+def test_empty_payload_decodes():
+    manifest, buffers = decode_binary(GeometryBinaryEncoder.encode([]))
+
+    assert manifest["elements"] == []
+    assert all(len(array) == 0 for array in buffers.values())
+
+
+def test_ndjson_lines_match_json_elements(meshes):
+    encoded = []
+    lines = list(GeometryNdjsonEncoder.iter_lines(meshes, on_mesh=encoded.append))
+
+    assert all(line.endswith(b"\n") for line in lines)
+    assert encoded == meshes
+    decoded = [json.loads(line) for line in lines]
+    assert decoded == json.loads(json.dumps(IfcUtilsFile.serialize_geometry(meshes, to_json=False)))
+
+
+def test_ndjson_encodes_lazily(meshes):
+    consumed = []
+
+    def produce():
+        for mesh in meshes:
+            consumed.append(mesh)
+            yield mesh
+
+    lines = GeometryNdjsonEncoder.iter_lines(produce())
+    next(lines)
+
+    assert len(consumed) == 1
@@ -0,0 +1,127 @@
+import ifcopenshell.geom
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.ifc_utils.ifc_geometry_engine import IfcGeometryEngine
+
+
+GeometryIterator = ifcopenshell.geom.iterator
+
+
+class CountingIterator:
+    """
+    ifcopenshell.geom.iterator counting the shapes it has handed out.
+    """
+    consumed = 0
+
+    def __init__(self, *args, **kwargs):
+        self.iterator = GeometryIterator(*args, **kwargs)
+
+    def initialize(self):
+        return self.iterator.initialize()
+
+    def get(self):
+        CountingIterator.consumed += 1
+        return self.iterator.get()
+
+    def next(self):
+        return self.iterator.next()
+
+
+class HoldingIterator(CountingIterator):
+    """
+    ifcopenshell.geom.iterator handing out the shape of one element only after `delay` other shapes,
+    as a slow element does in multi-threaded mode.
+    """
+    held_id = None
+    delay = 0
+
+    def initialize(self):
+        if not self.iterator.initialize():
+            return False
+        self.shapes = []
+        while True:
+            self.shapes.append(self.iterator.get())
+            if not self.iterator.next():
+                break
+        held = [shape for shape in self.shapes if shape.id == HoldingIterator.held_id]
+        for shape in held:
+            self.shapes.remove(shape)
+            self.shapes.insert(HoldingIterator.delay, shape)
+        self.position = 0
+        return True
+
+    def get(self):
+        CountingIterator.consumed += 1
+        return self.shapes[self.position]
+
+    def next(self):
+        self.position += 1
+        return self.position < len(self.shapes)
+
+
+def point_representation(ifc_file):
+    context = ifc_file.by_type("IfcGeometricRepresentationSubContext")[0]
+    point = ifc_file.createIfcShapeRepresentation(context, "Body", "Point", [ifc_file.createIfcCartesianPoint((0.0, 0.0, 0.0))])
+    return ifc_file.createIfcProductDefinitionShape(None, None, [point])
+
+
+def test_shapes_follow_element_order(synthetic_file):
+    elements = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn"]).collect(synthetic_file)
+    # Shapes are owned by the iterator, so they are read while it is alive.
+    shapes = [(element.id(), shape.id) for element, shape in IfcGeometryEngine.iterate_shapes(synthetic_file, elements, workers=4)]
+
+    assert shapes == [(element.id(), element.id()) for element in elements]
+
+
+def test_elements_without_representation_are_left_out(synthetic_file):
+    slabs = synthetic_file.by_type("IfcSlab")
+    slabs[0].Representation = None
+
+    shapes = list(IfcGeometryEngine.iterate_shapes(synthetic_file, slabs, workers=1))
+
+    assert [element.id() for element, _ in shapes] == [slab.id() for slab in slabs[1:]]
+
+
+def test_element_without_shape_does_not_hold_back_later_shapes(synthetic_file, monkeypatch):
+    monkeypatch.setattr(IfcGeometryEngine, "PENDING_LIMIT", 2)
+    monkeypatch.setattr(ifcopenshell.geom, "iterator", CountingIterator)
+    CountingIterator.consumed = 0
+    slabs = synthetic_file.by_type("IfcSlab")
+    slabs[0].Representation = point_representation(synthetic_file)
+
+    shapes = IfcGeometryEngine.iterate_shapes(synthetic_file, slabs, workers=1)
+    first_element, first_shape = next(shapes)
+    consumed_before_first = CountingIterator.consumed
+    rest = [(element, shape is None) for element, shape in shapes]
+
+    assert first_element == slabs[1] and first_shape is not None
+    assert consumed_before_first <= IfcGeometryEngine.PENDING_LIMIT + 1
+    assert rest == [(slab, False) for slab in slabs[2:]] + [(slabs[0], True)]
+
+
+def test_late_shape_is_yielded_when_it_arrives(synthetic_file, monkeypatch):
+    monkeypatch.setattr(IfcGeometryEngine, "PENDING_LIMIT", 2)
+    monkeypatch.setattr(ifcopenshell.geom, "iterator", HoldingIterator)
+    slabs = synthetic_file.by_type("IfcSlab")
+    monkeypatch.setattr(HoldingIterator, "held_id", slabs[0].id())
+    monkeypatch.setattr(HoldingIterator, "delay", IfcGeometryEngine.PENDING_LIMIT + 2)
+
+    shapes = [(element.id(), shape.id) for element, shape in IfcGeometryEngine.iterate_shapes(synthetic_file, slabs, workers=4)]
+
+    assert sorted(shapes) == sorted((slab.id(), slab.id()) for slab in slabs)
+    late = shapes.index((slabs[0].id(), slabs[0].id()))
+    assert late > 0
+    assert [element_id for element_id, _ in shapes[:late] + shapes[late + 1:]] == [slab.id() for slab in slabs[1:]]
+
+
+def test_element_without_shape_counts_as_failed_mesh(synthetic_file):
+    slabs = synthetic_file.by_type("IfcSlab")
+    slabs[0].Representation = point_representation(synthetic_file)
+    progress = []
+
+    meshes = IfcUtilsFile.get_element_meshes(synthetic_file, ElementTypeFilter.for_entity("IfcSlab"), workers=1,
+                                             on_progress=lambda done, total: progress.append((done, total)))
+
+    assert [mesh.element_id for mesh in meshes] == [slab.id() for slab in slabs[1:]]
+    assert progress[-1] == (len(slabs), len(slabs))
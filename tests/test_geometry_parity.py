@@ -0,0 +1,56 @@
+import json
+
+import ifcopenshell.geom
+import numpy as np
+import pytest
+
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+
+
+def reference_geometry(ifc_file, entity_name: str) -> list:
+    """
+    /getgeometry as it was before the geometry iterator: one create_shape call per element.
+    Elements are labelled with the requested class, as "IfcSlab" was for slabs.
+    """
+    settings = ifcopenshell.geom.settings()
+    result = []
+    for element in ifc_file.by_type(entity_name):
+        shape = ifcopenshell.geom.create_shape(settings, element)
+        location = np.array(shape.transformation.matrix).reshape(-1, 4)[-1][0:3]
+        vertices = np.array(shape.geometry.verts).reshape(-1, 3)[:, [0, 2, 1]]
+        result.append({
+            "id": element.id(),
+            "type": entity_name,
+            "geometryType": shape.geometry.__class__.__name__,
+            "vertices": vertices,
+            "faces": np.array(shape.geometry.faces).reshape(-1, 3),
+            "normals": np.array(shape.geometry.normals),
+            "edges": np.array(shape.geometry.edges).reshape(-1, 2),
+            "location": [location[0], location[2], location[1]],
+        })
+    return result
+
+
+@pytest.mark.parametrize("entity_name", ["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+def test_geometry_matches_create_shape(synthetic_file, entity_name):
+    expected = reference_geometry(synthetic_file, entity_name)
+    actual = IfcUtilsFile.get_geometry(synthetic_file, entity_name, to_json=False)
+
+    assert [element["id"] for element in actual] == [element["id"] for element in expected]
+    for element, reference in zip(actual, expected):
+        assert element["type"] == reference["type"]
+        assert element["geometryType"] == reference["geometryType"]
+        for name in ("vertices", "faces", "normals", "edges"):
+            assert element[f"{name}_count"] == len(reference[name])
+        np.testing.assert_allclose(element["vertices"], reference["vertices"], atol=1e-6)
+        np.testing.assert_array_equal(element["faces"], reference["faces"])
+        np.testing.assert_allclose(element["normals"], reference["normals"], atol=1e-6)
+        np.testing.assert_array_equal(element["edges"], reference["edges"])
+        np.testing.assert_allclose(element["location"], reference["location"], atol=1e-6)
+
+
+def test_json_body_matches_dictionaries(synthetic_file):
+    geometry = IfcUtilsFile.get_geometry(synthetic_file, "IfcSlab", to_json=False)
+    body = json.loads(IfcUtilsFile.get_geometry(synthetic_file, "IfcSlab", to_json=True))
+
+    assert body == json.loads(json.dumps(geometry))
@@ -0,0 +1,99 @@
+import numpy as np
+
+from src.data_structure.graph import CompactGraph, Graph
+
+
+def components_by_search(nodes: list, edges: list) -> list:
+    """
+    Connected components by depth first search, each sorted, in order of their smallest node.
+    """
+    adjacent = {node: set() for node in nodes}
+    for source, target in edges:
+        adjacent[source].add(target)
+        adjacent[target].add(source)
+    seen = set()
+    components = []
+    for node in sorted(nodes):
+        if node in seen:
+            continue
+        stack, component = [node], []
+        seen.add(node)
+        while stack:
+            current = stack.pop()
+            component.append(current)
+            for neighbour in adjacent[current] - seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+        components.append(sorted(component))
+    return components
+
+
+def graph_of(nodes: list, edges: list, kinds=None) -> CompactGraph:
+    node_array = np.array(sorted(nodes))
+    sources = np.searchsorted(node_array, [source for source, _ in edges])
+    targets = np.searchsorted(node_array, [target for _, target in edges])
+    return CompactGraph.from_edges(node_array, sources, targets, kinds)
+
+
+def test_components_of_a_small_graph():
+    graph = graph_of([1, 2, 3, 4, 5, 6, 7], [(1, 2), (2, 3), (3, 1), (4, 5), (5, 4), (6, 6)])
+
+    assert graph.edge_count == 4
+    assert graph.components() == [[1, 2, 3], [4, 5], [6], [7]]
+    assert graph.neighbours(6) == []
+    assert graph.neighbours(8) == []
+
+
+def test_components_match_depth_first_search():
+    rng = np.random.default_rng(0)
+    for node_count, edge_count in ((1, 0), (40, 20), (500, 450), (2000, 1990)):
+        nodes = (rng.choice(10 * node_count, size=node_count, replace=False) + 1).tolist()
+        edges = [tuple(rng.choice(nodes, size=2).tolist()) for _ in range(edge_count)]
+
+        components = graph_of(nodes, edges).components()
+
+        assert sorted(sorted(component) for component in components) == sorted(components_by_search(nodes, edges))
+        assert [len(component) for component in components] == sorted((len(component) for component in components), reverse=True)
+
+
+def test_long_chain_is_one_component():
+    nodes = list(range(10000))
+    edges = [(node, node + 1) for node in reversed(nodes[:-1])]
+
+    assert graph_of(nodes, edges).components() == [nodes]
+
+
+def test_duplicate_edges_keep_the_largest_kind():
+    graph = graph_of(["a", "b", "c"], [("a", "b"), ("b", "a"), ("b", "c")], kinds=[0, 2, 1])
+
+    assert graph.edge_count == 2
+    assert graph.neighbours("b") == [("a", 2), ("c", 1)]
+
+
+def test_chains_stop_at_branches():
+    # A path 1-2-3-4 branching at 4 into 5-6 and 7, and a separate loop 10-11-12.
+    edges = [(1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (4, 7), (10, 11), (11, 12), (12, 10)]
+    graph = graph_of([1, 2, 3, 4, 5, 6, 7, 10, 11, 12], edges)
+
+    chains = graph.chains()
+
+    assert chains[0] == [1, 2, 3]
+    assert sorted(map(tuple, chains[1:])) == [(4,), (5, 6), (7,), (10, 11, 12)]
+
+
+def test_chains_follow_selected_edges():
+    graph = graph_of([1, 2, 3, 4], [(1, 2), (2, 3), (3, 4)], kinds=[1, 0, 1])
+
+    assert sorted(graph.chains(graph.edge_kinds == 1)) == [[1, 2], [3, 4]]
+
+
+def test_freeze_keeps_connections():
+    graph = Graph()
+    graph.add_edge("wall-1", "wall-2")
+    graph.add_edge("wall-2", "wall-3")
+    graph.add_edge("wall-4", "wall-5")
+
+    frozen = graph.freeze()
+
+    assert frozen.components() == [["wall-1", "wall-2", "wall-3"], ["wall-4", "wall-5"]]
+    assert {node: {neighbour for neighbour, _ in frozen.neighbours(node)} for node in frozen.nodes.tolist()} == graph.get_connections()
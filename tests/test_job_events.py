@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from src.server_utils.job_events import JobEventStream
+from src.server_utils.job_queue import Job, JobQueue
+
+
+def parse(frame: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def collect(stream: JobEventStream) -> list:
+    async def run():
+        return [frame async for frame in stream.iter_events()]
+    frames = asyncio.run(run())
+    assert all(frame.endswith("\n\n") for frame in frames)
+    return [parse(frame[:-2]) for frame in frames if not frame.startswith(":")]
+
+
+def test_event_framing():
+    frame = JobEventStream.format("progress", {"done": np.int64(2), "rate": np.float32(0.5), "name": "Wand\nÄ"}, 7)
+
+    assert frame.endswith("\n\n")
+    lines = frame[:-2].split("\n")
+    assert lines[:2] == ["event: progress", "id: 7"]
+    assert len(lines) == 3 and lines[2].startswith("data: ")
+    assert json.loads(lines[2][len("data: "):]) == {"done": 2, "rate": 0.5, "name": "Wand\nÄ"}
+    assert JobEventStream.format("done", {}) == "event: done\ndata: {}\n\n"
+
+
+def test_stream_of_a_finished_job_ends_with_its_state():
+    job = Job("test", lambda job: None)
+    job.report("tessellate", done=3, total=3, type_totals={"IfcWall": 3})
+    job.state = Job.DONE
+    job.result = {"elements": 3}
+
+    events = collect(JobEventStream(job, interval=0))
+
+    assert [event["event"] for event in events] == ["stage", "progress", Job.DONE]
+    assert events[0]["data"]["stage"] == "tessellate"
+    assert events[0]["data"]["details"] == {"type_totals": {"IfcWall": 3}}
+    assert events[1]["data"]["done"] == events[1]["data"]["total"] == 3
+    assert events[2]["data"]["result"] == {"elements": 3}
+    assert {event["id"] for event in events} == {str(job.revision)}
+
+
+@pytest.mark.parametrize("cancel", [False, True])
+def test_stream_follows_a_running_job_until_it_ends(cancel):
+    job_queue = JobQueue(workers=1, max_pending=1, result_ttl_seconds=60)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def work(job: Job):
+        job.report("tessellate", done=0, total=2)
+        started.set()
+        while not gate.wait(0.01):
+            job.report(done=1)
+        job.report(done=2)
+        return {"elements": 2}
+
+    job = job_queue.submit(Job("test", work))
+    started.wait(5)
+    threading.Timer(0.1, job.cancel if cancel else gate.set).start()
+    try:
+        events = collect(JobEventStream(job, interval=0.01))
+    finally:
+        gate.set()
+        job_queue.shutdown()
+
+    assert events[-1]["event"] == (Job.CANCELLED if cancel else Job.DONE)
+    assert [event["event"] for event in events[:-1]].count("progress") >= 1
+    assert all(event["event"] in ("stage", "progress") for event in events[:-1])
+
+
+def test_stream_ends_when_the_client_disconnects():
+    job = Job("test", lambda job: None)
+
+    async def disconnected():
+        return True
+
+    events = collect(JobEventStream(job, interval=0, is_disconnected=disconnected))
+
+    assert [event["event"] for event in events] == ["stage", "progress"]
+    assert events[0]["data"]["stage"] == Job.QUEUED
+
+
+def test_events_endpoint(client):
+    import src.main
+    job = Job("test", lambda job: None)
+    job.state = Job.FAILED
+    job.finished_at = job.created_at
+    job.error = "Failed to load IFC file"
+    src.main.job_queue.jobs[job.job_id] = job
+    try:
+        response = client.get(f"/jobs/{job.job_id}/events")
+    finally:
+        src.main.job_queue.jobs.pop(job.job_id)
+
+    assert response.headers["content-type"].startswith(JobEventStream.MEDIA_TYPE)
+    assert response.headers["cache-control"] == "no-cache"
+    event = parse(response.text[:-2].split("\n\n")[-1])
+    assert event["event"] == Job.FAILED
+    assert event["data"]["error"] == "Failed to load IFC file"
+    assert client.get("/jobs/unknown/events").status_code == 404
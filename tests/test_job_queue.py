@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.server_utils.job_queue import Job, JobQueue, QueueClosed, QueueFull
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class Recorder:
+    """
+    Job function and cleanup that record their calls.
+    """
+
+    def __init__(self, result=None, error=None, gate: threading.Event = None):
+        self.result = result
+        self.error = error
+        self.gate = gate
+        self.started = threading.Event()
+        self.calls = 0
+        self.cleanups = 0
+
+    def __call__(self, job: Job):
+        self.calls += 1
+        self.started.set()
+        job.report("working", done=0, total=2)
+        while self.gate is not None and not self.gate.wait(0.01):
+            job.report(done=1)
+        job.report(done=2)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def cleanup(self):
+        self.cleanups += 1
+
+
+@pytest.fixture
+def job_queue():
+    job_queue = JobQueue(workers=1, max_pending=2, result_ttl_seconds=60)
+    yield job_queue
+    job_queue.shutdown()
+
+
+def submit(job_queue: JobQueue, recorder: Recorder) -> Job:
+    return job_queue.submit(Job("test", recorder, {"name": "value"}, cleanup=recorder.cleanup))
+
+
+def test_job_runs_to_done(job_queue):
+    recorder = Recorder(result={"elements": 3})
+
+    job = submit(job_queue, recorder)
+    wait_until(lambda: job.finished)
+
+    assert job.state == Job.DONE
+    assert job.to_dict()["result"] == {"elements": 3}
+    assert job.progress()["done"] == job.progress()["total"] == 2
+    assert job.started_at <= job.finished_at
+    assert recorder.cleanups == 1
+    assert job_queue.get(job.job_id) is job
+
+
+def test_failed_job_keeps_its_error(job_queue):
+    recorder = Recorder(error=ValueError("Failed to load IFC file"))
+
+    job = submit(job_queue, recorder)
+    wait_until(lambda: job.finished)
+
+    assert job.state == Job.FAILED
+    assert job.error == "Failed to load IFC file"
+    assert job.to_dict()["result"] is None
+    assert recorder.cleanups == 1
+
+
+def test_queued_job_is_cancelled_at_once(job_queue):
+    gate = threading.Event()
+    running = Recorder(gate=gate)
+    queued = Recorder()
+    first = submit(job_queue, running)
+    running.started.wait(5)
+    second = submit(job_queue, queued)
+
+    assert second.state == Job.QUEUED
+    assert second.cancel() is True
+
+    assert second.state == Job.CANCELLED
+    assert second.finished_at is not None
+    assert queued.cleanups == 1
+    assert second.cancel() is False
+
+    gate.set()
+    wait_until(lambda: first.finished and job_queue.pending.empty())
+    assert first.state == Job.DONE
+    assert second.state == Job.CANCELLED
+    assert queued.calls == 0
+    assert queued.cleanups == 1
+
+
+def test_running_job_stops_at_its_next_report(job_queue):
+    recorder = Recorder(gate=threading.Event())
+    job = submit(job_queue, recorder)
+    recorder.started.wait(5)
+
+    assert job.cancel() is True
+    wait_until(lambda: job.finished)
+
+    assert job.state == Job.CANCELLED
+    assert recorder.cleanups == 1
+
+
+def test_full_and_closed_queues_refuse_jobs(job_queue):
+    gate = threading.Event()
+    running = Recorder(gate=gate)
+    submit(job_queue, running)
+    running.started.wait(5)
+    submit(job_queue, Recorder())
+    submit(job_queue, Recorder())
+
+    assert not job_queue.has_capacity()
+    with pytest.raises(QueueFull):
+        submit(job_queue, Recorder())
+
+    job_queue.shutdown()
+    assert [job.state for job in job_queue.list()].count(Job.CANCELLED) == 2
+    wait_until(lambda: all(job.finished for job in job_queue.list()))
+    with pytest.raises(QueueClosed):
+        submit(job_queue, Recorder())
+
+
+def test_finished_jobs_expire(job_queue, monkeypatch):
+    job = submit(job_queue, Recorder())
+    wait_until(lambda: job.finished)
+
+    monkeypatch.setattr(job_queue, "result_ttl_seconds", -1)
+
+    assert job_queue.get(job.job_id) is None
+
+
+def submit_geometry_job(client, synthetic_path):
+    with open(synthetic_path, "rb") as model_file:
+        response = client.post("/jobs/geometry?types=IfcColumn", files={"file": ("synthetic.ifc", model_file)})
+    assert response.status_code == 202
+    assert response.headers["location"] == f"/jobs/{response.json()['job_id']}"
+    return response.json()["job_id"]
+
+
+def test_geometry_job_endpoints(client, synthetic_path, monkeypatch):
+    import src.main
+    monkeypatch.setattr(src.main, "job_queue", JobQueue(workers=1, max_pending=2, result_ttl_seconds=60))
+
+    job_id = submit_geometry_job(client, synthetic_path)
+    wait_until(lambda: client.get(f"/jobs/{job_id}").json()["state"] == Job.DONE)
+    status = client.get(f"/jobs/{job_id}").json()
+    result = client.get(f"/jobs/{job_id}/result")
+
+    assert status["result"]["elements"] == 6
+    assert status["details"]["type_totals"] == {"IfcColumn": 6}
+    assert [element["type"] for element in result.json()] == ["IfcColumn"] * 6
+    assert client.get(f"/models/{status['result']['model_id']}").status_code == 200
+    assert os.listdir(src.main.UPLOAD_DIRECTORY) == []
+    assert client.delete(f"/jobs/{job_id}").json() == {"job_id": job_id, "cancelled": False, "state": Job.DONE}
+    assert client.get("/jobs/unknown").status_code == 404
+    src.main.job_queue.shutdown()
+
+
+def test_cancelled_queued_job_deletes_its_upload(client, synthetic_path, monkeypatch):
+    import src.main
+    # Without workers, submitted jobs stay queued.
+    monkeypatch.setattr(src.main, "job_queue", JobQueue(workers=0, max_pending=2, result_ttl_seconds=60))
+
+    job_id = submit_geometry_job(client, synthetic_path)
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+    assert len(os.listdir(src.main.UPLOAD_DIRECTORY)) == 1
+
+    assert client.delete(f"/jobs/{job_id}").json() == {"job_id": job_id, "cancelled": True, "state": Job.CANCELLED}
+    assert client.get(f"/jobs/{job_id}").json()["state"] == Job.CANCELLED
+    assert client.get(f"/jobs/{job_id}/result").status_code == 410
+    assert os.listdir(src.main.UPLOAD_DIRECTORY) == []
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.server_utils.geometry_encoders import GeometryBinaryEncoder, GeometryNdjsonEncoder
+from tests.test_geometry_encoders import decode_binary
+
+
+@pytest.mark.parametrize("query, headers", [("format=binary", {}), ("", {"accept": GeometryBinaryEncoder.MEDIA_TYPE})])
+def test_binary_geometry_is_negotiated(client, model_id, query, headers):
+    response = client.get(f"/models/{model_id}/geometry?{query}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == GeometryBinaryEncoder.MEDIA_TYPE
+    manifest, _ = decode_binary(response.content)
+    assert len(manifest["elements"]) == 6
+
+
+def test_unknown_format_is_rejected(client, model_id):
+    response = client.get(f"/models/{model_id}/geometry?format=xml")
+
+    assert response.status_code == 400
+    assert "json, binary, ndjson" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("query", ["format=ndjson", "format=ndjson&lod=2"])
+def test_ndjson_geometry_matches_json(client, model_id, query):
+    expected = client.get(f"/models/{model_id}/geometry?types=IfcWall&{query.replace('ndjson', 'json')}")
+    response = client.get(f"/models/{model_id}/geometry?types=IfcWall&{query}")
+    # The second request is served from the cache filled by the first stream.
+    repeated = client.get(f"/models/{model_id}/geometry?types=IfcWall&{query}")
+
+    for streamed in (response, repeated):
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"] == GeometryNdjsonEncoder.MEDIA_TYPE
+        assert streamed.headers["x-lod-tier"] == expected.headers["x-lod-tier"]
+        assert [json.loads(line) for line in streamed.text.splitlines()] == expected.json()
+
+
+@pytest.mark.parametrize("limit_mb, cached", [(0, False), (512, True)])
+def test_ndjson_stream_is_cached_within_the_limit(client, model_id, monkeypatch, limit_mb, cached):
+    import src.main
+    monkeypatch.setattr(src.main, "STREAM_CACHE_LIMIT_MB", limit_mb)
+    cached_model = src.main.model_registry.get(model_id).cached_model
+    exclude = "IfcWall" if cached else "IfcSlab"
+
+    response = client.get(f"/models/{model_id}/geometry?types=IfcColumn&exclude={exclude}&format=ndjson")
+
+    assert len(response.text.splitlines()) == 6
+    payload_name = f"meshes:{ElementTypeFilter.from_names(['IfcColumn'], [exclude]).key()}"
+    assert (cached_model.get_payload(payload_name) is not None) == cached
+
+
+@pytest.mark.parametrize("path", ["/models/{model_id}/geometry", "/models/{model_id}/diff/{model_id}"])
+@pytest.mark.parametrize("query", ["entity=Garbage", "entity=Garbage&types=IfcWall", "types=IfcWall,Garbage", "exclude=Garbage"])
+def test_unknown_element_types_are_rejected(client, model_id, path, query):
+    response = client.get(f"{path.format(model_id=model_id)}?{query}")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unsupported element type: Garbage"
+
+
+def test_entity_is_matched_case_insensitively(client, model_id):
+    response = client.get(f"/models/{model_id}/geometry?entity=ifccolumn")
+
+    assert response.status_code == 200
+    assert {element["type"] for element in response.json()} == {"IfcColumn"}
+
+
+def test_geometry_job_rejects_unknown_entity(client, synthetic_path):
+    with open(synthetic_path, "rb") as model_file:
+        response = client.post("/jobs/geometry?entity=Garbage", files={"file": ("synthetic.ifc", model_file)})
+
+    assert response.status_code == 400
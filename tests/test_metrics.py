@@ -0,0 +1,103 @@
+import pytest
+
+from src.server_utils.metrics import Histogram, MetricsRegistry, span, STAGE_DURATION, STAGE_FAILURES
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_and_gauge_rendering(registry):
+    requests = registry.counter("requests_total", "Requests.", ["route"])
+    in_flight = registry.gauge("in_flight", "Requests being served.")
+    requests.inc(route="/models")
+    requests.inc(2, route="/models")
+    requests.inc(route="/jobs")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    assert registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/models"} 3\n'
+        'requests_total{route="/jobs"} 1\n'
+        "# HELP in_flight Requests being served.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 1\n"
+    )
+
+
+def test_metrics_without_labels_are_reported_from_the_start(registry):
+    registry.counter("failed_total", "Failures.")
+    registry.histogram("size_bytes", "Sizes.", buckets=(1.0,))
+
+    lines = registry.render().splitlines()
+
+    assert "failed_total 0" in lines
+    assert lines[-4:] == ['size_bytes_bucket{le="1"} 0', 'size_bytes_bucket{le="+Inf"} 0', "size_bytes_sum 0",
+                          "size_bytes_count 0"]
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    durations = registry.histogram("duration_seconds", "Durations.", ["stage"], buckets=(1.0, 0.1, 2.5))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        durations.observe(value, stage="parse")
+
+    assert durations.render().splitlines() == [
+        "# HELP duration_seconds Durations.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{stage="parse",le="0.1"} 2',
+        'duration_seconds_bucket{stage="parse",le="1"} 3',
+        'duration_seconds_bucket{stage="parse",le="2.5"} 3',
+        'duration_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'duration_seconds_sum{stage="parse"} 3.65',
+        'duration_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_label_values_and_help_are_escaped(registry):
+    counter = registry.counter("escaped_total", 'Path\\name\nsecond "line".', ["route"])
+    counter.inc(route='C:\\models\n"a"')
+
+    assert counter.render().splitlines() == [
+        '# HELP escaped_total Path\\\\name\\nsecond "line".',
+        "# TYPE escaped_total counter",
+        'escaped_total{route="C:\\\\models\\n\\"a\\""} 1',
+    ]
+
+
+def test_registering_a_name_twice_returns_the_first_metric(registry):
+    first = registry.counter("requests_total", "Requests.")
+
+    assert registry.counter("requests_total", "Other.") is first
+    assert registry.render().count("# TYPE requests_total") == 1
+
+
+def test_span_counts_failures():
+    before = STAGE_FAILURES.values.get(("test_span",), 0.0)
+
+    with pytest.raises(ValueError):
+        with span("test_span"):
+            raise ValueError()
+
+    assert STAGE_FAILURES.values[("test_span",)] == before + 1
+    assert sum(STAGE_DURATION.values[("test_span",)][0]) >= 1
+
+
+def test_metrics_endpoint(client, model_id):
+    assert client.get(f"/models/{model_id}/geometry?types=IfcColumn").status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MetricsRegistry.CONTENT_TYPE
+    lines = response.text.splitlines()
+    assert "# TYPE http_requests_total counter" in lines
+    assert "# TYPE ifc_stage_duration_seconds histogram" in lines
+    assert any(line.startswith('http_requests_total{method="GET",route="/models/{model_id}/geometry",status="200"} ')
+               for line in lines)
+    assert any(line.startswith('ifc_stage_duration_seconds_bucket{stage="tessellate",le="+Inf"} ') for line in lines)
+    assert any(line.startswith("ifc_upload_bytes_count ") and line != "ifc_upload_bytes_count 0" for line in lines)
+    assert len(Histogram.SIZE_BUCKETS) + 1 == sum(line.startswith("ifc_upload_bytes_bucket") for line in lines)
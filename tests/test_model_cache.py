@@ -0,0 +1,53 @@
+import numpy as np
+
+from src.data_structure.spatial_index import SpatialIndex
+from src.model.model_mesh import ElementMesh
+from src.server_utils.model_cache import CachedModel, ModelCache
+
+
+def box_mesh(element_id: int, arrays: tuple) -> ElementMesh:
+    vertices, faces, normals, edges = arrays
+    return ElementMesh(element_id, "IfcWall", f"guid-{element_id}", "IfcShapeRepresentation", "1",
+                       vertices, faces, normals, edges, np.eye(4))
+
+
+def mesh_arrays(vertex_count=1000) -> tuple:
+    return (np.zeros((vertex_count, 3)), np.zeros((vertex_count, 3), dtype=np.int64),
+            np.zeros((vertex_count, 3)), np.zeros((vertex_count, 2), dtype=np.int64))
+
+
+def test_shared_arrays_are_counted_once():
+    arrays = mesh_arrays()
+    array_bytes = sum(array.nbytes for array in arrays)
+    shared = CachedModel.estimate_size([box_mesh(index, arrays) for index in range(100)])
+    separate = CachedModel.estimate_size([box_mesh(index, mesh_arrays()) for index in range(100)])
+
+    assert array_bytes < shared < 2 * array_bytes
+    assert separate > 100 * array_bytes
+
+
+def test_memory_mapped_arrays_are_not_counted(tmp_path):
+    np.save(tmp_path / "vertices.npy", np.zeros((100000, 3)))
+    mapped = np.load(tmp_path / "vertices.npy", mmap_mode="r")
+
+    assert CachedModel.estimate_size([mapped[:50000], mapped[50000:]]) < 1024
+    assert CachedModel.estimate_size(np.array(mapped[:50000])) == 50000 * 3 * 8
+
+
+def test_nested_payloads_are_counted_recursively():
+    summary = {"IfcWall": {"count": 1000, "ids": list(range(1000))}}
+    ids = np.arange(1000)
+    index = SpatialIndex(ids, np.zeros((1000, 3)), np.ones((1000, 3)))
+
+    assert CachedModel.estimate_size(summary) > 1000 * 8
+    assert CachedModel.estimate_size(index) > ids.nbytes + 2 * 1000 * 3 * 8
+
+
+def test_cache_evicts_least_recently_used_model():
+    cache = ModelCache(budget_bytes=1024 ** 2)
+    first = cache.put("first", None, 0)
+    cache.put("second", None, 0)
+    cache.set_payload(first, "meshes", mesh_arrays(50000))
+
+    assert cache.get("first") is None
+    assert cache.get("second") is not None
@@ -0,0 +1,30 @@
+import ifcopenshell.util.unit
+import numpy as np
+
+from benchmarks.model_generator import ModelSize, SyntheticModelGenerator
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+
+
+def test_same_seed_writes_same_elements(synthetic_file):
+    again = SyntheticModelGenerator(ModelSize(slabs=6, walls=6, columns=6, mapped=6, storeys=2), seed=1).generate()
+
+    assert [element.GlobalId for element in again.by_type("IfcProduct")] == \
+           [element.GlobalId for element in synthetic_file.by_type("IfcProduct")]
+
+
+def test_elements_are_sized_in_metres(synthetic_file):
+    assert ifcopenshell.util.unit.calculate_unit_scale(synthetic_file) == 1.0
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    extents = {}
+    for mesh in IfcUtilsFile.get_element_meshes(synthetic_file, type_filter):
+        extents.setdefault(mesh.element_type, []).append(mesh.vertices.max(axis=0) - mesh.vertices.min(axis=0))
+
+    slabs = np.array(extents["IfcSlab"])
+    assert np.all((slabs[:, :2] >= 3.0) & (slabs[:, :2] <= 5.5)) and np.allclose(slabs[:, 2], 0.2)
+    walls = np.array(extents["IfcWallStandardCase"])
+    assert np.allclose(walls[:, 2], 3.0) and np.allclose(walls[:, 1], 0.2)
+    columns = np.array(extents["IfcColumn"])
+    assert np.all((columns[:, :2] >= 0.3) & (columns[:, :2] <= 0.6)) and np.allclose(columns[:, 2], 3.0)
+    assert np.allclose(np.array(extents["IfcBuildingElementProxy"]), 1.0)
+    assert IfcUtilsFile.get_storey_elevations(synthetic_file) == [("Level 0", 0.0), ("Level 1", 3.0)]
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.model.model_geometry import Point3d, PointArray, PointView, Polyline, PolylineArray
+
+SQUARE = [(0.0, 0.0), (4.0, 0.0), (4.0, 3.0), (0.0, 3.0), (0.0, 0.0)]
+
+
+def test_point_array_construction():
+    assert PointArray(SQUARE).coordinates.shape == (5, 3)
+    assert np.all(PointArray(SQUARE).coordinates[:, 2] == 0.0)
+    assert PointArray((1.0, 2.0, 3.0)).coordinates.tolist() == [[1.0, 2.0, 3.0]]
+    assert PointArray([]).coordinates.shape == (0, 3)
+
+    points = [Point3d(1.0, 2.0, 3.0), Point3d(4.0, 5.0, 6.0)]
+    array = PointArray.from_points(points)
+    assert array.to_points() == points
+    assert all(type(point) is Point3d for point in array.to_points())
+
+
+def test_point_array_indexing_views_the_array():
+    array = PointArray([(1.0, 2.0, 3.0), (4.0, 5.0, 6.0), (7.0, 8.0, 9.0)])
+
+    assert isinstance(array[0], PointView)
+    assert array[-1] == Point3d(7.0, 8.0, 9.0)
+    assert [point.x for point in array] == [1.0, 4.0, 7.0]
+    assert len(array[1:]) == 2
+    with pytest.raises(IndexError):
+        array[3]
+
+    array[1].z = 10.0
+    array[1:][0].x = 0.0
+    assert array.coordinates[1].tolist() == [0.0, 5.0, 10.0]
+    assert array[0].distance_to(array[2]) == pytest.approx(math.sqrt(3 * 36))
+
+
+def test_point_array_centroid_bounding_box_and_transform():
+    array = PointArray([(0.0, 0.0, 0.0), (2.0, 4.0, 6.0)])
+    matrix = np.eye(4)
+    matrix[0:3, 0:3] = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+    matrix[0:3, 3] = (10.0, 0.0, 0.0)
+
+    assert array.centroid() == Point3d(1.0, 2.0, 3.0)
+    box = array.bounding_box()
+    assert (box.min_point, box.max_point) == (Point3d(0.0, 0.0, 0.0), Point3d(2.0, 4.0, 6.0))
+    assert array.transform(matrix).coordinates.tolist() == [[10.0, 0.0, 0.0], [6.0, 2.0, 6.0]]
+    assert array.coordinates.tolist() == [[0.0, 0.0, 0.0], [2.0, 4.0, 6.0]]
+
+
+def test_polyline_array_matches_polyline():
+    polyline = Polyline([Point3d(x, y, 0.0) for x, y in SQUARE])
+    array = PolylineArray.from_polyline(polyline)
+
+    assert array.count == array.point_count() == polyline.point_count() == 5
+    assert array.segment_lengths().tolist() == [4.0, 3.0, 4.0, 3.0]
+    assert polyline.length() == pytest.approx(14.0)
+    assert array.length() == pytest.approx(polyline.length())
+    assert array.area() == pytest.approx(12.0)
+    assert array.is_closed
+    assert array.centroid() == Point3d(2.0, 1.5, 0.0)
+    assert array.points[2] == polyline.points[2]
+    assert array.to_polyline().points == polyline.points
+
+
+def test_polyline_array_edge_cases():
+    open_line = PolylineArray([(0.0, 0.0, 0.0), (0.0, 0.0, 2.0)])
+    assert not open_line.is_closed
+    assert open_line.length() == pytest.approx(2.0)
+    assert open_line.area() == 0.0
+
+    # The area of an open polyline closes it implicitly.
+    assert PolylineArray(SQUARE[:-1]).area() == pytest.approx(12.0)
+    assert PolylineArray([(1.0, 1.0), (1.0, 1.0)]).centroid() == Point3d(1.0, 1.0, 0.0)
+
+    open_line.add_point(Point3d(0.0, 3.0, 2.0))
+    assert open_line.point_count() == 3
+    assert open_line.length() == pytest.approx(5.0)
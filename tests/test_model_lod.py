@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.model.model_lod import MeshSimplifier
+from src.model.model_mesh import ElementMesh
+from src.model.model_quantities import MeshQuantities
+from tests.meshes import box_mesh
+
+
+def grid_mesh(cells: int) -> ElementMesh:
+    """
+    Flat square of cells x cells quads facing up, with its own vertices per quad.
+    """
+    vertices, faces = [], []
+    for i in range(cells):
+        for j in range(cells):
+            start = len(vertices)
+            vertices.extend([(i, j, 0.0), (i + 1, j, 0.0), (i + 1, j + 1, 0.0), (i, j + 1, 0.0)])
+            faces.extend([(start, start + 1, start + 2), (start, start + 2, start + 3)])
+    vertices = np.array(vertices, dtype=np.float64)
+    normals = np.tile([0.0, 0.0, 1.0], (len(vertices), 1))
+    return ElementMesh(1, "IfcSlab", "guid-1", "IfcShapeRepresentation", "grid", vertices,
+                       np.array(faces, dtype=np.int64), normals, np.empty((0, 2), dtype=np.int64), np.eye(4))
+
+
+def test_lod_tiers_reduce_triangles():
+    mesh = grid_mesh(100)
+    counts = [MeshSimplifier.triangle_count(MeshSimplifier.simplify([mesh], tier)) for tier in range(MeshSimplifier.tier_count())]
+
+    assert counts[0] == 2 * 100 * 100
+    assert counts == sorted(counts, reverse=True)
+    for tier in range(1, MeshSimplifier.tier_count()):
+        grid = MeshSimplifier.TIER_GRIDS[tier]
+        assert counts[tier] <= 2 * grid * grid
+
+
+def test_lod_keeps_boxes_whole():
+    box = box_mesh((0.3, 0.3, 3.0))
+
+    for tier in range(MeshSimplifier.tier_count()):
+        simplified = MeshSimplifier.simplify([box], tier)[0]
+        assert len(simplified.faces) == 12
+        assert MeshQuantities.compute([simplified])["elements"][0]["volume"] == pytest.approx(0.27)
+
+
+def test_lod_of_model_is_monotonic(synthetic_file):
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    meshes = IfcUtilsFile.get_element_meshes(synthetic_file, type_filter)
+    counts = [MeshSimplifier.triangle_count(MeshSimplifier.simplify(meshes, tier)) for tier in range(MeshSimplifier.tier_count())]
+
+    assert counts[0] == MeshSimplifier.triangle_count(meshes)
+    assert counts == sorted(counts, reverse=True)
+    for tier in range(1, MeshSimplifier.tier_count()):
+        assert all(len(mesh.faces) > 0 for mesh in MeshSimplifier.simplify(meshes, tier))
+
+
+def test_triangle_budget_picks_a_tier(client, model_id):
+    full = client.get(f"/models/{model_id}/geometry?types=IfcWall")
+    budgeted = client.get(f"/models/{model_id}/geometry?types=IfcWall&triangle_budget=0")
+
+    assert full.headers["x-lod-tier"] == "0"
+    assert budgeted.headers["x-lod-tier"] == str(MeshSimplifier.tier_count() - 1)
+    assert sum(element["faces_count"] for element in budgeted.json()) <= sum(element["faces_count"] for element in full.json())
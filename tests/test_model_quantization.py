@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.model.model_quantities import MeshQuantities
+from src.model.model_quantization import MeshQuantizer, MeshWelder
+from src.server_utils.geometry_encoders import GeometryBinaryEncoder
+from tests.meshes import box_mesh
+from tests.test_geometry_encoders import decode_binary, element_array
+
+
+def test_weld_merges_coincident_vertices_and_drops_degenerate_faces():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 0, 0], [1, 1, 0], [0, 1, 0.00001]], dtype=np.float64)
+    faces = np.array([[0, 1, 2], [3, 4, 5], [0, 3, 4]])
+    normals = np.tile([0.0, 0.0, 1.0], (6, 1))
+    edges = np.array([[0, 1], [3, 1], [0, 3]])
+
+    welded, welded_faces, welded_normals, welded_edges = MeshWelder.weld_arrays(vertices, faces, normals, edges, 1e-4)
+
+    assert len(welded) == 4
+    assert len(welded_faces) == 2
+    assert len(welded_normals) == 4
+    assert len(welded_edges) == 1
+    np.testing.assert_allclose(welded[welded_faces].sum(axis=1), vertices[faces[:2]].sum(axis=1))
+
+
+def test_weld_keeps_sharp_edges():
+    box = box_mesh((2.0, 3.0, 4.0))
+    without_normals = box_mesh((2.0, 3.0, 4.0), element_id=2)
+    without_normals.normals = np.empty((0, 3))
+
+    sharp, smooth = MeshWelder.weld([box, without_normals])
+
+    assert len(sharp.vertices) == 24
+    assert len(sharp.faces) == 12
+    assert len(smooth.vertices) == 8
+    assert len(smooth.faces) == 12
+    assert MeshQuantities.compute([smooth])["elements"][0]["volume"] == pytest.approx(24.0)
+
+
+def test_weld_shares_results_between_instances():
+    first = box_mesh(element_id=1)
+    second = box_mesh(element_id=2)
+    second.geometry_id = first.geometry_id
+
+    welded = MeshWelder.weld([first, second])
+
+    assert welded[0].vertices is welded[1].vertices
+    assert [mesh.element_id for mesh in welded] == [1, 2]
+
+
+def test_quantized_round_trip_is_within_one_step(synthetic_file):
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    meshes = IfcUtilsFile.get_element_meshes(synthetic_file, type_filter)
+    manifest, buffers = decode_binary(GeometryBinaryEncoder.encode(meshes, quantize=True))
+
+    assert manifest["quantized"] is True
+    for element, mesh in zip(manifest["elements"], meshes):
+        position = element["decode"]["position"]
+        scale = np.array(position["scale"])
+        vertices = np.array(position["offset"]) + element_array(buffers, element, "vertices") * scale
+        expected = mesh.vertices[:, [0, 2, 1]]
+        assert np.all(np.abs(vertices - expected) <= scale / 2 + 1e-9)
+
+        normals = MeshQuantizer.oct_decode(element_array(buffers, element, "normals"))
+        cosines = np.sum(normals * mesh.normals[:, [0, 2, 1]], axis=1)
+        assert np.all(cosines > np.cos(np.radians(2.0)))
+        np.testing.assert_array_equal(element_array(buffers, element, "faces"), mesh.faces)
+
+
+def test_oct_encoding_covers_the_sphere():
+    rng = np.random.default_rng(0)
+    normals = rng.normal(size=(1000, 3))
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    axes = np.concatenate([np.eye(3), -np.eye(3)])
+
+    for vectors in (normals, axes):
+        decoded = MeshQuantizer.oct_decode(MeshQuantizer.oct_encode(vectors))
+        assert np.all(np.sum(decoded * vectors, axis=1) > np.cos(np.radians(2.0)))
+
+
+def test_flat_elements_quantize_without_dividing_by_zero():
+    vertices = np.array([[0.0, 0.0, 1.0], [2.0, 0.0, 1.0], [2.0, 3.0, 1.0]])
+
+    values, offset, scale = MeshQuantizer.quantize_positions(vertices)
+
+    assert scale[2] == 0.0
+    np.testing.assert_allclose(offset + values * scale, vertices, atol=np.max(scale))
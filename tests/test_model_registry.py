@@ -0,0 +1,114 @@
+import os
+
+import ifcopenshell
+import pytest
+
+from src.server_utils import model_registry as registry_module
+from src.server_utils.model_cache import CachedModel
+from src.server_utils.model_registry import ModelRegistry, model_registry
+
+
+class Clock:
+    """
+    Replacement of the time module the registry reads, advanced by hand.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(registry_module, "time", clock)
+    return clock
+
+
+def cached_model(key: str) -> CachedModel:
+    return CachedModel(key, ifcopenshell.file(schema="IFC4"), 100)
+
+
+def test_registering_identical_bytes_returns_the_session(clock):
+    registry = ModelRegistry(idle_ttl_seconds=60, max_models=4)
+    model = cached_model("a")
+
+    first = registry.register(model, "first.ifc")
+    second = registry.register(model, "second.ifc")
+
+    assert second is first
+    assert first.file_name == "first.ifc"
+    assert first.to_dict()["schema"] == "IFC4"
+    assert [session.model_id for session in registry.list()] == ["a"]
+
+
+def test_idle_sessions_expire(clock):
+    registry = ModelRegistry(idle_ttl_seconds=60, max_models=4)
+    registry.register(cached_model("a"), "a.ifc")
+    registry.register(cached_model("b"), "b.ifc")
+
+    clock.now += 50
+    assert registry.get("a") is not None
+    clock.now += 50
+
+    assert registry.get("b") is None
+    assert registry.get("a").last_access == clock.now
+    clock.now += 61
+    assert registry.list() == []
+
+
+def test_least_recently_used_session_is_evicted_over_the_cap(clock):
+    registry = ModelRegistry(idle_ttl_seconds=60, max_models=2)
+    registry.register(cached_model("a"), "a.ifc")
+    registry.register(cached_model("b"), "b.ifc")
+    registry.get("a")
+
+    registry.register(cached_model("c"), "c.ifc")
+
+    assert [session.model_id for session in registry.list()] == ["a", "c"]
+    assert registry.get("b") is None
+
+
+def test_remove(clock):
+    registry = ModelRegistry(idle_ttl_seconds=60, max_models=2)
+    registry.register(cached_model("a"), "a.ifc")
+
+    assert registry.remove("a") is True
+    assert registry.remove("a") is False
+    assert registry.get("a") is None
+
+
+def test_model_endpoints(client, model_id, synthetic_path):
+    listed = client.get("/models").json()
+    model = client.get(f"/models/{model_id}").json()
+
+    assert model_id in [entry["model_id"] for entry in listed]
+    assert model["file_name"] == "synthetic.ifc"
+    assert model["file_size"] == os.path.getsize(synthetic_path)
+    assert model["schema"] == "IFC4"
+    assert client.get(f"/models/{model_id}/categories").status_code == 200
+
+    assert client.delete(f"/models/{model_id}").json() == {"model_id": model_id, "deleted": True}
+    assert client.get(f"/models/{model_id}").status_code == 404
+    assert client.get(f"/models/{model_id}/geometry").status_code == 404
+    assert client.delete(f"/models/{model_id}").status_code == 404
+
+
+def test_unknown_and_expired_models_are_not_found(client, model_id, monkeypatch):
+    assert client.get("/models/unknown").status_code == 404
+    assert client.get(f"/models/{model_id}/quantities").status_code == 200
+
+    monkeypatch.setattr(model_registry, "idle_ttl_seconds", -1)
+
+    response = client.get(f"/models/{model_id}/quantities")
+    assert response.status_code == 404
+    assert "Upload it again" in response.json()["detail"]
+    assert model_id not in [entry["model_id"] for entry in client.get("/models").json()]
+
+
+def test_upload_rejects_other_extensions(client):
+    response = client.post("/models", files={"file": ("model.txt", b"ISO-10303-21;")})
+
+    assert response.status_code == 400
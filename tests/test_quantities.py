@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.model.model_mesh import ElementMesh
+from src.model.model_quantities import MeshQuantities
+from tests.meshes import box_mesh, placement, rotation_x, rotation_z
+
+
+def prism_mesh(element_id=1) -> ElementMesh:
+    """
+    Right prism over the 3-4-5 triangle, 2 high. Volume 12, area 2 * 6 + (3 + 4 + 5) * 2 = 36.
+    """
+    vertices = np.array([[0, 0, 0], [3, 0, 0], [0, 4, 0], [0, 0, 2], [3, 0, 2], [0, 4, 2]], dtype=np.float64)
+    faces = np.array([[0, 2, 1], [3, 4, 5], [0, 1, 4], [0, 4, 3], [1, 2, 5], [1, 5, 4], [2, 0, 3], [2, 3, 5]])
+    return ElementMesh(element_id, "IfcBeam", f"guid-{element_id}", "IfcShapeRepresentation", f"prism-{element_id}",
+                       vertices, faces, np.empty((0, 3)), np.empty((0, 2), dtype=np.int64), np.eye(4))
+
+
+def extrusion(element) -> tuple:
+    """
+    Profile area and depth of the single extruded solid of a synthetic element.
+    """
+    solid = element.Representation.Representations[-1].Items[0]
+    profile = solid.SweptArea
+    if profile.is_a("IfcRectangleProfileDef"):
+        return profile.XDim * profile.YDim, solid.Depth
+    points = np.array([point.Coordinates for point in profile.OuterCurve.Points])
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])), solid.Depth
+
+
+@pytest.mark.parametrize("matrix", [
+    placement(),
+    placement((10.0, -5.0, 3.0)),
+    placement((1.0, 2.0, 3.0), rotation_z(0.7) @ rotation_x(0.3)),
+])
+def test_box_quantities_are_placement_independent(matrix):
+    element = MeshQuantities.compute([box_mesh((2.0, 3.0, 4.0), matrix=matrix)])["elements"][0]
+
+    assert element["volume"] == pytest.approx(24.0)
+    assert element["area"] == pytest.approx(52.0)
+
+
+def test_box_bounding_box_is_in_model_coordinates():
+    element = MeshQuantities.compute([box_mesh((2.0, 3.0, 4.0), matrix=placement((10.0, -5.0, 3.0), rotation_z(np.pi / 2)))])["elements"][0]
+
+    np.testing.assert_allclose(element["bbox"]["min"], [7.0, -5.0, 3.0], atol=1e-9)
+    np.testing.assert_allclose(element["bbox"]["max"], [10.0, -3.0, 7.0], atol=1e-9)
+
+
+def test_prism_and_inverted_winding():
+    prism = prism_mesh(1)
+    inverted = prism_mesh(2)
+    inverted.faces = inverted.faces[:, ::-1]
+
+    quantities = MeshQuantities.compute([prism, inverted])
+
+    for element in quantities["elements"]:
+        assert element["volume"] == pytest.approx(12.0)
+        assert element["area"] == pytest.approx(36.0)
+    assert quantities["types"]["IfcBeam"]["count"] == 2
+    assert quantities["total"]["volume"] == pytest.approx(24.0)
+
+
+def test_extruded_elements_match_their_profiles(synthetic_file):
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcColumn"])
+    meshes = IfcUtilsFile.get_element_meshes(synthetic_file, type_filter)
+    quantities = MeshQuantities.compute(meshes)
+
+    assert len(quantities["elements"]) == 12
+    for element in quantities["elements"]:
+        area, depth = extrusion(synthetic_file.by_id(element["id"]))
+        assert element["volume"] == pytest.approx(area * depth, rel=1e-6)
+        assert np.subtract(element["bbox"]["max"], element["bbox"]["min"])[2] == pytest.approx(depth)
@@ -0,0 +1,116 @@
+import ifcopenshell
+import ifcopenshell.api
+import numpy as np
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.ifc_utils.ifc_revision_utils import IfcUtilsRevision
+
+TYPE_FILTER = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+
+
+@pytest.fixture
+def previous(synthetic_path):
+    ifc_file = ifcopenshell.open(synthetic_path)
+    return ifc_file, IfcUtilsRevision.fingerprint_elements(ifc_file, TYPE_FILTER), IfcUtilsFile.get_element_meshes(ifc_file, TYPE_FILTER)
+
+
+def rebuild(previous, ifc_file) -> tuple:
+    _, previous_fingerprints, previous_meshes = previous
+    fingerprints = IfcUtilsRevision.fingerprint_elements(ifc_file, TYPE_FILTER)
+    return IfcUtilsRevision.diff(ifc_file, TYPE_FILTER, fingerprints, previous_fingerprints, previous_meshes, "r1")
+
+
+def assert_same_meshes(meshes, expected):
+    assert [(mesh.element_id, mesh.global_id, mesh.element_type) for mesh in meshes] == \
+           [(mesh.element_id, mesh.global_id, mesh.element_type) for mesh in expected]
+    for mesh, reference in zip(meshes, expected):
+        np.testing.assert_allclose(mesh.vertices, reference.vertices)
+        np.testing.assert_array_equal(mesh.faces, reference.faces)
+        np.testing.assert_allclose(mesh.matrix, reference.matrix)
+
+
+def test_unchanged_revision_reuses_every_mesh(previous, synthetic_path):
+    ifc_file = ifcopenshell.open(synthetic_path)
+
+    meshes, delta = rebuild(previous, ifc_file)
+
+    assert delta == {"added": [], "changed": [], "geometryChanged": [], "removed": [], "renumbered": [], "unchanged": len(meshes)}
+    assert all(mesh.geometry_id.endswith("@r1") for mesh in meshes)
+    assert_same_meshes(meshes, previous[2])
+
+
+def test_edited_revision_matches_a_full_tessellation(previous, synthetic_path):
+    ifc_file = ifcopenshell.open(synthetic_path)
+    slab, moved_slab = ifc_file.by_type("IfcSlab")[:2]
+    wall = ifc_file.by_type("IfcWall")[0]
+    column = ifc_file.by_type("IfcColumn")[0]
+    removed = {"globalId": column.GlobalId, "id": column.id()}
+
+    matrix = np.eye(4)
+    matrix[0:3, 3] = (100.0, 0.0, 0.0)
+    ifcopenshell.api.run("geometry.edit_object_placement", ifc_file, product=moved_slab, matrix=matrix, is_si=True)
+    wall.Name = "Renamed wall"
+    ifcopenshell.api.run("root.remove_product", ifc_file, product=column)
+    added = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcSlab", name="New slab")
+    ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=added, representation=slab.Representation.Representations[0])
+    ifcopenshell.api.run("geometry.edit_object_placement", ifc_file, product=added, matrix=matrix, is_si=True)
+
+    meshes, delta = rebuild(previous, ifc_file)
+
+    assert delta["added"] == [added.GlobalId]
+    assert sorted(delta["changed"]) == sorted([moved_slab.GlobalId, wall.GlobalId])
+    assert delta["geometryChanged"] == [moved_slab.GlobalId]
+    assert delta["removed"] == [removed]
+    assert delta["unchanged"] == len(meshes) - 3
+    assert_same_meshes(meshes, IfcUtilsFile.get_element_meshes(ifc_file, TYPE_FILTER))
+
+    serialized = IfcUtilsRevision.serialize_delta(meshes, delta)
+    assert [entry["globalId"] for entry in serialized["added"]] == [added.GlobalId]
+    changed = {entry["globalId"]: entry for entry in serialized["changed"]}
+    assert changed[moved_slab.GlobalId]["geometryChanged"] and "vertices" in changed[moved_slab.GlobalId]
+    assert not changed[wall.GlobalId]["geometryChanged"] and "vertices" not in changed[wall.GlobalId]
+
+
+def test_renumbered_revision_is_not_retessellated(previous):
+    # Copying into a new file assigns fresh STEP ids to every entity.
+    ifc_file = ifcopenshell.file(schema=previous[0].schema)
+    for element in previous[0].by_type("IfcProduct"):
+        ifc_file.add(element)
+
+    meshes, delta = rebuild(previous, ifc_file)
+
+    assert delta["added"] == [] and delta["changed"] == [] and delta["removed"] == []
+    assert len(delta["renumbered"]) == len(meshes) == len(previous[2])
+    assert all(entry["id"] != entry["previousId"] for entry in delta["renumbered"])
+    assert_same_meshes(meshes, IfcUtilsFile.get_element_meshes(ifc_file, TYPE_FILTER))
+
+
+def test_new_opening_retessellates_the_voided_wall(previous, synthetic_path):
+    ifc_file = ifcopenshell.open(synthetic_path)
+    wall = ifc_file.by_type("IfcWall")[0]
+    body = ifc_file.by_type("IfcGeometricRepresentationSubContext")[0]
+    opening = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcOpeningElement", name="Opening")
+    representation = ifcopenshell.api.run("geometry.add_wall_representation", ifc_file, context=body, length=0.8, height=1.0, thickness=1.0)
+    ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=opening, representation=representation)
+    matrix = IfcUtilsFile.get_element_meshes(ifc_file, TYPE_FILTER, elements=[wall])[0].matrix.copy()
+    matrix[0:3, 3] += matrix[0:3, 0:3] @ np.array([0.5, -0.4, 0.5])
+    ifcopenshell.api.run("geometry.edit_object_placement", ifc_file, product=opening, matrix=matrix, is_si=True)
+    ifcopenshell.api.run("feature.add_feature", ifc_file, feature=opening, element=wall)
+
+    meshes, delta = rebuild(previous, ifc_file)
+
+    assert delta["changed"] == delta["geometryChanged"] == [wall.GlobalId]
+    voided = next(mesh for mesh in meshes if mesh.global_id == wall.GlobalId)
+    original = next(mesh for mesh in previous[2] if mesh.global_id == wall.GlobalId)
+    assert len(voided.faces) > len(original.faces)
+    assert_same_meshes(meshes, IfcUtilsFile.get_element_meshes(ifc_file, TYPE_FILTER))
+
+    # Moving the opening alone changes the wall again.
+    fingerprints = IfcUtilsRevision.fingerprint_elements(ifc_file, TYPE_FILTER)
+    matrix[0:3, 3] += matrix[0:3, 0:3] @ np.array([0.5, 0.0, 0.0])
+    ifcopenshell.api.run("geometry.edit_object_placement", ifc_file, product=opening, matrix=matrix, is_si=True)
+    _, delta = IfcUtilsRevision.diff(ifc_file, TYPE_FILTER, IfcUtilsRevision.fingerprint_elements(ifc_file, TYPE_FILTER),
+                                     fingerprints, meshes, "r2")
+    assert delta["geometryChanged"] == [wall.GlobalId]
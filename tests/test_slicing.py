@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.element_type.ifc_type_enum import ElementTypeFilter
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.model.model_quantities import MeshQuantities
+from src.model.model_slicing import MeshSlicer
+from tests.meshes import box_mesh, placement, rotation_x
+
+
+def band_measures(slices: dict, element_index=0) -> dict:
+    return {band["band"]: (band["volume"], band["area"]) for band in slices["elements"][element_index]["bands"]}
+
+
+def test_box_bands_split_at_the_planes():
+    # 2 x 3 footprint from z = 1 to z = 4, cut at 3 and 2.
+    box = box_mesh((2.0, 3.0, 3.0), matrix=placement((5.0, 5.0, 1.0)))
+
+    slices = MeshSlicer.slice([box], [3.0, 2.0], ["Level 1", "Level 0"])
+
+    assert [(band["name"], band["bottom"], band["top"]) for band in slices["bands"]] == [
+        ("below Level 0", None, 2.0), ("Level 0", 2.0, 3.0), ("Level 1", 3.0, None)]
+    measures = band_measures(slices)
+    assert sorted(measures) == [0, 1, 2]
+    for band, (volume, area) in measures.items():
+        assert volume == pytest.approx(6.0)
+        # Bottom and top faces belong to the outer bands, and every band holds 1 m of the 10 m perimeter.
+        assert area == pytest.approx(10.0 if band == 1 else 16.0)
+
+
+def test_planes_outside_an_element_leave_one_band():
+    slices = MeshSlicer.slice([box_mesh((1.0, 1.0, 1.0))], [-1.0, 5.0])
+
+    assert band_measures(slices) == {1: (pytest.approx(1.0), pytest.approx(6.0))}
+
+
+def test_tilted_cube_is_halved_through_its_centre():
+    # The unit cube turned 45 degrees about x around its centre, so no face is horizontal.
+    centre = np.array([0.5, 0.5, 0.5])
+    rotation = rotation_x(np.pi / 4)
+    box = box_mesh(matrix=placement(centre - rotation @ centre, rotation))
+
+    for height, expected in ((0.5, 0.5), (0.5 - np.sqrt(2) / 4, 0.125)):
+        volume, _ = band_measures(MeshSlicer.slice([box], [height]))[0]
+        assert volume == pytest.approx(expected)
+
+
+def test_bands_add_up_to_the_quantities(synthetic_file):
+    type_filter = ElementTypeFilter.from_names(["IfcSlab", "IfcWall", "IfcColumn", "IfcBuildingElementProxy"])
+    meshes = IfcUtilsFile.get_element_meshes(synthetic_file, type_filter)
+    levels = [(storey.Name, storey.Elevation + 1.5) for storey in synthetic_file.by_type("IfcBuildingStorey")]
+
+    slices = IfcUtilsFile.slice_by_levels(meshes, levels)
+    quantities = MeshQuantities.compute(meshes)
+
+    for sliced, element in zip(slices["elements"], quantities["elements"]):
+        assert sliced["id"] == element["id"]
+        assert sum(band["volume"] for band in sliced["bands"]) == pytest.approx(element["volume"])
+        assert sum(band["area"] for band in sliced["bands"]) == pytest.approx(element["area"])
+        assert all(band["volume"] >= -1e-9 for band in sliced["bands"])
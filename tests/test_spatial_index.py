@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.data_structure.spatial_index import SpatialIndex
+
+
+@pytest.fixture(params=[(1, 16), (50, 4), (2000, 16)])
+def boxes(request):
+    count, node_size = request.param
+    rng = np.random.default_rng(count)
+    box_min = rng.uniform(-50.0, 50.0, size=(count, 3))
+    box_max = box_min + rng.uniform(0.1, 5.0, size=(count, 3))
+    ids = np.arange(100, 100 + count)
+    return ids, box_min, box_max, SpatialIndex(ids, box_min, box_max, node_size=node_size)
+
+
+def ray_entries(box_min, box_max, origin, direction) -> np.ndarray:
+    """
+    Entry distance of the ray into every box, or inf if it misses, by the slab method one box at a time.
+    """
+    entries = np.full(len(box_min), np.inf)
+    for index, (low, high) in enumerate(zip(box_min, box_max)):
+        t_near, t_far = 0.0, np.inf
+        for axis in range(3):
+            if direction[axis] == 0:
+                if not low[axis] <= origin[axis] <= high[axis]:
+                    break
+                continue
+            t1 = (low[axis] - origin[axis]) / direction[axis]
+            t2 = (high[axis] - origin[axis]) / direction[axis]
+            t_near, t_far = max(t_near, min(t1, t2)), min(t_far, max(t1, t2))
+        else:
+            if t_near <= t_far:
+                entries[index] = t_near
+    return entries
+
+
+def test_query_box_matches_brute_force(boxes):
+    ids, box_min, box_max, index = boxes
+    rng = np.random.default_rng(1)
+
+    assert len(index) == len(ids)
+    for _ in range(50):
+        query_min = rng.uniform(-60.0, 60.0, size=3)
+        query_max = query_min + rng.uniform(0.0, 30.0, size=3)
+        expected = ids[np.all((box_min <= query_max) & (box_max >= query_min), axis=1)]
+        assert sorted(index.query_box(query_min, query_max).tolist()) == sorted(expected.tolist())
+
+
+def test_query_ray_matches_brute_force(boxes):
+    ids, box_min, box_max, index = boxes
+    rng = np.random.default_rng(2)
+    directions = [rng.normal(size=3) for _ in range(30)] + [np.array([1.0, 0.0, 0.0]), np.array([0.0, 0.0, -1.0])]
+
+    for direction in directions:
+        origin = rng.uniform(-60.0, 60.0, size=3)
+        entries = ray_entries(box_min, box_max, origin, direction)
+        hits = index.query_ray(origin, direction, max_distance=100.0)
+
+        expected = {int(ids[i]): entries[i] for i in np.flatnonzero(entries <= 100.0)}
+        assert {hit_id for hit_id, _ in hits} == set(expected)
+        for hit_id, distance in hits:
+            assert distance == pytest.approx(expected[hit_id])
+        assert [distance for _, distance in hits] == sorted(distance for _, distance in hits)
+
+
+def test_nearest_matches_brute_force(boxes):
+    ids, box_min, box_max, index = boxes
+    rng = np.random.default_rng(3)
+
+    for _ in range(30):
+        point = rng.uniform(-60.0, 60.0, size=3)
+        distances = np.linalg.norm(np.maximum(np.maximum(box_min - point, point - box_max), 0.0), axis=1)
+        k = min(5, len(ids))
+        nearest = index.nearest(point, k)
+
+        assert len(nearest) == k
+        np.testing.assert_allclose([distance for _, distance in nearest], np.sort(distances)[:k])
+        for nearest_id, distance in nearest:
+            assert distances[nearest_id - 100] == pytest.approx(distance)
+
+
+def test_empty_index():
+    index = SpatialIndex(np.empty(0, dtype=np.int64), np.empty((0, 3)), np.empty((0, 3)))
+
+    assert len(index.query_box((0.0, 0.0, 0.0), (1.0, 1.0, 1.0))) == 0
+    assert index.query_ray((0.0, 0.0, 0.0), (1.0, 0.0, 0.0)) == []
+    assert index.nearest((0.0, 0.0, 0.0)) == []
@@ -0,0 +1,75 @@
+import io
+
+import ifcopenshell
+import pytest
+
+from src.ifc_utils.ifc_file_utils import IfcUtilsFile
+from src.ifc_utils.ifc_stream_utils import IfcStepScanner
+
+COMMENTED_MODEL = b"""ISO-10303-21;
+HEADER;
+/* header comment; with a semicolon */
+FILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');
+FILE_NAME('commented.ifc','2024-01-01T00:00:00',(''),(''),'','','');
+/* before the schema */ FILE_SCHEMA(('IFC4'));
+ENDSEC;
+DATA;
+/* exported by X */
+#1=IFCWALL('2O2Fr$t4X7Zf8NOew3FLOH',$,'Wall /* not a comment */',$,$,$,$,$,$);
+#2=IFCSLAB('1kTvXnbbzCWw8lcMd1dR4o',$,/* inline */'Slab; 1',$,$,$,$,$,$);
+/* a comment between instances */ #3=IFCCOLUMN('0uNK7$T1b4GPkXh0MtRPLc',$,$,$,$,$,$,$,$);
+ENDSEC;
+END-ISO-10303-21;
+"""
+
+
+def test_summary_matches_ifcopenshell(synthetic_path, synthetic_file):
+    expected = IfcUtilsFile.summarize_by_category(synthetic_file)
+    summary = IfcStepScanner.summarize_by_category(synthetic_path)
+
+    assert {element_type: category["ids"] for element_type, category in summary.items()} == \
+           {element_type: category["ids"] for element_type, category in expected.items()}
+    for category in summary.values():
+        for element_id, global_id, name in zip(category["ids"], category["globalIds"], category["names"]):
+            element = synthetic_file.by_id(element_id)
+            assert (global_id, name) == (element.GlobalId, element.Name)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+def test_summary_does_not_depend_on_chunk_size(synthetic_path, chunk_size):
+    assert IfcStepScanner.summarize_by_category(synthetic_path, chunk_size) == IfcStepScanner.summarize_by_category(synthetic_path)
+
+
+@pytest.mark.parametrize("chunk_size", [5, 1 << 20])
+def test_comments_are_skipped(tmp_path, chunk_size):
+    path = tmp_path / "commented.ifc"
+    path.write_bytes(COMMENTED_MODEL)
+
+    summary = IfcStepScanner.summarize_by_category(str(path), chunk_size)
+
+    assert {element_type: category["ids"] for element_type, category in summary.items()} == \
+           {"IfcWall": [1], "IfcSlab": [2], "IfcColumn": [3]}
+    assert summary["IfcWall"]["names"] == ["Wall /* not a comment */"]
+    assert summary["IfcSlab"]["names"] == ["Slab; 1"]
+    assert sorted(element.id() for element in ifcopenshell.open(str(path)).by_type("IfcProduct")) == [1, 2, 3]
+
+
+def test_schema_is_read_past_comments():
+    scanner = IfcStepScanner(io.BytesIO(COMMENTED_MODEL))
+    list(scanner.instances())
+
+    assert scanner.schema_name == "IFC4"
+
+
+@pytest.mark.parametrize("literal, text", [
+    (b"$", None),
+    (b"'plain'", "plain"),
+    (b"'it''s'", "it's"),
+    (b"'back\\\\slash'", "back\\slash"),
+    (b"'\\X2\\00E9\\X0\\t\\X2\\00E9\\X0\\'", "été"),
+    (b"'\\X2\\D55CAE00\\X0\\'", "한글"),
+    (b"'\\S\\i'", "é"),
+    (b"'\\X\\E9'", "é"),
+])
+def test_decode_string(literal, text):
+    assert IfcStepScanner.decode_string(literal) == text